@@ -0,0 +1,112 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+import asyncio
+import logging
+from typing import Callable, Coroutine, List, Optional
+from ...config import settings
+from ...services.batch import BatchItem, cleanup_items, stream_batch
+from ...services.ingest import save_upload, extract_archive, ArchiveError, ARCHIVE_EXTENSIONS
+from ...services.jobs import job_queue
+from ...services.model_registry import model_registry, ModelNotAllowedError
+from ...services.profiles import get_profile, UnknownProfileError
+
+logger = logging.getLogger(__name__)
+
+
+def check_backlog():
+    """Refuse new batches with a 429 while the job queue is full."""
+    if job_queue.backlog >= job_queue.max_depth:
+        raise HTTPException(status_code=429, detail=f"Job queue is full ({job_queue.max_depth} jobs waiting)")
+
+
+class BacklogCheckedRoute(APIRoute):
+    """
+    Route that runs check_backlog before the request body is read.
+
+    FastAPI parses a multipart form before it solves the endpoint's
+    dependencies, so on its own the dependency would only turn a batch away
+    after every file had been uploaded.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def checked_handler(request: Request) -> Response:
+            check_backlog()
+            return await handler(request)
+
+        return checked_handler
+
+
+router = APIRouter(route_class=BacklogCheckedRoute)
+
+@router.post("/batch", dependencies=[Depends(check_backlog)])
+async def process_batch(
+    files: List[UploadFile] = File([]),
+    archive: Optional[UploadFile] = File(None),
+    model: Optional[str] = None,
+    profile: Optional[str] = None,
+):
+    """
+    Process many meeting recordings in one request, sent as several ``files``
+    and/or one zip or tar ``archive`` of them.
+
+    Results stream back as Server-Sent Events, one ``item`` event per recording
+    as it finishes, then ``done``. A recording that can't be processed gets its
+    own error entry; the rest of the batch carries on. Choose a decoding
+    ``profile`` and optionally override its ``model`` as for POST /process;
+    each item reports the ``profile`` used and its ``real_time_factor``.
+
+    While the job queue is full the request is refused with a 429 before its
+    files are read.
+    """
+    try:
+        # Without an explicit model the profile's model is used
+        model_name = model_registry.resolve(model) if model else None
+        get_profile(profile)
+    except (ModelNotAllowedError, UnknownProfileError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    files = files or []
+    if not files and archive is None:
+        raise HTTPException(status_code=400, detail="Send one or more files or an archive")
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Batch limit of {settings.BATCH_MAX_FILES} files exceeded")
+
+    items: List[BatchItem] = []
+    try:
+        # Each file is validated on its own; a bad one doesn't fail the batch
+        for file in files:
+            item = BatchItem(index=len(items), filename=file.filename or f"file-{len(items)}")
+            try:
+                item.file = await save_upload(file)
+            except HTTPException as e:
+                item.error = e.detail
+            items.append(item)
+
+        if archive is not None:
+            ingested = await save_upload(
+                archive, max_size=settings.BATCH_MAX_UPLOAD_SIZE, allowed_extensions=ARCHIVE_EXTENSIONS
+            )
+            try:
+                entries = await asyncio.to_thread(
+                    extract_archive, ingested.path, settings.BATCH_MAX_FILES - len(items)
+                )
+            except ArchiveError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                await ingested.cleanup()
+            for name, extracted, error in entries:
+                items.append(BatchItem(index=len(items), filename=name, file=extracted, error=error))
+    except BaseException:
+        cleanup_items(items)
+        raise
+
+    logger.info(f"Processing batch of {len(items)} recording(s)")
+    return StreamingResponse(
+        stream_batch(items, model_name, profile),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(cleanup_items, items),
+    )
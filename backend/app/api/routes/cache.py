@@ -0,0 +1,13 @@
+import asyncio
+
+from fastapi import APIRouter
+from ...services.cache import result_cache
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report cache size and hit/miss counters for transcripts and summaries.
+    """
+    return await asyncio.to_thread(result_cache.stats)
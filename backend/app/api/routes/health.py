@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ...config import settings
+from ...services.model_registry import model_registry, FAILED
+
+router = APIRouter()
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness check: 200 once the preloaded Whisper models are loaded, 503
+    while they are still loading or if one failed. With MODEL_LOAD_MODE
+    'lazy' nothing is preloaded, so the process is ready as soon as it serves.
+    Never waits on a model load.
+    """
+    state = model_registry.load_state()
+    if state["ready"] or settings.MODEL_LOAD_MODE == "lazy":
+        status = "ready"
+    elif any(model["state"] == FAILED for model in state["models"].values()):
+        status = "failed"
+    else:
+        status = "loading"
+    return JSONResponse(
+        content={"status": status, "load_mode": settings.MODEL_LOAD_MODE, "models": state["models"]},
+        status_code=200 if status == "ready" else 503,
+    )
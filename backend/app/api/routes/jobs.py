@@ -0,0 +1,61 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
+import logging
+from typing import Optional
+from ...config import settings
+from ...services.jobs import job_queue, QueueFullError
+from ...services.ingest import save_upload
+from ...services.model_registry import model_registry, ModelNotAllowedError
+from ...services.profiles import get_profile, UnknownProfileError
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/jobs")
+async def create_job(file: UploadFile = File(...), model: Optional[str] = None,
+                     diarize: Optional[bool] = None, profile: Optional[str] = None):
+    """
+    Queue a meeting audio file for transcription and summarization.
+    Returns a job id immediately; poll GET /jobs/{job_id} for the result.
+    Pass ``diarize`` to override settings.DIARIZATION_ENABLED and ``profile``
+    to choose a decoding profile (see POST /process).
+    """
+    try:
+        # Without an explicit model the profile's model is used
+        model_name = model_registry.resolve(model) if model else None
+        get_profile(profile)
+    except (ModelNotAllowedError, UnknownProfileError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ingested = await save_upload(file)
+
+    try:
+        job = job_queue.submit(
+            ingested.path, ingested.sha256, model_name, title=file.filename,
+            diarize=settings.DIARIZATION_ENABLED if diarize is None else diarize,
+            profile=profile,
+        )
+    except QueueFullError as e:
+        await ingested.cleanup()
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return JSONResponse(content=job.to_dict(), status_code=202)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status, and once finished the result, of a queued job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    """
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+import asyncio
+import json
+import logging
+from typing import Optional
+from ...services.live import open_session, close_session, PCM_DTYPES
+from ...services.model_registry import model_registry, ModelNotAllowedError
+from ...services.vad import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.websocket("/live")
+async def live_transcription(
+    websocket: WebSocket,
+    model: Optional[str] = None,
+    encoding: str = "pcm_s16le",
+    sample_rate: int = SAMPLE_RATE,
+):
+    """
+    Transcribe a meeting while it is happening.
+
+    The client sends audio as binary frames: raw mono PCM (``pcm_s16le`` or
+    ``pcm_f32le``, at ``sample_rate``) or a compressed stream such as
+    WebM/Ogg Opus (``encoding=opus``), which is decoded with ffmpeg. The
+    server replies with JSON ``update`` messages carrying newly ``committed``
+    text, which will not change, and ``tentative`` text, which may. Send the
+    text message ``{"type": "stop"}`` to flush the remaining audio and get a
+    ``final`` message with the full transcript.
+    """
+    try:
+        model_name = model_registry.resolve(model)
+    except ModelNotAllowedError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+    if encoding not in PCM_DTYPES and encoding not in ("opus", "webm", "ogg"):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=f"Unsupported encoding '{encoding}'")
+        return
+
+    session = open_session(model_name, encoding, sample_rate)
+    if session is None:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many live sessions")
+        return
+
+    await websocket.accept()
+    stopped = asyncio.Event()
+
+    async def receive_audio():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes"):
+                    await session.feed(message["bytes"])
+                elif message.get("text"):
+                    try:
+                        command = json.loads(message["text"])
+                    except ValueError:
+                        continue
+                    if command.get("type") == "stop":
+                        await session.end_input()
+                        return
+        finally:
+            stopped.set()
+            session.audio_ready.set()
+
+    async def send_updates():
+        while not stopped.is_set():
+            await session.audio_ready.wait()
+            if stopped.is_set():
+                break
+            update = await session.step()
+            if update["committed"] or update["tentative"]:
+                await websocket.send_json(update)
+
+    try:
+        await session.start()
+        await websocket.send_json({"type": "ready", "session_id": session.id, "model": model_name})
+        receiver = asyncio.create_task(receive_audio())
+        sender = asyncio.create_task(send_updates())
+        try:
+            await asyncio.gather(receiver, sender)
+        finally:
+            receiver.cancel()
+            sender.cancel()
+        final = await session.step(final=True)
+        final["transcript"] = session.transcript
+        await websocket.send_json(final)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Live session {session.id} disconnected")
+    except Exception as e:
+        logger.error(f"Live session {session.id} failed: {str(e)}")
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except Exception:
+            pass
+    finally:
+        await close_session(session)
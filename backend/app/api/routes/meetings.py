@@ -1,6 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import TYPE_CHECKING, Optional
+from ...db.base import get_db
 from ...services.summarizer import summarizer
+from ...services.segments import parse_timestamp, iter_srt, iter_vtt
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+SUBTITLE_FORMATS = {
+    "srt": (iter_srt, "application/x-subrip"),
+    "vtt": (iter_vtt, "text/vtt"),
+}
 
 router = APIRouter()
 
@@ -16,4 +28,97 @@ async def summarize_transcript(request: TranscriptRequest):
         result = await summarizer.summarize(request.transcript)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/meetings")
+def list_meetings(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    db: "Session" = Depends(get_db)
+):
+    """
+    List stored meetings, newest first. Pass the returned ``next_cursor`` to
+    get the following page.
+    """
+    from ...services import meeting_store
+
+    try:
+        meetings, next_cursor = meeting_store.list_meetings(db, limit=limit, cursor=cursor, owner_id=owner_id)
+    except meeting_store.InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "meetings": [meeting_store.meeting_summary_dict(m) for m in meetings],
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/meetings/{meeting_id}")
+def get_meeting(meeting_id: int, db: "Session" = Depends(get_db)):
+    """
+    Get a stored meeting with its transcript and action items.
+    """
+    from ...services import meeting_store
+
+    meeting = meeting_store.get_meeting(db, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting_store.meeting_detail_dict(meeting)
+
+def _parse_bound(value: Optional[str], name: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return parse_timestamp(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{name}: {str(e)}")
+
+@router.get("/meetings/{meeting_id}/segments")
+def get_meeting_segments(
+    meeting_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: "Session" = Depends(get_db)
+):
+    """
+    Get the timestamped transcript segments of a meeting between ``start``
+    and ``end``, given as seconds or clock times (``10:00``, ``1:02:03``).
+    Either bound may be left out. Only the stored blocks covering the range
+    are read.
+    """
+    from ...services import meeting_store
+
+    start_seconds = _parse_bound(start, "start")
+    end_seconds = _parse_bound(end, "end")
+    if start_seconds is not None and end_seconds is not None and end_seconds <= start_seconds:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if not meeting_store.meeting_exists(db, meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    segments = meeting_store.get_segments(db, meeting_id, start_seconds, end_seconds)
+    return {
+        "meeting_id": meeting_id,
+        "start": start_seconds,
+        "end": end_seconds,
+        "text": segments.joined_text(),
+        "segments": list(segments),
+    }
+
+@router.get("/meetings/{meeting_id}/subtitles.{fmt}")
+def export_meeting_subtitles(meeting_id: int, fmt: str, db: "Session" = Depends(get_db)):
+    """
+    Export a meeting's transcript as SRT or WebVTT subtitles. Cues are
+    generated and sent block by block as the segments are read.
+    """
+    from ...services import meeting_store
+
+    if fmt not in SUBTITLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported subtitle format '{fmt}'; use srt or vtt")
+    if not meeting_store.meeting_exists(db, meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    render, media_type = SUBTITLE_FORMATS[fmt]
+    return StreamingResponse(
+        render(meeting_store.iter_segment_blocks(meeting_id)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="meeting-{meeting_id}.{fmt}"'},
+    )
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from ...services.metrics import registry, CONTENT_TYPE
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint for request, pipeline, cache and queue metrics.
+    Sync so the cache counter queries run off the event loop.
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
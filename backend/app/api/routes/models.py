@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from dataclasses import asdict
+from ...config import settings
+from ...services.model_registry import model_registry
+from ...services.profiles import get_profile, profile_names
+
+router = APIRouter()
+
+@router.get("/models")
+async def list_models():
+    """
+    List the loaded Whisper models with their memory use, load and warmup times.
+    """
+    return model_registry.stats()
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    List the decoding profiles, most accurate first, with the default and the
+    thresholds at which requests are moved to a faster profile.
+    """
+    return {
+        "default": settings.DEFAULT_DECODING_PROFILE,
+        "degrade_queue_depth": settings.PROFILE_DEGRADE_QUEUE_DEPTH,
+        "degrade_audio_seconds": settings.PROFILE_DEGRADE_AUDIO_SECONDS,
+        "profiles": [asdict(get_profile(name)) for name in profile_names()],
+    }
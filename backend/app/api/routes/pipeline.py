@@ -1,72 +1,72 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-import tempfile
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import os
-from pathlib import Path
 import logging
-from ...services.transcriber import transcriber
-from ...services.summarizer import summarizer
+import asyncio
+from typing import Optional
+from ...config import settings
+from ...services.jobs import job_queue, JobStatus, QueueFullError
+from ...services.ingest import save_upload
+from ...services.model_registry import model_registry, ModelNotAllowedError
+from ...services.profiles import get_profile, UnknownProfileError
+from ...services.streaming import stream_pipeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-ALLOWED_EXTENSIONS = {'.mp3', '.wav', '.m4a'}
-
 @router.post("/process")
-async def process_meeting_audio(file: UploadFile = File(...)):
+async def process_meeting_audio(file: UploadFile = File(...), model: Optional[str] = None,
+                                diarize: Optional[bool] = None, profile: Optional[str] = None):
     """
     Process a meeting audio file: transcribe and summarize in one step.
+    Choose a decoding ``profile`` (fast, balanced or accurate; default:
+    settings.DEFAULT_DECODING_PROFILE) and optionally override its Whisper
+    ``model``. Under load or for long audio a faster profile may be used; the
+    response has the ``profile`` used and its measured ``real_time_factor``.
+    With ``diarize`` (default: settings.DIARIZATION_ENABLED) the response also
+    has speaker-labelled segments and action items attributed to speakers.
     """
     temp_file_path = None
     
     try:
-        # 1. Validate file extension
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file format. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
-            )
-
-        # 2. Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-            logger.info(f"Saved uploaded file to temporary location: {temp_file_path}")
+        # 1. Validate the request and stream the upload to a temporary file
+        try:
+            model_name = model_registry.resolve(model)
+        except ModelNotAllowedError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        ingested = await save_upload(file)
+        temp_file_path = ingested.path
 
-        # 3. Transcribe the audio
+        # 2. Hand the file to the job queue; transcription runs in a worker process
         try:
-            logger.info("Starting transcription...")
-            transcript = transcriber.transcribe_audio(temp_file_path)
-            logger.info("Transcription completed successfully")
-        except Exception as e:
-            logger.error(f"Transcription failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Transcription failed: {str(e)}"
+            job = job_queue.submit(
+                temp_file_path, ingested.sha256, model_name, title=file.filename,
+                diarize=settings.DIARIZATION_ENABLED if diarize is None else diarize,
+                profile=profile,
             )
+            temp_file_path = None  # The job queue now owns the file
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
 
-        # 4. Summarize the transcript
+        # 3. Wait for transcription and summarization without blocking the event loop
         try:
-            logger.info("Starting summarization...")
-            summary, action_items = await summarizer.summarize(transcript)
-            logger.info("Summarization completed successfully")
-        except Exception as e:
-            logger.error(f"Summarization failed: {str(e)}")
+            job = await job_queue.wait(job.id)
+        except asyncio.CancelledError:
+            # Client went away; free the worker
+            job_queue.cancel(job.id)
+            raise
+
+        if job.status != JobStatus.COMPLETED:
+            logger.error(f"Processing job {job.id} ended with status {job.status.value}: {job.error}")
             raise HTTPException(
                 status_code=500,
-                detail=f"Summarization failed: {str(e)}"
+                detail=f"Processing failed: {job.error or job.status.value}"
             )
 
-        # 5. Return combined result
-        response = {
-            "transcript": transcript,
-            "summary": summary,
-            "action_items": action_items
-        }
+        # 4. Return combined result
         logger.info("Successfully processed meeting audio")
-        return JSONResponse(content=response, status_code=200)
+        return JSONResponse(content=job.result, status_code=200)
 
     except HTTPException:
         # Re-raise HTTP exceptions as they're already properly formatted
@@ -79,7 +79,32 @@ async def process_meeting_audio(file: UploadFile = File(...)):
             detail=f"Unexpected error during processing: {str(e)}"
         )
     finally:
-        # 6. Clean up temporary file
+        # 5. Clean up temporary file
         if temp_file_path and os.path.exists(temp_file_path):
             os.unlink(temp_file_path)
-            logger.info(f"Cleaned up temporary file: {temp_file_path}") 
\ No newline at end of file
+            logger.info(f"Cleaned up temporary file: {temp_file_path}")
+
+@router.post("/process/stream")
+async def process_meeting_audio_stream(file: UploadFile = File(...), model: Optional[str] = None,
+                                       profile: Optional[str] = None):
+    """
+    Process a meeting audio file and stream progress as Server-Sent Events:
+    transcript segments as each audio window is decoded, then the summary and
+    action items. Disconnecting stops decoding further windows. ``profile``
+    and ``model`` are as for /process; the ``transcript`` event has the
+    profile used and its measured ``real_time_factor``.
+    """
+    try:
+        # Without an explicit model the profile's model is used
+        model_name = model_registry.resolve(model) if model else None
+        get_profile(profile)
+    except (ModelNotAllowedError, UnknownProfileError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ingested = await save_upload(file)
+
+    return StreamingResponse(
+        stream_pipeline(ingested.path, ingested.sha256, model_name, title=file.filename, profile=profile),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ingested.cleanup),
+    )
@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING
+from fastapi import APIRouter, Depends, HTTPException
+from ...db.base import get_db
+from ...services.search import search_index
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+router = APIRouter()
+
+@router.get("/search")
+def search_meetings(q: str, limit: int = 10, db: "Session" = Depends(get_db)):
+    """
+    Full-text search over stored meeting titles, summaries and transcripts.
+    Results are ranked by relevance, with highlighted snippets and the start
+    and end times of the transcript segments that match (character offsets
+    for meetings stored without segments).
+    """
+    try:
+        results = search_index.search(q, limit=limit, db=db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "results": results}
+
+@router.post("/search/rebuild")
+def rebuild_search_index(db: "Session" = Depends(get_db)):
+    """
+    Rebuild the search index from every stored meeting.
+    """
+    count = search_index.rebuild(db)
+    return {"indexed": count}
@@ -1,41 +1,42 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
-import tempfile
+import asyncio
 import os
-from pathlib import Path
+from typing import Optional
 from ...services.transcriber import transcriber
+from ...services.ingest import save_upload
 
 router = APIRouter()
 
-ALLOWED_EXTENSIONS = {'.mp3', '.wav', '.m4a'}
-
 @router.post("/transcribe")
-async def transcribe_audio(file: UploadFile = File(...)):
+async def transcribe_audio(file: UploadFile = File(...), model: Optional[str] = None,
+                           profile: Optional[str] = None):
     """
     Transcribe an uploaded audio file using Whisper.
+    Optionally choose a decoding ``profile`` and override its Whisper ``model``;
+    the response has the profile used and its measured real-time factor.
     """
     try:
-        # Validate file extension
-        file_extension = Path(file.filename).suffix.lower()
-        if file_extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file format. Allowed formats: {', '.join(ALLOWED_EXTENSIONS)}"
-            )
-
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            # Write the uploaded file to the temporary file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Validate and stream the upload to a temporary file
+        ingested = await save_upload(file)
+        temp_file_path = ingested.path
 
         try:
-            # Transcribe the audio
-            transcript = transcriber.transcribe_audio(temp_file_path)
+            # Transcribe the audio in a thread; waiting for the model must not block the event loop
+            output = await asyncio.to_thread(
+                transcriber.transcribe_segments,
+                temp_file_path,
+                audio_hash=ingested.sha256,
+                model_name=model,
+                profile=profile
+            )
             
             return JSONResponse(
-                content={"transcript": transcript},
+                content={
+                    "transcript": output["text"],
+                    "profile": output["profile"],
+                    "real_time_factor": output["real_time_factor"],
+                },
                 status_code=200
             )
 
@@ -44,6 +45,8 @@ async def transcribe_audio(file: UploadFile = File(...)):
             if os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,56 +1,65 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ...db.base import get_db
+from typing import TYPE_CHECKING, Optional
+import logging
+from ...db.base import get_async_db
 from ...services.whisper import transcribe_audio
-from ...services.summarizer import summarizer
+from ...services.summarizer import summarizer, SummarizationError
+from ...services.model_registry import ModelNotAllowedError
+from ...services.profiles import UnknownProfileError
+from ...services.audio import AudioDecodeError
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
-# Maximum file size (25MB in bytes)
-MAX_FILE_SIZE = 25 * 1024 * 1024
+logger = logging.getLogger(__name__)
+router = APIRouter()
 
 @router.post("/upload/audio")
 async def upload_audio(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    model: Optional[str] = None,
+    profile: Optional[str] = None,
+    db: "AsyncSession" = Depends(get_async_db)
 ):
     """
     Upload an audio file for meeting transcription and analysis.
+    Optionally choose a decoding ``profile`` (default: settings.UPLOAD_DECODING_PROFILE,
+    "fast") and override its Whisper ``model``.
     """
-    # Validate file type
-    if not file.filename.endswith(('.mp3', '.wav', '.m4a')):
-        raise HTTPException(
-            status_code=400,
-            detail="Only audio files (MP3, WAV, M4A) are allowed"
-        )
-    
-    # Validate file size
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB chunks
-    
-    while chunk := await file.read(chunk_size):
-        file_size += len(chunk)
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail="File size exceeds 25MB limit"
-            )
-    
-    # Reset file pointer for processing
-    await file.seek(0)
-    
+    from ...services.meeting_store import save_meeting
+
+    # File type and size are validated while the upload is streamed to disk
     try:
         # Process the file
-        transcript = await transcribe_audio(file)
-        summary, action_items = await summarizer.summarize(transcript)
+        output = await transcribe_audio(file, model_name=model, profile=profile)
+        transcript = output["text"]
+        summary, action_items = await summarizer.summarize(transcript, output["segments"])
+        meeting_id = await save_meeting(
+            db,
+            title=file.filename,
+            transcript=transcript,
+            summary=summary,
+            action_items=action_items,
+            segments=output["segments"],
+        )
         
         return {
+            "meeting_id": meeting_id,
             "transcript": transcript,
             "summary": summary,
-            "action_items": action_items
+            "action_items": action_items,
+            "profile": output["profile"],
+            "real_time_factor": output["real_time_factor"],
         }
+    except HTTPException:
+        raise
+    except (ModelNotAllowedError, UnknownProfileError, AudioDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SummarizationError as e:
+        # Nothing is stored for a meeting without a summary
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
-        print(f"Error processing file: {str(e)}")
+        logger.error(f"Error processing file: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Error processing file: {str(e)}"
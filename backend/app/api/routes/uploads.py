@@ -0,0 +1,93 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import asyncio
+import logging
+from typing import Optional
+from ...config import settings
+from ...services.jobs import job_queue, QueueFullError
+from ...services.model_registry import model_registry, ModelNotAllowedError
+from ...services.profiles import get_profile, UnknownProfileError
+from ...services.uploads import upload_store
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    size: int
+    part_size: Optional[int] = None
+
+@router.post("/uploads")
+async def init_upload(request: UploadInitRequest):
+    """
+    Start a resumable upload for a recording too large, or a connection too
+    unreliable, for a single request. Returns the ``upload_id`` and the
+    ``part_size``; send part ``n`` (counted from 0, bytes ``n * part_size``
+    onwards) with PUT /uploads/{upload_id}/parts/{n}, in any order and in
+    parallel, then POST /uploads/{upload_id}/complete.
+    """
+    upload = await asyncio.to_thread(upload_store.create, request.filename, request.size, request.part_size)
+    return JSONResponse(content=upload_store.status(upload), status_code=201)
+
+@router.put("/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(upload_id: str, part_number: int, request: Request):
+    """
+    Upload one part as the raw request body. A part that was cut off, or
+    already received, can simply be sent again.
+    """
+    upload = await asyncio.to_thread(upload_store.get, upload_id)
+    size = await upload_store.write_part(upload, part_number, request.stream())
+    return {"upload_id": upload.id, "part": part_number, "size": size}
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+    """
+    Get the parts and byte ranges received so far, to resume an upload after
+    a dropped connection by sending only the ``missing_parts``.
+    """
+    upload = await asyncio.to_thread(upload_store.get, upload_id)
+    return await asyncio.to_thread(upload_store.status, upload)
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, model: Optional[str] = None,
+                          diarize: Optional[bool] = None, profile: Optional[str] = None):
+    """
+    Finish an upload once all its parts are in and queue the recording for
+    transcription and summarization, as POST /jobs does. Returns the job;
+    poll GET /jobs/{job_id} for the result. Responds 409 with the missing
+    parts if the upload is not complete yet, while a part is still being
+    sent, or if another request is already completing it.
+    """
+    try:
+        # Without an explicit model the profile's model is used
+        model_name = model_registry.resolve(model) if model else None
+        get_profile(profile)
+    except (ModelNotAllowedError, UnknownProfileError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    upload = await asyncio.to_thread(upload_store.get, upload_id)
+    if job_queue.depth >= job_queue.max_depth:
+        # Checked before completing, so the client can retry without sending the parts again
+        raise HTTPException(status_code=429, detail=f"Job queue is full ({job_queue.max_depth} jobs waiting)")
+    ingested = await asyncio.to_thread(upload_store.complete, upload)
+
+    try:
+        job = job_queue.submit(
+            ingested.path, ingested.sha256, model_name, title=ingested.filename,
+            diarize=settings.DIARIZATION_ENABLED if diarize is None else diarize,
+            profile=profile,
+        )
+    except QueueFullError as e:
+        await ingested.cleanup()
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return JSONResponse(content={"upload_id": upload.id, **job.to_dict()}, status_code=202)
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """
+    Abandon an upload and delete the parts received for it.
+    """
+    upload = await asyncio.to_thread(upload_store.get, upload_id)
+    await asyncio.to_thread(upload_store.abort, upload)
+    return {"upload_id": upload.id, "status": "aborted"}
@@ -2,7 +2,7 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 import os
 from dotenv import load_dotenv
-from typing import ClassVar
+from typing import ClassVar, Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,16 +20,153 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
     # Database Settings
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./meetings.db")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./meetings.db")  # SQLite or postgresql:// URL
+    DB_POOL_SIZE: int = 5  # Connections kept open per engine
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed under load
+    DB_POOL_PRE_PING: bool = True  # Check connections before use (Postgres)
+    DB_POOL_RECYCLE_SECONDS: int = 30 * 60  # Replace connections older than this (Postgres)
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 30.0  # How long a writer waits for SQLite's lock
     
+    # Search Settings
+    SEARCH_INDEX_PATH: str = "./search.db"  # SQLite FTS5 index over stored meetings
+
     # File Upload Settings
-    MAX_FILE_SIZE: int = 25 * 1024 * 1024  # 25MB
+    MAX_FILE_SIZE: int = 25 * 1024 * 1024  # 25MB for single-request uploads; set per deployment
     ALLOWED_EXTENSIONS: set = {".mp3", ".wav", ".m4a"}
 
+    # Resumable Upload Settings
+    RESUMABLE_UPLOAD_DIR: str = "./uploads"  # Unfinished uploads; completed files are moved out of their directory
+    RESUMABLE_MAX_FILE_SIZE: int = 4 * 1024 * 1024 * 1024  # 4GB, a full day of compressed audio
+    RESUMABLE_PART_SIZE: int = 8 * 1024 * 1024  # Default part size offered to clients
+    RESUMABLE_MAX_PART_SIZE: int = 64 * 1024 * 1024  # Request body limit for one part
+    RESUMABLE_UPLOAD_TTL_SECONDS: int = 24 * 60 * 60  # Unfinished uploads idle this long are deleted
+
     # API Keys
     HF_TOKEN: str = os.getenv("HF_TOKEN", "")
     HUGGINGFACE_API_KEY: str = HF_TOKEN  # For compatibility with summarizer
-    
+
+    # Hugging Face Inference API Settings
+    HF_API_BASE_URL: str = "https://api-inference.huggingface.co/models"  # Point at a mock server for tests
+    HF_TIMEOUT_SECONDS: float = 60.0
+    HF_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    HF_MAX_CONNECTIONS: int = 10  # Pooled keep-alive connections
+    HF_MAX_CONCURRENCY: int = 4  # Inference calls in flight at once
+    HF_MAX_RETRIES: int = 3  # Retries on 429 / 503 "model loading"
+    HF_RETRY_BACKOFF_SECONDS: float = 1.0  # Doubles on every retry
+    HF_MAX_RETRY_DELAY_SECONDS: float = 30.0
+
+    # Summarization Settings
+    SUMMARIZER_BACKEND: str = "remote"  # 'remote' (Hugging Face Inference API) or 'local' (in-process)
+    SUMMARIZER_MODEL: str = "facebook/bart-large-cnn"
+    LOCAL_SUMMARIZER_QUANTIZE: bool = True  # int8 dynamic quantization of Linear layers on CPU
+    LOCAL_SUMMARIZER_BATCH_SIZE: int = 8  # Prompts per forward pass
+    LOCAL_SUMMARIZER_BATCH_WAIT_MS: int = 20  # How long to collect prompts before running a batch
+    LOCAL_SUMMARIZER_MAX_INPUT_TOKENS: int = 1024
+    LOCAL_SUMMARIZER_MAX_NEW_TOKENS: int = 142
+    LOCAL_SUMMARIZER_NUM_BEAMS: int = 4
+    SUMMARY_CHUNK_TOKENS: int = 700  # Transcript tokens per call; bart-large-cnn truncates at 1024
+    SUMMARY_MAX_REDUCE_DEPTH: int = 4  # Rounds of reducing partial summaries
+    # 'local': score transcript sentences in process; 'model': prompt the summarization backend
+    ACTION_ITEM_EXTRACTOR: str = "local"
+    ACTION_ITEM_MIN_SCORE: float = 2.5  # Sentence score at which the local extractor reports an item
+
+    # Job Queue Settings
+    JOB_WORKERS: int = 1  # Worker processes, each holding its own Whisper model
+    JOB_QUEUE_MAX_DEPTH: int = 16  # Queued jobs before new submissions get a 429
+    JOB_RESULT_TTL_SECONDS: int = 60 * 60  # How long finished jobs stay queryable
+
+    # Whisper Model Settings
+    WHISPER_MODEL: str = "base"  # Default model: 'tiny', 'base', 'small', 'medium' or 'large'
+    WHISPER_ALLOWED_MODELS: list = ["tiny", "base", "small"]  # Models a request may select
+    WHISPER_PRELOAD_MODELS: list = ["base"]  # Loaded and warmed up at startup
+    # 'background': serve at once and load the preload models in a thread; 'blocking': load before
+    # serving; 'lazy': load each model on first use (API-only or summarize-only processes).
+    # The default preloads because /upload/audio, /transcribe, streams and live decoding run Whisper
+    # in the API process: it imports torch and holds the models' memory from startup so the first
+    # such request doesn't wait for a load. Use 'lazy' where jobs do all the transcription.
+    MODEL_LOAD_MODE: str = "background"
+    WHISPER_MEMORY_BUDGET_MB: int = 2048  # Least recently used models are unloaded beyond this
+    WHISPER_DOWNLOAD_ROOT: Optional[str] = None  # Defaults to ~/.cache/whisper
+    WHISPER_QUANTIZE: bool = False  # int8 dynamic quantization of the Linear layers on CPU
+    WHISPER_QUANTIZED_DIR: str = "./whisper_int8"  # Quantized models, so startup doesn't quantize again
+    TORCH_NUM_THREADS: int = 1  # Intra-op threads per process; chunk workers always use one each
+
+    # Decoding Profile Settings
+    # Ordered from most accurate to fastest; requests step down this list under load
+    DECODING_PROFILES: dict = {
+        "accurate": {
+            "model": "small",
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],  # Fallback when a window fails the thresholds
+            "condition_on_previous_text": True,
+            "compression_ratio_threshold": 2.4,
+            "logprob_threshold": -1.0,
+            "no_speech_threshold": 0.6,
+        },
+        "balanced": {
+            "model": "base",
+            "beam_size": None,  # Greedy
+            "best_of": 5,
+            "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+            "condition_on_previous_text": True,
+            "compression_ratio_threshold": 2.4,
+            "logprob_threshold": -1.0,
+            "no_speech_threshold": 0.6,
+        },
+        "fast": {
+            "model": "tiny",
+            "beam_size": 1,
+            "best_of": 1,
+            "temperature": [0.0],  # No fallback
+            "condition_on_previous_text": False,
+            "compression_ratio_threshold": 2.4,
+            "logprob_threshold": -1.0,
+            "no_speech_threshold": 0.6,
+        },
+    }
+    DEFAULT_DECODING_PROFILE: str = "balanced"
+    UPLOAD_DECODING_PROFILE: str = "fast"  # /upload/audio default; keeps its original tiny model and greedy decoding
+    PROFILE_DEGRADE_QUEUE_DEPTH: int = 4  # Queued jobs at which new jobs step down one profile
+    PROFILE_DEGRADE_AUDIO_SECONDS: float = 30 * 60  # Audio longer than this steps down one profile
+
+    # Decoded Audio Settings
+    PCM_CACHE_ENABLED: bool = True  # Keep decoded 16 kHz PCM next to the upload hash
+    PCM_CACHE_DIR: str = "./pcm_cache"
+    PCM_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB, about 9 hours of audio
+
+    # Speaker Diarization Settings
+    DIARIZATION_ENABLED: bool = False  # Default for requests that don't pass ?diarize=
+    DIARIZATION_MAX_SPEAKERS: int = 8
+    DIARIZATION_THRESHOLD: float = 0.8  # Cosine distance below which windows are the same speaker
+    DIARIZATION_MAX_AGGLOMERATIVE_WINDOWS: int = 600  # Longer meetings are pre-clustered online into this many clusters
+
+    # Chunked Transcription Settings
+    TRANSCRIBE_CHUNKED: bool = False  # Split long audio at silences and transcribe chunks in parallel
+    CHUNK_SECONDS: float = 30.0  # Maximum chunk length (Whisper's native window)
+    CHUNK_OVERLAP_SECONDS: float = 1.0  # Audio shared between neighbouring chunks
+    CHUNK_WORKERS: int = 2  # Worker processes for chunked transcription
+
+    # Batch Processing Settings
+    BATCH_MAX_FILES: int = 500  # Recordings per batch request, including archive members
+    BATCH_MAX_UPLOAD_SIZE: int = 2 * 1024 * 1024 * 1024  # 2GB request body for /batch
+    BATCH_GROUP_SIZE: int = 8  # Recordings handed to a worker at once; clips up to 30s are decoded as one batch
+
+    # Streaming Settings
+    STREAM_WORKERS: int = 2  # Threads decoding windows for /process/stream
+
+    # Live Transcription Settings
+    LIVE_MIN_CHUNK_SECONDS: float = 1.0  # New audio needed before the buffer is decoded again
+    LIVE_MAX_BUFFER_SECONDS: float = 20.0  # Uncommitted audio kept before older segments are committed as-is
+    LIVE_BATCH_SIZE: int = 8  # Session windows decoded in one forward pass
+    LIVE_BATCH_WAIT_MS: int = 50  # How long to collect windows from other sessions before decoding
+    LIVE_MAX_SESSIONS: int = 32  # Concurrent WebSocket sessions per node
+
+    # Result Cache Settings
+    CACHE_ENABLED: bool = True
+    CACHE_PATH: str = "./cache.db"  # SQLite file shared by the API and worker processes
+    CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB of cached transcripts and summaries
+
     # CORS
 CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -1,21 +1,151 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import threading
 from ..config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Drivers for each backend: (sync, async)
+_DRIVERS = {
+    "sqlite": ("sqlite", "sqlite+aiosqlite"),
+    "postgresql": ("postgresql+psycopg2", "postgresql+asyncpg"),
+}
 
-Base = declarative_base()
+
+def database_url(url: str, use_async: bool) -> str:
+    """
+    Point ``url`` (as in Settings.DATABASE_URL) at the sync or async driver
+    for its backend, so one setting serves both engines.
+    """
+    from sqlalchemy.engine import make_url
+
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1))
+    backend = parsed.get_backend_name()
+    if backend not in _DRIVERS:
+        raise ValueError(f"Unsupported database backend '{backend}'; use SQLite or Postgres")
+    return parsed.set(drivername=_DRIVERS[backend][1 if use_async else 0]).render_as_string(hide_password=False)
+
+
+def _engine_options(url: str) -> dict:
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            # One in-memory database per connection; nothing to pool
+            return {}
+        options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+        if parsed.drivername == "sqlite+aiosqlite":
+            # aiosqlite defaults to opening a connection per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def _configure_sqlite(engine):
+    """Use WAL so readers don't block the writer, and wait for locks instead of failing."""
+    from sqlalchemy import event
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_SECONDS * 1000)}")
+        cursor.close()
+
+
+def _create_engine():
+    # Sync engine for threadpool routes and scripts
+    from sqlalchemy import create_engine
+
+    url = database_url(settings.DATABASE_URL, use_async=False)
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        **_engine_options(url),
+    )
+    _configure_sqlite(engine)
+    return engine
+
+
+def _create_session_local():
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(autocommit=False, autoflush=False, bind=_lazy("engine"))
+
+
+def _create_async_engine():
+    # Async engine for async routes and the pipeline's writes
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = database_url(settings.DATABASE_URL, use_async=True)
+    engine = create_async_engine(url, **_engine_options(url))
+    _configure_sqlite(engine.sync_engine)
+    return engine
+
+
+def _create_async_session_local():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(_lazy("async_engine"), expire_on_commit=False, autoflush=False)
+
+
+def _create_base():
+    from sqlalchemy.ext.declarative import declarative_base
+
+    return declarative_base()
+
+
+# engine, SessionLocal, async_engine, AsyncSessionLocal and Base are created
+# on first access, so importing the API (and its routes' dependencies) does
+# not import SQLAlchemy
+_FACTORIES = {
+    "engine": _create_engine,
+    "SessionLocal": _create_session_local,
+    "async_engine": _create_async_engine,
+    "AsyncSessionLocal": _create_async_session_local,
+    "Base": _create_base,
+}
+_factory_lock = threading.RLock()
+
+
+def _lazy(name: str):
+    with _factory_lock:
+        if name not in globals():
+            globals()[name] = _FACTORIES[name]()
+        return globals()[name]
+
+
+def __getattr__(name: str):
+    if name in _FACTORIES:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def dispose_engines():
+    """Close the pooled connections of whichever engines have been created."""
+    if "async_engine" in globals():
+        await globals()["async_engine"].dispose()
+    if "engine" in globals():
+        globals()["engine"].dispose()
 
 # Dependency
 def get_db():
-    db = SessionLocal()
+    db = _lazy("SessionLocal")()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for async routes
+async def get_async_db():
+    async with _lazy("AsyncSessionLocal")() as db:
+        yield db
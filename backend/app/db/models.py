@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Index, Float, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -20,17 +20,41 @@ class Meeting(Base):
     audio_path = Column(String, nullable=True)
     transcript = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     owner = relationship("User", back_populates="meetings")
     action_items = relationship("ActionItem", back_populates="meeting")
 
+    __table_args__ = (
+        # Keyset pagination of a user's meetings, newest first
+        Index("ix_meetings_owner_created_id", "owner_id", "created_at", "id"),
+    )
+
 class ActionItem(Base):
     __tablename__ = "action_items"
 
     id = Column(Integer, primary_key=True, index=True)
     description = Column(Text)
     speaker = Column(String)
+    due_date = Column(Date, nullable=True)
     status = Column(String, default="pending")
-    meeting_id = Column(Integer, ForeignKey("meetings.id"))
-    meeting = relationship("Meeting", back_populates="action_items") 
\ No newline at end of file
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), index=True)
+    meeting = relationship("Meeting", back_populates="action_items")
+
+# A run of consecutive transcript segments packed column by column (see services/segments.py)
+class TranscriptSegmentBlock(Base):
+    __tablename__ = "transcript_segment_blocks"
+
+    id = Column(Integer, primary_key=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False)
+    block_index = Column(Integer, nullable=False)
+    start = Column(Float, nullable=False)  # Seconds; first segment's start
+    end = Column(Float, nullable=False)  # Seconds; latest segment end in the block
+    segment_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        # Blocks of a meeting in order, and range lookups by time
+        Index("ix_segment_blocks_meeting_index", "meeting_id", "block_index", unique=True),
+        Index("ix_segment_blocks_meeting_start", "meeting_id", "start"),
+    )
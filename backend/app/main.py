@@ -1,11 +1,20 @@
 import os
+import asyncio
 import logging
-import torch
-import numpy as np
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api.routes import upload, meetings, transcription, pipeline
+from .api.routes import upload, meetings, transcription, pipeline, jobs, cache, models, search, metrics, batch, live, health, uploads
 from .config import settings
+from .db.base import dispose_engines
+from .services.jobs import job_queue
+from .services.live import shutdown_live_decoders
+from .services.parallel_transcriber import shutdown_parallel_transcribers
+from .services.ingest import UploadSizeLimitMiddleware
+from .services.metrics import MetricsMiddleware
+from .services.model_registry import model_registry
+from .services.summarizer import summarizer
+from .services.uploads import upload_store
 
 # Configure logging
 logging.basicConfig(
@@ -17,14 +26,12 @@ logger = logging.getLogger(__name__)
 # Set environment variables for optimization
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 os.environ["PYTHONUNBUFFERED"] = "1"
-os.environ["OMP_NUM_THREADS"] = "1"  # Limit OpenMP threads
-os.environ["MKL_NUM_THREADS"] = "1"  # Limit MKL threads
+os.environ["OMP_NUM_THREADS"] = str(settings.TORCH_NUM_THREADS)  # Limit OpenMP threads
+os.environ["MKL_NUM_THREADS"] = str(settings.TORCH_NUM_THREADS)  # Limit MKL threads
 os.environ["CUDA_VISIBLE_DEVICES"] = ""  # Disable CUDA
 
-# Configure PyTorch for CPU
-torch.set_num_threads(1)
-torch.set_num_interop_threads(1)
-torch.set_grad_enabled(False)
+# PyTorch and Whisper are imported, and configured for CPU, only when a model
+# is first loaded (see services/model_registry.py)
 
 app = FastAPI(
     title="Meeting Assistant API",
@@ -35,6 +42,18 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Reject oversized uploads while they are still streaming in
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_limits={
+        f"{settings.API_V1_STR}/batch": settings.BATCH_MAX_UPLOAD_SIZE,
+        f"{settings.API_V1_STR}/uploads": settings.RESUMABLE_MAX_PART_SIZE,
+    },
+)
+
+# Count and time every request, including ones rejected for size
+app.add_middleware(MetricsMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -51,9 +70,21 @@ app.add_middleware(
 
 # Include routers
 app.include_router(upload.router, prefix="/api/v1", tags=["upload"])
+app.include_router(uploads.router, prefix="/api/v1", tags=["upload"])
 app.include_router(meetings.router, prefix="/api/v1", tags=["meetings"])
 app.include_router(transcription.router, prefix="/api/v1", tags=["transcription"])
 app.include_router(pipeline.router, prefix="/api/v1", tags=["pipeline"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(cache.router, prefix="/api/v1", tags=["cache"])
+app.include_router(models.router, prefix="/api/v1", tags=["models"])
+app.include_router(search.router, prefix="/api/v1", tags=["search"])
+app.include_router(batch.router, prefix="/api/v1", tags=["batch"])
+app.include_router(live.router, prefix="/api/v1", tags=["live"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(health.router, tags=["health"])
+
+# Background load of the preloaded Whisper models
+_model_loader: Optional[asyncio.Task] = None
 
 @app.get("/")
 async def root():
@@ -61,8 +92,36 @@ async def root():
 
 @app.on_event("startup")
 async def startup_event():
+    global _model_loader
     logger.info("Starting up Meeting Assistant API...")
-    # Clear any existing caches
-    torch.cuda.empty_cache()
-    np.empty(0)
-    logger.info("Meeting Assistant API startup complete") 
\ No newline at end of file
+    # Create any missing tables and indexes. SQLAlchemy is first imported here,
+    # not when the app is imported
+    from .db import models as db_models
+    from .db.base import async_engine
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(db_models.Base.metadata.create_all)
+    # Clear out resumable uploads abandoned while the server was down
+    await asyncio.to_thread(upload_store.prune)
+    # Load and warm up the shared Whisper models; /ready reports when they are loaded
+    if settings.MODEL_LOAD_MODE == "blocking":
+        await asyncio.to_thread(model_registry.startup)
+    elif settings.MODEL_LOAD_MODE == "background":
+        _model_loader = asyncio.create_task(asyncio.to_thread(model_registry.startup, raise_errors=False))
+    # Open the pooled Hugging Face client
+    await summarizer.start()
+    # Start the transcription worker pool
+    await job_queue.start()
+    logger.info("Meeting Assistant API startup complete")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down Meeting Assistant API...")
+    if _model_loader is not None:
+        # A load in progress can't be interrupted; just stop waiting for it
+        _model_loader.cancel()
+    await shutdown_live_decoders()
+    await job_queue.shutdown()
+    await summarizer.close()
+    await dispose_engines()
+    shutdown_parallel_transcribers() 
\ No newline at end of file
@@ -0,0 +1,229 @@
+import calendar
+import logging
+import re
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_FILLER = re.compile(r"^(?:(?:so|okay|ok|alright|all right|right|um+|uh+|and|well|yeah|yes)\b[,.]?\s*)+", re.IGNORECASE)
+
+_WEEKDAYS = [name.lower() for name in calendar.day_name]
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_MONTH = r"(?:" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\b\.?"
+_DEADLINE_PATTERN = (
+    r"\b(?:today|tonight|tomorrow|eod|eow|eom|end of (?:the )?(?:day|week|month)|next week"
+    r"|(?:next )?(?:" + "|".join(_WEEKDAYS) + r")"
+    rf"|{_MONTH} {_DAY}\b|{_DAY} (?:of )?{_MONTH}|the {_DAY}\b)"
+)
+_DEADLINE = re.compile(_DEADLINE_PATTERN, re.IGNORECASE)
+
+# Sentence features: (name, weight, pattern). A sentence scores the weights of
+# the features it has, each counted once. The patterns run over lowercased
+# text; that is about twice as fast as matching with re.IGNORECASE.
+_FEATURES: List[Tuple[str, float, re.Pattern]] = [
+    ("commitment", 2.0, re.compile(
+        r"\b(?:i'll|i will|i'm going to|i am going to|we'll|we will|we're going to|let me|"
+        r"i can take|leave it with me|i'm on it|i've got it)\b")),
+    ("assignment", 2.0, re.compile(
+        r"\b(?:can you|could you|would you|please|you'll|you will|you need to|you should|make sure|"
+        r"assigned to|is going to|will take care)\b")),
+    ("obligation", 1.5, re.compile(
+        r"\b(?:need to|needs to|have to|has to|must|should|got to)\b")),
+    ("action_verb", 1.0, re.compile(
+        r"\b(?:send|email|review|follow up|schedule|prepare|update|draft|share|fix|finish|write|check|"
+        r"set up|book|call|create|look into|reach out|circulate|submit|test|deploy|deliver|organi[sz]e|"
+        r"confirm|investigate|complete|finali[sz]e|coordinate|contact|arrange|order|publish|present|"
+        r"sign off|approve|merge|ship)\b")),
+    ("deadline", 1.5, re.compile(_DEADLINE_PATTERN)),
+    ("marker", 2.5, re.compile(
+        r"\b(?:action items?|to-?dos?|follow-?ups?|next steps?|takeaways?)\b")),
+    ("question", -1.0, re.compile(r"\?$", re.MULTILINE)),
+    ("hedge", -0.75, re.compile(
+        r"\b(?:maybe|might|perhaps|i think|i guess|not sure|probably|if we have time)\b")),
+    ("done", -1.5, re.compile(
+        r"\b(?:already|yesterday|last (?:week|month)|(?:i|we|you|they) did|has been done|have done)\b")),
+]
+_WEIGHTS = tuple(weight for _, weight, _ in _FEATURES)
+
+_FIRST_PERSON = re.compile(r"\b(?:i'll|i will|i'm going to|i am going to|let me|i can take|leave it with me|"
+                           r"i'm on it|i've got it)\b", re.IGNORECASE)
+# Capitalized names only; "Sarah will ..." or "Sarah, can you ..."
+_NAMED_OWNER = re.compile(
+    r"\b([A-Z][a-z]+)(?:,? (?:can|could|would) you| (?:will|should|needs to|has to|is going to)\b)"
+    r"|\bassigned to ([A-Z][a-z]+)"
+)
+_NOT_NAMES = {
+    "I", "We", "You", "They", "He", "She", "It", "This", "That", "Someone", "Somebody", "Everyone",
+    "Everybody", "Who", "What", "Then", "So", "And", "But", "Also", "Okay", "Well", "There", "Which",
+    "Nobody", "Anyone", "One", "Team", "Please", *calendar.day_name, *calendar.month_name[1:],
+}
+
+
+def _sentences(transcript: str, segments: Optional[Sequence[dict]]) -> Tuple[List[str], List[Optional[str]]]:
+    """
+    Split into sentences with the speaker of each. With segments,
+    consecutive segments of one speaker are joined into a turn first, since
+    Whisper segments often break mid-sentence.
+    """
+    turns: List[Tuple[str, Optional[str]]] = []
+    if segments:
+        for segment in segments:
+            speaker = segment.get("speaker")
+            if turns and turns[-1][1] == speaker:
+                turns[-1] = (f"{turns[-1][0]} {segment['text']}", speaker)
+            else:
+                turns.append((segment["text"], speaker))
+    else:
+        turns.append((transcript, None))
+
+    sentences, speakers = [], []
+    for text, speaker in turns:
+        for sentence in _SENTENCE_END.split(" ".join(text.split())):
+            if sentence:
+                sentences.append(sentence)
+                speakers.append(speaker)
+    return sentences, speakers
+
+
+def score_sentences(sentences: Sequence[str]) -> "np.ndarray":
+    """
+    Score every sentence for how much it reads like an action item.
+
+    The sentences are joined into one text, one per line, and each feature
+    pattern runs over it once; matches are mapped back to their sentences by
+    offset, so the cost is a few regex passes however many sentences there
+    are.
+    """
+    import numpy as np
+
+    if not sentences:
+        return np.zeros(0, dtype=np.float32)
+    # Lowercased one by one so the offsets stay right if lowercasing changes a length
+    sentences = [sentence.lower() for sentence in sentences]
+    text = "\n".join(sentences)
+    lengths = np.fromiter((len(s) + 1 for s in sentences), dtype=np.int64, count=len(sentences))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    features = np.zeros((len(_FEATURES), len(sentences)), dtype=np.float32)
+    for row, (_, _, pattern) in enumerate(_FEATURES):
+        offsets = np.fromiter((m.start() for m in pattern.finditer(text)), dtype=np.int64)
+        if offsets.size:
+            features[row, np.searchsorted(starts, offsets, side="right") - 1] = 1.0
+    return np.array(_WEIGHTS, dtype=np.float32) @ features
+
+
+def resolve_due_date(phrase: str, reference: date) -> Optional[date]:
+    """
+    Turn a deadline phrase ("by Friday", "end of the month", "March 3rd")
+    into a date, counting from ``reference`` (the meeting date). A bare
+    weekday means the next one after the reference date.
+    """
+    phrase = phrase.lower().rstrip(".")
+    if phrase in ("today", "tonight", "eod", "end of day", "end of the day"):
+        return reference
+    if phrase == "tomorrow":
+        return reference + timedelta(days=1)
+    if phrase in ("eow", "end of week", "end of the week"):
+        return reference + timedelta(days=(4 - reference.weekday()) % 7)
+    if phrase in ("eom", "end of month", "end of the month"):
+        return reference.replace(day=calendar.monthrange(reference.year, reference.month)[1])
+    next_monday = reference + timedelta(days=7 - reference.weekday())
+    if phrase == "next week":
+        return next_monday
+    words = phrase.split()
+    if words[-1] in _WEEKDAYS:
+        weekday = _WEEKDAYS.index(words[-1])
+        if words[0] == "next":
+            return next_monday + timedelta(days=weekday)
+        return reference + timedelta(days=(weekday - reference.weekday() - 1) % 7 + 1)
+
+    day = next((int(re.sub(r"\D", "", w)) for w in words if w[0].isdigit()), None)
+    month = next((_MONTHS[w.rstrip(".")] for w in words if w.rstrip(".") in _MONTHS), None)
+    if day is None:
+        return None
+    if month is None:
+        # "the 15th": this month, or the next month that has that day once it has passed
+        for ahead in range(12):
+            year, index = divmod(reference.month - 1 + ahead, 12)
+            year += reference.year
+            if 1 <= day <= calendar.monthrange(year, index + 1)[1]:
+                due = date(year, index + 1, day)
+                if due >= reference:
+                    return due
+        return None
+    try:
+        due = date(reference.year, month, day)
+        return due if due >= reference else due.replace(year=reference.year + 1)
+    except ValueError:
+        return None
+
+
+def structure_item(description: str, speaker: Optional[str] = None,
+                   reference: Optional[date] = None) -> dict:
+    """
+    Build an action item from its sentence: the ``owner`` is the speaker for
+    a first-person commitment or a name the task is addressed to, and the
+    ``due_date`` (ISO format) comes from a deadline phrase.
+    """
+    reference = reference or date.today()
+    description = _FILLER.sub("", description).strip()
+    description = description[:1].upper() + description[1:]
+
+    owner = None
+    if _FIRST_PERSON.search(description):
+        owner = speaker
+    else:
+        for match in _NAMED_OWNER.finditer(description):
+            name = match.group(1) or match.group(2)
+            if name not in _NOT_NAMES:
+                owner = name
+                break
+
+    deadline = _DEADLINE.search(description)
+    due = resolve_due_date(deadline.group(0), reference) if deadline else None
+    return {
+        "description": description,
+        "speaker": speaker,
+        "owner": owner,
+        "due_date": due.isoformat() if due else None,
+    }
+
+
+def extract_action_items(transcript: str, segments: Optional[Sequence[dict]] = None,
+                         reference: Optional[date] = None, min_score: Optional[float] = None) -> List[dict]:
+    """
+    Find the action items in a transcript without calling a model.
+
+    Sentences are scored for commitments, assignments, obligations, action
+    verbs and deadlines, and those scoring at least ``min_score`` (default:
+    settings.ACTION_ITEM_MIN_SCORE) become items, in transcript order. With
+    ``segments`` carrying speaker labels each item has its ``speaker``.
+
+    Returns:
+        List[dict]: ``{"description", "speaker", "owner", "due_date"}`` per item
+    """
+    import numpy as np
+
+    min_score = settings.ACTION_ITEM_MIN_SCORE if min_score is None else min_score
+    sentences, speakers = _sentences(transcript, segments)
+    scores = score_sentences(sentences)
+
+    items, seen = [], set()
+    for index in np.flatnonzero(scores >= min_score):
+        item = structure_item(sentences[index], speakers[index], reference)
+        key = item["description"].lower()
+        if key not in seen:
+            seen.add(key)
+            items.append(item)
+    logger.info(f"Extracted {len(items)} action item(s) from {len(sentences)} sentence(s)")
+    return items
@@ -0,0 +1,122 @@
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from ..config import settings
+from .metrics import stage_timer, DECODE_CACHE_HITS
+from .vad import SAMPLE_RATE
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bytes per decoded sample (float32)
+SAMPLE_BYTES = 4
+
+_evict_lock = threading.Lock()
+
+
+class AudioDecodeError(ValueError):
+    """Raised when a file cannot be decoded to audio."""
+
+
+def _run_ffmpeg(file_path: str, out_path: str):
+    """Decode any ffmpeg-readable file to raw float32 16 kHz mono PCM on disk."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-threads", "0",
+        "-i", file_path,
+        "-vn", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        out_path,
+    ]
+    with stage_timer("decode"):
+        result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        logger.error(f"ffmpeg failed to decode {file_path}: {result.stderr.decode(errors='replace').strip()}")
+        raise AudioDecodeError("Invalid audio file format")
+    if os.path.getsize(out_path) < SAMPLE_BYTES:
+        # Decoded fine but there was no audio stream in it
+        raise AudioDecodeError("Invalid audio file format")
+
+
+def _map(path: str) -> "np.ndarray":
+    import numpy as np
+
+    # Copy-on-write so Whisper can wrap it in a tensor without touching the file
+    return np.memmap(path, dtype=np.float32, mode="c")
+
+
+def _evict_pcm_cache(cache_dir: str, max_bytes: int):
+    """Delete the least recently used decoded files until the cache fits its budget."""
+    with _evict_lock:
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith(".f32"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+def load_pcm(file_path: str, audio_hash: Optional[str] = None) -> "np.ndarray":
+    """
+    Decode an audio file once into float32 16 kHz mono samples.
+
+    The samples are written to disk by ffmpeg and memory-mapped, so even very
+    long recordings are paged in on demand rather than copied into memory. A
+    successful decode is also the validation: files ffmpeg can't read, or that
+    contain no audio, raise AudioDecodeError.
+
+    With ``audio_hash`` and the PCM cache enabled, the decoded file is kept
+    under the hash, so retries and re-transcriptions with other models skip
+    decoding entirely.
+
+    Raises:
+        AudioDecodeError: If the file isn't decodable audio
+    """
+    if audio_hash and settings.PCM_CACHE_ENABLED:
+        os.makedirs(settings.PCM_CACHE_DIR, exist_ok=True)
+        cached_path = os.path.join(settings.PCM_CACHE_DIR, f"{audio_hash}.f32")
+        if os.path.exists(cached_path):
+            os.utime(cached_path)  # Mark as recently used
+            DECODE_CACHE_HITS.inc()
+            logger.info(f"Decoded audio cache hit for {audio_hash[:12]}")
+            return _map(cached_path)
+
+        fd, temp_path = tempfile.mkstemp(suffix=".f32", dir=settings.PCM_CACHE_DIR)
+        os.close(fd)
+        try:
+            _run_ffmpeg(file_path, temp_path)
+            os.replace(temp_path, cached_path)  # Atomic, so readers never see a partial file
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        audio = _map(cached_path)
+        _evict_pcm_cache(settings.PCM_CACHE_DIR, settings.PCM_CACHE_MAX_BYTES)
+        return audio
+
+    fd, temp_path = tempfile.mkstemp(suffix=".f32")
+    os.close(fd)
+    try:
+        _run_ffmpeg(file_path, temp_path)
+        return _map(temp_path)
+    finally:
+        # The mapping stays valid after the file is unlinked
+        os.unlink(temp_path)
+
+
+def duration_seconds(audio: "np.ndarray") -> float:
+    """Length of decoded audio in seconds."""
+    return len(audio) / SAMPLE_RATE
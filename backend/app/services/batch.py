@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+from ..config import settings
+from .ingest import IngestedFile
+from .jobs import job_queue
+from .metrics import STAGE_ERRORS
+from .streaming import format_sse
+from .summarizer import summarizer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One recording in a batch: either ingested to disk or rejected with an error."""
+    index: int
+    filename: str
+    file: Optional[IngestedFile] = None
+    error: Optional[str] = None
+
+    def cleanup(self):
+        """Delete the item's file from disk if it still exists."""
+        if self.file is not None and os.path.exists(self.file.path):
+            os.unlink(self.file.path)
+
+
+def cleanup_items(items: List[BatchItem]):
+    for item in items:
+        item.cleanup()
+
+
+def _failed(item: BatchItem, error: str) -> dict:
+    return {"index": item.index, "filename": item.filename, "status": "failed", "error": error}
+
+
+def _group(items: List[BatchItem], size: int) -> List[List[BatchItem]]:
+    """
+    Split items into worker-sized groups of similar recordings.
+
+    Sorting by format and size puts clips of about the same length together,
+    so the short ones in a group can be decoded as one batch.
+    """
+    ordered = sorted(items, key=lambda item: (item.file.extension, item.file.size))
+    size = max(1, size)
+    return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+
+async def _finish_item(item: BatchItem, outcome: dict) -> dict:
+    """Summarize and store one transcribed item."""
+    try:
+        if "error" in outcome:
+            return _failed(item, outcome["error"])
+
+        transcript = outcome["transcript"]
+        summary, action_items = await summarizer.summarize(transcript, outcome.get("segments"))
+        result = {
+            "transcript": transcript,
+            "summary": summary,
+            "action_items": action_items,
+            "segments": outcome.get("segments", []),
+        }
+        try:
+            from .meeting_store import persist_result
+
+            result["meeting_id"] = await persist_result(item.filename, result)
+        except Exception as e:
+            # The result is still useful to the caller even if it couldn't be stored
+            logger.error(f"Failed to store meeting for batch item {item.filename}: {str(e)}")
+            result["meeting_id"] = None
+        return {
+            "index": item.index,
+            "filename": item.filename,
+            "status": "completed",
+            "model": outcome.get("model"),
+            "profile": outcome.get("profile"),
+            "real_time_factor": outcome.get("real_time_factor"),
+            **result,
+        }
+    except Exception as e:
+        logger.error(f"Batch item {item.filename} failed: {str(e)}")
+        return _failed(item, str(e))
+    finally:
+        item.cleanup()
+
+
+async def stream_batch(items: List[BatchItem], model_name: Optional[str] = None,
+                       profile: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Process a batch of recordings, yielding Server-Sent Events as items finish.
+
+    Items are handed to the job queue's worker processes in groups of
+    ``settings.BATCH_GROUP_SIZE``. Groups share the queue's worker slots and
+    only get one while no job is waiting, so interactive jobs are never stuck
+    behind a whole batch; each batch has at most one group per worker
+    outstanding, which bounds its share of the queue's backlog. Each item is
+    summarized and stored as soon as its group is transcribed. ``profile`` is
+    the decoding profile and ``model_name`` overrides its Whisper model.
+
+    Events: ``item`` once per recording (in completion order, with its
+    ``index`` in the request) carrying either the result or its own
+    ``error``, then ``done`` with the counts. If the consumer stops iterating,
+    no further groups are started.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    outstanding = asyncio.Semaphore(job_queue.workers)
+    completed = failed = 0
+
+    async def run_group(group: List[BatchItem]):
+        async with outstanding:
+            try:
+                outcomes = await job_queue.transcribe_batch(
+                    [(item.file.path, item.file.sha256) for item in group], model_name, profile
+                )
+            except Exception as e:
+                logger.error(f"Batch group of {len(group)} item(s) failed: {str(e)}")
+                STAGE_ERRORS.inc(stage="batch")
+                outcomes = [{"error": str(e)}] * len(group)
+
+        # Summarization is network-bound, so the worker is released first
+        async def finish(item: BatchItem, outcome: dict):
+            results.put_nowait(await _finish_item(item, outcome))
+
+        await asyncio.gather(*(finish(item, outcome) for item, outcome in zip(group, outcomes)))
+
+    ready = [item for item in items if item.file is not None]
+    groups = _group(ready, settings.BATCH_GROUP_SIZE)
+    tasks = [asyncio.create_task(run_group(group)) for group in groups]
+    try:
+        yield format_sse("progress", {"stage": "processing", "items": len(items), "groups": len(groups)})
+        for item in items:
+            if item.file is None:
+                failed += 1
+                yield format_sse("item", _failed(item, item.error))
+
+        for _ in range(len(ready)):
+            entry = await results.get()
+            if entry["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+            yield format_sse("item", entry)
+
+        yield format_sse("done", {"items": len(items), "completed": completed, "failed": failed})
+    finally:
+        # Client went away or the batch finished; stop anything still pending
+        for task in tasks:
+            task.cancel()
+        cleanup_items(items)
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+from ..config import settings
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTS = "transcripts"
+SUMMARIES = "summaries"
+SUMMARY_CHUNKS = "summary_chunks"
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 of a string, used to key summaries by transcript content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent, content-addressed cache for transcripts and summaries.
+
+    Entries live in a SQLite file so they survive restarts and are shared
+    between the API process and the transcription workers. Once the stored
+    values exceed ``max_bytes`` the least recently used entries are evicted.
+    Hit and miss counters are kept in the same database.
+
+    Lookups and writes block, for up to the database's busy timeout while
+    a worker process holds the write lock; code on the event loop uses
+    get_async and set_async.
+    """
+
+    def __init__(self, path: str, max_bytes: int, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access);
+                CREATE TABLE IF NOT EXISTS counters (
+                    namespace TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(namespace: str, key_parts: Sequence[Any]) -> str:
+        """Build a stable key from a namespace and JSON-serializable parts."""
+        raw = json.dumps([namespace, *key_parts], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key_parts: Sequence[Any]) -> Optional[Any]:
+        """Return the cached value for the key parts, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = self.make_key(namespace, key_parts)
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                    column = "hits" if row is not None else "misses"
+                    conn.execute(
+                        f"INSERT INTO counters (namespace, {column}) VALUES (?, 1) "
+                        f"ON CONFLICT(namespace) DO UPDATE SET {column} = {column} + 1",
+                        (namespace,),
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Cache lookup failed: {str(e)}")
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    async def get_async(self, namespace: str, key_parts: Sequence[Any]) -> Optional[Any]:
+        """get() in a thread, so a lookup never stalls the event loop."""
+        return await asyncio.to_thread(self.get, namespace, key_parts)
+
+    def set(self, namespace: str, key_parts: Sequence[Any], value: Any):
+        """Store a JSON-serializable value and evict old entries if over budget."""
+        if not self.enabled:
+            return
+        key = self.make_key(namespace, key_parts)
+        payload = json.dumps(value)
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, namespace, value, size, last_access) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, namespace, payload, len(payload), time.time()),
+                    )
+                    # Drop everything past the byte budget, most recently used first
+                    conn.execute("""
+                        DELETE FROM entries WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (ORDER BY last_access DESC) AS running
+                                FROM entries
+                            ) WHERE running > ?
+                        )
+                    """, (self.max_bytes,))
+        except sqlite3.Error as e:
+            logger.error(f"Cache write failed: {str(e)}")
+
+    async def set_async(self, namespace: str, key_parts: Sequence[Any], value: Any):
+        """set() in a thread, so a write never stalls the event loop."""
+        await asyncio.to_thread(self.set, namespace, key_parts, value)
+
+    def stats(self) -> dict:
+        """Entry counts, stored bytes and hit/miss counters per namespace."""
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            conn = self._connect()
+            sizes = conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace"
+            ).fetchall()
+            counters = conn.execute("SELECT namespace, hits, misses FROM counters").fetchall()
+
+        namespaces = {}
+        for namespace, entries, size in sizes:
+            namespaces.setdefault(namespace, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0})
+            namespaces[namespace].update(entries=entries, bytes=size)
+        for namespace, hits, misses in counters:
+            namespaces.setdefault(namespace, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0})
+            namespaces[namespace].update(hits=hits, misses=misses)
+        return {
+            "enabled": True,
+            "max_bytes": self.max_bytes,
+            "bytes": sum(ns["bytes"] for ns in namespaces.values()),
+            "namespaces": namespaces,
+        }
+
+    def counters(self, column: str) -> dict:
+        """Hit or miss totals per namespace, keyed by a one-element tuple for the metrics registry."""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(f"SELECT namespace, {column} FROM counters").fetchall()
+        return {(namespace,): value for namespace, value in rows}
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM entries")
+                conn.execute("DELETE FROM counters")
+
+
+# Create a singleton instance
+result_cache = ResultCache(
+    path=settings.CACHE_PATH,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    enabled=settings.CACHE_ENABLED,
+)
+
+# Read from the cache database, so lookups made in worker processes are included
+registry.register_callback("cache_hits_total", "Result cache hits.", "counter",
+                           lambda: result_cache.counters("hits"), ("namespace",))
+registry.register_callback("cache_misses_total", "Result cache misses.", "counter",
+                           lambda: result_cache.counters("misses"), ("namespace",))
@@ -0,0 +1,425 @@
+import functools
+import logging
+import re
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from .vad import SAMPLE_RATE, frame_energies, speech_mask
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Short-time analysis: 25 ms frames every 10 ms
+FRAME_LEN = 400
+HOP_LEN = 160
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 20
+
+# Frames transformed per step, to bound memory on long recordings
+FRAME_BLOCK = 20000
+
+# Speaker embedding windows over speech
+WINDOW_SECONDS = 1.5
+WINDOW_HOP_SECONDS = 0.75
+MIN_WINDOW_SECONDS = 0.4
+
+# Clusters with fewer windows than this share are folded into their nearest neighbour
+MIN_SPEAKER_FRACTION = 0.05
+
+# VAD frame length and how short a pause is bridged when finding speech regions
+VAD_FRAME_MS = 30
+MAX_GAP_MS = 240
+
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "be", "by", "for", "from", "i", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "we", "will", "with", "you",
+}
+
+
+def _mel_filterbank(n_fft: int, n_mels: int) -> "np.ndarray":
+    """Triangular mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    import numpy as np
+
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    points = mel_to_hz(np.linspace(hz_to_mel(0), hz_to_mel(SAMPLE_RATE / 2), n_mels + 2))
+    bins = np.floor((n_fft + 1) * points / SAMPLE_RATE).astype(int)
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, centre, right = bins[m - 1], bins[m], bins[m + 1]
+        if centre > left:
+            filters[m - 1, left:centre] = (np.arange(left, centre) - left) / (centre - left)
+        if right > centre:
+            filters[m - 1, centre:right] = (right - np.arange(centre, right)) / (right - centre)
+    return filters
+
+
+def _dct_matrix(n_in: int, n_out: int) -> "np.ndarray":
+    """Orthonormal DCT-II basis, shape (n_out, n_in)."""
+    import numpy as np
+
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2 / n_in)
+    basis[0] /= np.sqrt(2)
+    return basis.astype(np.float32)
+
+
+@functools.lru_cache(maxsize=None)
+def _analysis_matrices() -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """The mel filterbank, DCT and window, built on first use."""
+    import numpy as np
+
+    filterbank = _mel_filterbank(N_FFT, N_MELS)
+    # c0 is overall loudness, which says more about the microphone than the speaker
+    dct = _dct_matrix(N_MELS, N_MFCC + 1)[1:]
+    window = np.hamming(FRAME_LEN).astype(np.float32)
+    return filterbank, dct, window
+
+
+def frame_features(audio: "np.ndarray") -> "np.ndarray":
+    """
+    MFCCs for every 10 ms frame of the audio, shape (n_frames, N_MFCC).
+
+    Frames are cut with a strided view and transformed a block at a time,
+    so the work is a handful of large FFTs and matrix products.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import as_strided
+
+    if len(audio) < FRAME_LEN:
+        return np.zeros((0, N_MFCC), dtype=np.float32)
+    n_frames = 1 + (len(audio) - FRAME_LEN) // HOP_LEN
+    filterbank, dct, window = _analysis_matrices()
+    features = np.empty((n_frames, N_MFCC), dtype=np.float32)
+    for first in range(0, n_frames, FRAME_BLOCK):
+        count = min(FRAME_BLOCK, n_frames - first)
+        start = first * HOP_LEN
+        block = np.ascontiguousarray(audio[start:start + (count - 1) * HOP_LEN + FRAME_LEN], dtype=np.float32)
+        frames = as_strided(block, shape=(count, FRAME_LEN), strides=(HOP_LEN * 4, 4))
+        # Pre-emphasis flattens the spectral tilt of voiced speech
+        emphasized = np.empty_like(frames)
+        emphasized[:, 0] = frames[:, 0]
+        emphasized[:, 1:] = frames[:, 1:] - 0.97 * frames[:, :-1]
+        power = np.abs(np.fft.rfft(emphasized * window, n=N_FFT)) ** 2
+        features[first:first + count] = np.log(power @ filterbank.T + 1e-10) @ dct.T
+    return features
+
+
+def speech_regions(audio: "np.ndarray") -> List[Tuple[int, int]]:
+    """(start, end) sample offsets of speech, with short pauses bridged."""
+    import numpy as np
+
+    speech = speech_mask(frame_energies(audio, VAD_FRAME_MS))
+    if not speech.any():
+        return []
+    frame_len = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    padded = np.concatenate(([False], speech, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+
+    max_gap = MAX_GAP_MS // VAD_FRAME_MS
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] <= max_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    return [(start * frame_len, end * frame_len) for start, end in regions]
+
+
+def embedding_windows(regions: Sequence[Tuple[int, int]]) -> "np.ndarray":
+    """Split speech regions into overlapping windows, shape (n, 2) in samples."""
+    import numpy as np
+
+    window = int(WINDOW_SECONDS * SAMPLE_RATE)
+    hop = int(WINDOW_HOP_SECONDS * SAMPLE_RATE)
+    minimum = int(MIN_WINDOW_SECONDS * SAMPLE_RATE)
+    bounds = []
+    for start, end in regions:
+        if end - start < minimum:
+            continue
+        if end - start <= window:
+            bounds.append((start, end))
+            continue
+        for offset in range(start, end - window + 1, hop):
+            bounds.append((offset, offset + window))
+        if bounds[-1][1] < end - hop // 2:
+            bounds.append((end - window, end))
+    return np.asarray(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+def window_embeddings(features: "np.ndarray", bounds: "np.ndarray") -> "np.ndarray":
+    """
+    Mean and standard deviation of the MFCCs inside each window, for all
+    windows at once from running sums, then normalized across the recording
+    and scaled to unit length so a dot product is a cosine similarity.
+    """
+    import numpy as np
+
+    csum = np.vstack([np.zeros((1, features.shape[1])), np.cumsum(features, axis=0, dtype=np.float64)])
+    csq = np.vstack([np.zeros((1, features.shape[1])), np.cumsum(np.square(features, dtype=np.float64), axis=0)])
+    first = np.minimum(bounds[:, 0] // HOP_LEN, len(features) - 1)
+    last = np.clip((bounds[:, 1] - FRAME_LEN) // HOP_LEN + 1, first + 1, len(features))
+    count = (last - first)[:, None]
+    mean = (csum[last] - csum[first]) / count
+    std = np.sqrt(np.maximum((csq[last] - csq[first]) / count - mean ** 2, 0))
+
+    embeddings = np.hstack([mean, std])
+    embeddings -= embeddings.mean(axis=0)
+    embeddings /= embeddings.std(axis=0) + 1e-8
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+    return embeddings.astype(np.float32)
+
+
+def agglomerative_cluster(embeddings: "np.ndarray", threshold: float, max_speakers: int,
+                          sizes: Optional["np.ndarray"] = None) -> "np.ndarray":
+    """
+    Average-linkage clustering on cosine distance.
+
+    Merges the closest pair of clusters until the closest pair is further
+    apart than ``threshold`` and no more than ``max_speakers`` remain.
+    ``sizes`` weights each input, for clustering centroids of earlier clusters.
+
+    Returns:
+        np.ndarray: A cluster id per embedding
+    """
+    import numpy as np
+
+    n = len(embeddings)
+    labels = np.arange(n)
+    if n < 2:
+        return labels
+    distances = 1.0 - embeddings.astype(np.float64) @ embeddings.T.astype(np.float64)
+    np.fill_diagonal(distances, np.inf)
+    sizes = np.ones(n) if sizes is None else sizes.astype(np.float64).copy()
+
+    clusters = n
+    while clusters > 1:
+        i, j = np.unravel_index(np.argmin(distances), distances.shape)
+        if distances[i, j] > threshold and clusters <= max_speakers:
+            break
+        # Lance-Williams update for average linkage
+        merged = (sizes[i] * distances[i] + sizes[j] * distances[j]) / (sizes[i] + sizes[j])
+        distances[i, :] = merged
+        distances[:, i] = merged
+        distances[i, i] = np.inf
+        distances[j, :] = np.inf
+        distances[:, j] = np.inf
+        sizes[i] += sizes[j]
+        labels[labels == j] = i
+        clusters -= 1
+    return labels
+
+
+def online_cluster(embeddings: "np.ndarray", threshold: float,
+                   max_clusters: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Single pass over the windows in time order, assigning each to the
+    nearest running centroid or starting a new cluster.
+
+    At most ``max_clusters`` clusters are kept: when a new one would exceed
+    that, the two closest are merged. Centroid similarities are kept in a
+    preallocated matrix that is updated one row at a time, with an upper
+    bound on each row's largest entry, so finding the closest pair rarely scans
+    the whole matrix.
+
+    Returns:
+        (labels, unit-length centroids, cluster sizes)
+    """
+    import numpy as np
+
+    capacity = max(1, min(max_clusters, len(embeddings)))
+    labels = np.empty(len(embeddings), dtype=np.int64)
+    # One spare row holds a new cluster until the closest pair is merged
+    sums = np.zeros((capacity + 1, embeddings.shape[1]), dtype=np.float64)
+    centroids = np.zeros_like(sums)
+    similarity = np.full((capacity + 1, capacity + 1), -np.inf)
+    row_bound = np.full(capacity + 1, -np.inf)
+    count = 0
+
+    def update_similarity(row: int):
+        similarity[row, :count] = similarity[:count, row] = centroids[:count] @ centroids[row]
+        similarity[row, row] = -np.inf
+        np.maximum(row_bound[:count], similarity[:count, row], out=row_bound[:count])
+        row_bound[row] = similarity[row, :count].max()
+
+    def closest_pair() -> Tuple[int, int]:
+        while True:
+            row = int(np.argmax(row_bound[:count]))
+            column = int(np.argmax(similarity[row, :count]))
+            if similarity[row, column] >= row_bound[row]:
+                return row, column
+            # The bound was stale; tighten it and look again
+            row_bound[row] = similarity[row, column]
+
+    for index, embedding in enumerate(embeddings):
+        if count:
+            similarities = centroids[:count] @ embedding
+            best = int(np.argmax(similarities))
+            if 1.0 - similarities[best] <= threshold:
+                sums[best] += embedding
+                centroids[best] = sums[best] / np.linalg.norm(sums[best])
+                update_similarity(best)
+                labels[index] = best
+                continue
+        sums[count] = centroids[count] = embedding
+        labels[index] = count
+        count += 1
+        update_similarity(count - 1)
+        if count <= capacity:
+            continue
+
+        # Merge the closest pair into the lower slot and move the last cluster into the freed one
+        first, second = sorted(closest_pair())
+        seen = labels[:index + 1]
+        seen[seen == second] = first
+        sums[first] += sums[second]
+        centroids[first] = sums[first] / np.linalg.norm(sums[first])
+        count -= 1
+        if second != count:
+            sums[second] = sums[count]
+            centroids[second] = centroids[count]
+            seen[seen == count] = second
+        similarity[count, :] = similarity[:, count] = -np.inf
+        row_bound[count] = -np.inf
+        update_similarity(first)
+        if second != count:
+            update_similarity(second)
+    return labels, centroids[:count].astype(np.float32), np.bincount(labels, minlength=count)
+
+
+def absorb_small_clusters(embeddings: "np.ndarray", labels: "np.ndarray", min_fraction: float) -> "np.ndarray":
+    """
+    Reassign windows in clusters holding less than ``min_fraction`` of all
+    windows to the nearest larger cluster; these are usually coughs, laughter
+    or crosstalk rather than another speaker.
+    """
+    import numpy as np
+
+    ids, counts = np.unique(labels, return_counts=True)
+    keep = ids[counts >= max(2, min_fraction * len(labels))]
+    if len(keep) == 0 or len(keep) == len(ids):
+        return labels
+    centroids = np.stack([embeddings[labels == k].mean(axis=0) for k in keep])
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-8
+    small = ~np.isin(labels, keep)
+    labels = labels.copy()
+    labels[small] = keep[np.argmax(embeddings[small] @ centroids.T, axis=1)]
+    return labels
+
+
+def cluster_speakers(embeddings: "np.ndarray", threshold: float, max_speakers: int,
+                     max_agglomerative: int) -> "np.ndarray":
+    """
+    Agglomerative clustering for short meetings. For long ones, an online
+    pass with a tighter threshold first groups the windows into at most
+    ``max_agglomerative`` small clusters, and only their centroids are
+    clustered agglomeratively.
+    """
+    if len(embeddings) <= max_agglomerative:
+        labels = agglomerative_cluster(embeddings, threshold, max_speakers)
+    else:
+        window_labels, centroids, sizes = online_cluster(embeddings, threshold / 2, max_agglomerative)
+        labels = agglomerative_cluster(centroids, threshold, max_speakers, sizes=sizes)[window_labels]
+    return absorb_small_clusters(embeddings, labels, MIN_SPEAKER_FRACTION)
+
+
+def assign_speakers(segments: List[dict], bounds: "np.ndarray", labels: "np.ndarray") -> List[dict]:
+    """
+    Give each transcript segment the speaker whose windows overlap it most.
+    Speakers are named "Speaker 1", "Speaker 2", ... in order of first appearance.
+    """
+    import numpy as np
+
+    if len(bounds) == 0:
+        return [{**segment, "speaker": None} for segment in segments]
+    starts = bounds[:, 0] / SAMPLE_RATE
+    ends = bounds[:, 1] / SAMPLE_RATE
+    centres = (starts + ends) / 2
+    names = {}
+    assigned = []
+    for segment in segments:
+        overlap = np.clip(np.minimum(ends, segment["end"]) - np.maximum(starts, segment["start"]), 0, None)
+        if overlap.any():
+            votes = np.bincount(labels, weights=overlap)
+            label = int(np.argmax(votes))
+        else:
+            # No speech window inside the segment; use the nearest one
+            label = int(labels[np.argmin(np.abs(centres - (segment["start"] + segment["end"]) / 2))])
+        name = names.setdefault(label, f"Speaker {len(names) + 1}")
+        assigned.append({**segment, "speaker": name})
+    return assigned
+
+
+def diarize_segments(audio: "np.ndarray", segments: List[dict]) -> List[dict]:
+    """
+    Label Whisper segments (dicts with ``start`` and ``end`` in seconds) with
+    speakers, using only the CPU and no models.
+
+    Speech found by the VAD is cut into overlapping 1.5s windows; each window
+    is embedded as the mean and spread of its MFCCs, and the windows are
+    clustered into speakers. The cost is a few FFTs per second of audio, a
+    small fraction of Whisper's.
+    """
+    if not segments:
+        return []
+    bounds = embedding_windows(speech_regions(audio))
+    if len(bounds) == 0:
+        return [{**segment, "speaker": None} for segment in segments]
+    embeddings = window_embeddings(frame_features(audio), bounds)
+    labels = cluster_speakers(
+        embeddings,
+        threshold=settings.DIARIZATION_THRESHOLD,
+        max_speakers=settings.DIARIZATION_MAX_SPEAKERS,
+        max_agglomerative=settings.DIARIZATION_MAX_AGGLOMERATIVE_WINDOWS,
+    )
+    assigned = assign_speakers(segments, bounds, labels)
+    logger.info(
+        f"Diarized {len(segments)} segment(s) from {len(bounds)} window(s) "
+        f"into {len({s['speaker'] for s in assigned})} speaker(s)"
+    )
+    return assigned
+
+
+def _content_words(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def attribute_action_items(action_items: List[dict], segments: List[dict],
+                           min_overlap: float = 0.3) -> List[dict]:
+    """
+    Attribute each action item without a speaker to the speaker of the
+    transcript segment that shares the most of its content words, if enough
+    of them are shared. Items are dicts as returned by the summarizer (plain
+    description strings are accepted too).
+
+    Returns:
+        List[dict]: The items with ``speaker`` filled in where found; speaker may be None
+    """
+    segment_words = [(_content_words(segment["text"]), segment.get("speaker")) for segment in segments]
+    attributed = []
+    for item in action_items:
+        item = dict(item) if isinstance(item, dict) else {"description": item, "speaker": None}
+        if item.get("speaker"):
+            attributed.append(item)
+            continue
+        words = _content_words(item["description"])
+        best_score, speaker = min_overlap, None
+        for seg_words, seg_speaker in segment_words:
+            if not words or not seg_speaker:
+                continue
+            score = len(words & seg_words) / len(words)
+            if score > best_score or (speaker is None and score == best_score):
+                best_score, speaker = score, seg_speaker
+        item["speaker"] = speaker
+        attributed.append(item)
+    return attributed
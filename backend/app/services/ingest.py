@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import os
+import tarfile
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+import aiofiles.tempfile
+from fastapi import HTTPException, UploadFile
+
+from ..config import settings
+from .metrics import stage_timer, UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upload and written to disk per step
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Allowance for multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Archives accepted by the batch endpoint; ".gz" covers ".tar.gz"
+ARCHIVE_EXTENSIONS = {".zip", ".tar", ".tgz", ".gz"}
+
+
+def _size_limit_detail(max_size: int) -> str:
+    return f"File size exceeds {max_size // (1024 * 1024)}MB limit"
+
+
+@dataclass
+class IngestedFile:
+    """An upload that has been validated and written to disk."""
+    path: str
+    filename: str
+    extension: str
+    size: int
+    sha256: str
+
+    async def cleanup(self):
+        """Delete the file from disk if it still exists."""
+        if await aiofiles.os.path.exists(self.path):
+            await aiofiles.os.remove(self.path)
+
+
+def validate_extension(filename: Optional[str], allowed_extensions: Iterable[str]) -> str:
+    """
+    Check the upload's extension and return it lowercased.
+
+    Raises:
+        HTTPException: 400 if the extension is not allowed
+    """
+    extension = Path(filename or "").suffix.lower()
+    if extension not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file format. Allowed formats: {', '.join(sorted(allowed_extensions))}"
+        )
+    return extension
+
+
+async def save_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    allowed_extensions: Optional[Iterable[str]] = None,
+) -> IngestedFile:
+    """
+    Stream an upload to a temporary file, validating it along the way.
+
+    The file is copied in fixed-size chunks, so memory use stays bounded no matter
+    how large the upload is, and its SHA-256 is computed during the copy. The
+    caller owns the returned file and must clean it up.
+
+    Raises:
+        HTTPException: 400 for a disallowed extension, 413 if the file is too large
+    """
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    allowed_extensions = settings.ALLOWED_EXTENSIONS if allowed_extensions is None else allowed_extensions
+
+    extension = validate_extension(file.filename, allowed_extensions)
+    if file.size is not None and file.size > max_size:
+        raise HTTPException(status_code=413, detail=_size_limit_detail(max_size))
+
+    hasher = hashlib.sha256()
+    size = 0
+    with stage_timer("upload"):
+        async with aiofiles.tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp_file:
+            temp_file_path = temp_file.name
+            try:
+                while chunk := await file.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise HTTPException(status_code=413, detail=_size_limit_detail(max_size))
+                    hasher.update(chunk)
+                    await temp_file.write(chunk)
+            except BaseException:
+                await temp_file.close()
+                os.unlink(temp_file_path)
+                raise
+    UPLOAD_BYTES.inc(size)
+
+    logger.info(f"Saved upload {file.filename} ({size} bytes) to {temp_file_path}")
+    return IngestedFile(
+        path=temp_file_path,
+        filename=file.filename,
+        extension=extension,
+        size=size,
+        sha256=hasher.hexdigest(),
+    )
+
+
+class ArchiveError(ValueError):
+    """Raised when an uploaded archive cannot be read."""
+
+
+def _copy_member(source: BinaryIO, name: str, extension: str, max_size: int) -> IngestedFile:
+    """Copy one archive member to a temporary file, hashing it and enforcing the size limit."""
+    hasher = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(suffix=extension)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                # Checked on the bytes actually read, not the size the archive claims
+                if size > max_size:
+                    raise HTTPException(status_code=413, detail=_size_limit_detail(max_size))
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return IngestedFile(path=temp_path, filename=name, extension=extension, size=size,
+                        sha256=hasher.hexdigest())
+
+
+def _is_skippable(name: str) -> bool:
+    # Folder entries and the metadata files macOS adds to archives
+    base = os.path.basename(name)
+    return not base or base.startswith("._") or "__MACOSX/" in name or base == ".DS_Store"
+
+
+def extract_archive(
+    path: str,
+    max_files: int,
+    max_size: Optional[int] = None,
+    allowed_extensions: Optional[Iterable[str]] = None,
+) -> List[Tuple[str, Optional[IngestedFile], Optional[str]]]:
+    """
+    Extract the audio files from a zip or tar archive to temporary files.
+
+    Members are streamed out one at a time, never all into memory, and each
+    is validated on its own: one that is too large or has the wrong
+    extension gets an error message instead of failing the whole archive.
+    Member paths are only used as display names, never as paths on disk.
+    Blocking; run it in a thread.
+
+    Returns:
+        List of (member name, extracted file or None, error or None), in archive order
+
+    Raises:
+        ArchiveError: If the file is not a readable zip or tar archive
+    """
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    allowed_extensions = settings.ALLOWED_EXTENSIONS if allowed_extensions is None else allowed_extensions
+    entries: List[Tuple[str, Optional[IngestedFile], Optional[str]]] = []
+
+    def add(name: str, open_member) -> bool:
+        if len(entries) >= max_files:
+            entries.append((name, None, f"Batch limit of {max_files} files reached"))
+            return False
+        try:
+            extension = validate_extension(name, allowed_extensions)
+            with open_member() as source:
+                entries.append((name, _copy_member(source, name, extension, max_size), None))
+        except HTTPException as e:
+            entries.append((name, None, e.detail))
+        return True
+
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or _is_skippable(info.filename):
+                        continue
+                    if not add(info.filename, lambda info=info: archive.open(info)):
+                        break
+        else:
+            # Stream mode reads the tar front to back without seeking
+            with tarfile.open(path, mode="r|*") as archive:
+                for member in archive:
+                    if not member.isfile() or _is_skippable(member.name):
+                        continue
+                    if not add(member.name, lambda member=member: archive.extractfile(member)):
+                        break
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        for _, ingested, _ in entries:
+            if ingested is not None and os.path.exists(ingested.path):
+                os.unlink(ingested.path)
+        raise ArchiveError(f"Could not read archive: {str(e)}")
+
+    logger.info(f"Extracted {sum(1 for _, f, _ in entries if f)} of {len(entries)} archive member(s) from {path}")
+    return entries
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject request bodies larger than the upload limit while they are still
+    being received.
+
+    A declared Content-Length over the limit is refused before any of the body
+    is read; otherwise the body is counted as it streams in and the request is
+    aborted as soon as it crosses the limit. ``path_limits`` gives routes that
+    take several files (by path prefix) a limit of their own.
+    """
+
+    def __init__(self, app, max_size: Optional[int] = None, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+        self.path_limits = path_limits or {}
+
+    def _max_size_for(self, path: str) -> int:
+        for prefix, max_size in self.path_limits.items():
+            if path.startswith(prefix):
+                return max_size
+        return self.max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self._max_size_for(scope.get("path", ""))
+        limit = max_size + MULTIPART_OVERHEAD
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, max_size)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing, so FastAPI returns it as a 413
+                    raise HTTPException(status_code=413, detail=_size_limit_detail(max_size))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send, max_size: int):
+        body = ('{"detail":"%s"}' % _size_limit_detail(max_size)).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
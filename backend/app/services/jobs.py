@@ -0,0 +1,418 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .summarizer import summarizer
+from .diarization import attribute_action_items
+from .metrics import registry, JOB_WAIT_SECONDS, STAGE_ERRORS
+from .profiles import select_profile
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its maximum depth."""
+
+
+@dataclass
+class Job:
+    id: str
+    file_path: str
+    audio_hash: Optional[str] = None
+    model_name: Optional[str] = None
+    title: Optional[str] = None
+    diarize: bool = False
+    profile: Optional[str] = None
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        """Serialize the job for API responses."""
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "profile": self.profile,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _init_worker():
+    """Load and warm up the Whisper models once per worker process."""
+    from .model_registry import model_registry
+    model_registry.startup()
+    logger.info(f"Job worker {os.getpid()} ready")
+
+
+def _transcribe_in_worker(file_path: str, audio_hash: Optional[str] = None,
+                          model_name: Optional[str] = None, diarize: bool = False,
+                          profile: Optional[str] = None) -> Tuple[dict, dict]:
+    """
+    Run transcription inside a worker process. Returns the text and
+    timestamped segments (labelled by speaker with ``diarize``) with the
+    metrics the worker recorded since it last returned, for the API process
+    to merge; after a failure they go with the next result.
+    """
+    from .transcriber import transcriber
+    if diarize:
+        output = transcriber.transcribe_with_speakers(file_path, audio_hash=audio_hash, model_name=model_name,
+                                                      profile=profile)
+    else:
+        output = transcriber.transcribe_segments(file_path, audio_hash=audio_hash, model_name=model_name,
+                                                 profile=profile)
+    return output, registry.drain()
+
+
+def _transcribe_batch_in_worker(items: List[Tuple[str, Optional[str]]], model_name: Optional[str] = None,
+                                profile: Optional[str] = None) -> Tuple[List[dict], dict]:
+    """Transcribe a group of files inside a worker process; see AudioTranscriber.transcribe_batch."""
+    from .transcriber import transcriber
+    outcomes = transcriber.transcribe_batch(items, model_name=model_name, profile=profile)
+    return outcomes, registry.drain()
+
+
+class JobQueue:
+    """
+    Bounded queue of meeting-processing jobs.
+
+    Transcription runs in a pool of worker processes so the event loop stays
+    responsive; summarization is network-bound and is awaited in the API process.
+    Jobs and batch groups share the workers through one set of slots, with
+    queued jobs served before waiting batch groups.
+    """
+
+    def __init__(self, workers: int, max_depth: int, result_ttl: int):
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._slots_changed: Optional[asyncio.Condition] = None
+        self._free_slots = self.workers
+        self._jobs_waiting = 0
+        self._batch_waiting = 0
+        self._stopping = False
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def batch_waiting(self) -> int:
+        """Number of batch groups waiting for a worker."""
+        return self._batch_waiting
+
+    @property
+    def backlog(self) -> int:
+        """Jobs and batch groups waiting for a worker."""
+        return self.depth + self._batch_waiting
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently being processed."""
+        return len(self._running)
+
+    async def start(self):
+        """Start the worker pool and the dispatcher tasks."""
+        if self._executor is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._stopping = False
+        self._slots_changed = asyncio.Condition()
+        self._free_slots = self.workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+        logger.info(f"Job queue started with {self.workers} worker(s), max depth {self.max_depth}")
+
+    async def shutdown(self):
+        """Stop dispatching, cancel outstanding jobs and tear down the pool."""
+        # Cancelled work stops waiting for its worker process; the pool is going away
+        self._stopping = True
+        tasks = self._dispatchers + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatchers = []
+        for job in self._jobs.values():
+            if job.status not in FINISHED_STATUSES:
+                self._finish(job, JobStatus.CANCELLED, error="Server shutting down")
+                self._discard_file(job)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Job queue stopped")
+
+    def submit(self, file_path: str, audio_hash: Optional[str] = None,
+               model_name: Optional[str] = None, title: Optional[str] = None,
+               diarize: bool = False, profile: Optional[str] = None) -> Job:
+        """
+        Enqueue a job for an audio file. The queue takes ownership of the file
+        and deletes it once the job has finished. ``audio_hash`` is the file's
+        SHA-256, used to look up cached transcripts; ``profile`` names the
+        decoding profile and ``model_name`` overrides its Whisper model;
+        ``title`` names the stored meeting. With ``diarize`` the transcript is
+        split by speaker and action items are attributed to them.
+
+        While settings.PROFILE_DEGRADE_QUEUE_DEPTH or more jobs are waiting,
+        the job is given the next faster profile.
+
+        Raises:
+            QueueFullError: If the queue is already at its maximum depth
+            UnknownProfileError: If the profile is not configured
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        self._prune()
+
+        job = Job(id=uuid.uuid4().hex, file_path=file_path, audio_hash=audio_hash,
+                  model_name=model_name, title=title, diarize=diarize,
+                  profile=select_profile(profile, queue_depth=self.depth).name)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting)")
+
+        self._jobs[job.id] = job
+        logger.info(f"Queued job {job.id} (depth {self.depth})")
+        return job
+
+    @asynccontextmanager
+    async def _worker_slot(self, interactive: bool = True):
+        """
+        Hold one of the ``workers`` slots while work runs on the pool. A
+        background (batch) caller only gets a slot while no job is waiting
+        for one, so jobs never queue behind a batch.
+        """
+        async with self._slots_changed:
+            if interactive:
+                self._jobs_waiting += 1
+            else:
+                self._batch_waiting += 1
+            try:
+                await self._slots_changed.wait_for(
+                    lambda: self._free_slots > 0 and (interactive or self._jobs_waiting == 0)
+                )
+                self._free_slots -= 1
+            finally:
+                if interactive:
+                    self._jobs_waiting -= 1
+                else:
+                    self._batch_waiting -= 1
+                # A job that stopped waiting may unblock batch groups
+                self._slots_changed.notify_all()
+        try:
+            yield
+        finally:
+            async with self._slots_changed:
+                self._free_slots += 1
+                self._slots_changed.notify_all()
+
+    async def run_in_worker(self, fn: Callable, *args):
+        """
+        Run ``fn(*args)`` on the worker pool, in a worker slot shared with the
+        queued jobs, which go first. ``fn`` must be a module-level function
+        returning (result, drained metrics).
+        """
+        if self._executor is None:
+            raise RuntimeError("Job queue has not been started")
+        async with self._worker_slot(interactive=False):
+            result, worker_metrics = await self._call_worker(fn, *args)
+        registry.merge(worker_metrics)
+        return result
+
+    async def _call_worker(self, fn: Callable, *args):
+        """
+        Await ``fn(*args)`` on the pool, from inside a worker slot. If the
+        caller is cancelled once the worker has started, this waits for the
+        worker to finish before re-raising: the call can't be interrupted, so
+        the slot (and any file the worker reads) must stay held until it
+        returns.
+        """
+        future: Future = self._executor.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Cancelling the wrapper has already cancelled the call if it hadn't started
+            if not self._stopping:
+                await asyncio.wait({asyncio.wrap_future(future)})
+                if not future.cancelled() and future.exception() is None:
+                    registry.merge(future.result()[1])
+            raise
+
+    async def transcribe_batch(self, items: List[Tuple[str, Optional[str]]], model_name: Optional[str] = None,
+                               profile: Optional[str] = None) -> List[dict]:
+        """Transcribe a group of (file path, SHA-256) items in one worker call."""
+        return await self.run_in_worker(_transcribe_batch_in_worker, items, model_name, profile)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job.
+
+        A queued job is skipped by the dispatcher. For a running job the
+        transcription already handed to a worker process cannot be interrupted,
+        but its result is discarded and the job is reported as cancelled at
+        once. Its worker slot and audio file are kept until the worker is done.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            self._discard_file(job)
+        self._finish(job, JobStatus.CANCELLED)
+        logger.info(f"Cancelled job {job_id}")
+        return job
+
+    async def wait(self, job_id: str) -> Job:
+        """Wait until a job has finished and return it."""
+        job = self._jobs[job_id]
+        await job.done.wait()
+        return job
+
+    async def _dispatch(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobStatus.QUEUED:
+                    task = asyncio.create_task(self._run(job))
+                    self._running[job.id] = task
+                    # asyncio.wait never raises the job's own cancellation
+                    await asyncio.wait({task})
+            finally:
+                self._running.pop(job.id, None)
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.RUNNING
+        try:
+            async with self._worker_slot():
+                job.started_at = time.time()
+                JOB_WAIT_SECONDS.observe(job.started_at - job.created_at)
+                logger.info(f"Starting transcription for job {job.id}")
+                output, worker_metrics = await self._call_worker(
+                    _transcribe_in_worker, job.file_path, job.audio_hash,
+                    job.model_name, job.diarize, job.profile
+                )
+            registry.merge(worker_metrics)
+            transcript = output["text"]
+
+            logger.info(f"Starting summarization for job {job.id}")
+            summary, action_items = await summarizer.summarize(transcript, output["segments"])
+
+            result = {
+                "transcript": transcript,
+                "summary": summary,
+                "action_items": action_items,
+                "segments": output["segments"],
+                "model": output["model"],
+                "profile": output["profile"],
+                "real_time_factor": output["real_time_factor"],
+            }
+            if job.diarize:
+                segments = output["segments"]
+                result["speakers"] = sorted({s["speaker"] for s in segments if s["speaker"]})
+                result["attributed_action_items"] = attribute_action_items(action_items, segments)
+            try:
+                from .meeting_store import persist_result
+
+                result["meeting_id"] = await persist_result(job.title, result)
+            except Exception as e:
+                # The result is still useful to the caller even if it couldn't be stored
+                logger.error(f"Failed to store meeting for job {job.id}: {str(e)}")
+                result["meeting_id"] = None
+            self._finish(job, JobStatus.COMPLETED, result=result)
+            logger.info(f"Job {job.id} completed")
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            STAGE_ERRORS.inc(stage="job")
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            self._finish(job, JobStatus.FAILED, error=str(e))
+        finally:
+            self._discard_file(job)
+
+    def _finish(self, job: Job, status: JobStatus, result: Optional[dict] = None,
+                error: Optional[str] = None):
+        if job.status in FINISHED_STATUSES:
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+
+    @staticmethod
+    def _discard_file(job: Job):
+        """Delete a job's audio once no worker can still be reading it."""
+        if os.path.exists(job.file_path):
+            os.unlink(job.file_path)
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL."""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATUSES and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# Create a singleton instance
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    max_depth=settings.JOB_QUEUE_MAX_DEPTH,
+    result_ttl=settings.JOB_RESULT_TTL_SECONDS,
+)
+
+registry.register_callback("job_queue_depth", "Jobs waiting for a worker.", "gauge", lambda: job_queue.depth)
+registry.register_callback("jobs_running", "Jobs currently being processed.", "gauge",
+                           lambda: job_queue.running)
+registry.register_callback("batch_groups_waiting", "Batch groups waiting for a worker.", "gauge",
+                           lambda: job_queue.batch_waiting)
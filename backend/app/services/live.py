@@ -0,0 +1,441 @@
+import asyncio
+import logging
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .metrics import inference_timer, registry
+from .model_registry import model_registry
+from .transcriber import DECODE_OPTIONS, NO_SPEECH_THRESHOLD, LOGPROB_THRESHOLD
+from .vad import SAMPLE_RATE
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Seconds per Whisper timestamp token
+TIMESTAMP_RESOLUTION = 0.02
+
+# Raw sample formats decoded without ffmpeg
+PCM_DTYPES = {"pcm_s16le": "<i2", "pcm_f32le": "<f4"}
+
+_NORMALIZE = re.compile(r"[^\w']+")
+
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    text: str
+
+
+def _normalize(word: str) -> str:
+    return _NORMALIZE.sub("", word.lower())
+
+
+def _common_prefix(a: List[str], b: List[str]) -> int:
+    """Number of leading words two hypotheses agree on, ignoring case and punctuation."""
+    n = 0
+    for x, y in zip(a, b):
+        if _normalize(x) != _normalize(y):
+            break
+        n += 1
+    return n
+
+
+class LiveDecoder:
+    """
+    Shared, batched Whisper decoding for live sessions.
+
+    Every session submits its current audio window; windows that arrive
+    within ``batch_wait_ms`` of each other are padded to 30s and decoded
+    together in one forward pass on a dedicated inference thread, so many
+    sessions share one model and one encoder pass per tick.
+    """
+
+    def __init__(self, model_name: str, batch_size: int, batch_wait_ms: int):
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._tokenizer = None
+        # One forward pass at a time; batching provides the parallelism
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"live-{model_name}")
+
+    def _ensure_started(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        """Stop the batching loop and fail any windows still waiting."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Live transcription is shutting down"))
+        self._executor.shutdown(wait=False)
+
+    async def decode(self, audio: "np.ndarray") -> List[Segment]:
+        """Decode up to 30s of 16 kHz audio into timestamped segments."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple["np.ndarray", asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Sessions that have gone away don't need a result
+        return [(audio, future) for audio, future in batch if not future.done()]
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+            try:
+                outputs = await loop.run_in_executor(self._executor, self._run_batch, [a for a, _ in batch])
+            except Exception as e:
+                logger.error(f"Live decoding batch failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    def _segments(self, tokens: List[int], duration: float) -> List[Segment]:
+        """Split decoded tokens into segments at Whisper's timestamp tokens."""
+        timestamp_begin = self._tokenizer.timestamp_begin
+        segments: List[Segment] = []
+        start: Optional[float] = None
+        text_tokens: List[int] = []
+        for token in tokens:
+            if token < timestamp_begin:
+                text_tokens.append(token)
+                continue
+            time = (token - timestamp_begin) * TIMESTAMP_RESOLUTION
+            if start is not None and text_tokens:
+                segments.append(Segment(start, time, self._tokenizer.decode(text_tokens).strip()))
+            text_tokens = []
+            start = time
+        if text_tokens:
+            # The last segment runs to the end of the window
+            segments.append(Segment(start or 0.0, duration, self._tokenizer.decode(text_tokens).strip()))
+        return [segment for segment in segments if segment.text]
+
+    def _run_batch(self, windows: List["np.ndarray"]) -> List[List[Segment]]:
+        import numpy as np
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+
+        model = model_registry.get(self.model_name)
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer(
+                model.is_multilingual, num_languages=model.num_languages,
+                language=DECODE_OPTIONS["language"], task="transcribe",
+            )
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(window))), n_mels=model.dims.n_mels
+            )
+            for window in windows
+        ])
+        options = whisper.DecodingOptions(language=DECODE_OPTIONS["language"], fp16=DECODE_OPTIONS["fp16"])
+        audio_seconds = sum(len(window) for window in windows) / SAMPLE_RATE
+        with model_registry.inference_lock(self.model_name), inference_timer(self.model_name, audio_seconds), \
+                torch.no_grad():
+            results = model.decode(mel, options)
+
+        outputs = []
+        for window, result in zip(windows, results):
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                outputs.append([])
+            else:
+                outputs.append(self._segments(result.tokens, len(window) / SAMPLE_RATE))
+        return outputs
+
+
+class FfmpegStream:
+    """Decode a compressed stream (Opus in WebM or Ogg, or PCM at another rate) to 16 kHz float32 as it arrives."""
+
+    def __init__(self, input_args: List[str]):
+        self.input_args = input_args
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            *self.input_args, "-i", "pipe:0",
+            "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def write(self, data: bytes):
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def read(self) -> bytes:
+        """Decoded bytes as they become available; empty once the stream has ended."""
+        return await self.process.stdout.read(64 * 1024)
+
+    async def end(self):
+        """Signal end of input so ffmpeg flushes what it has buffered."""
+        if self.process.stdin and not self.process.stdin.is_closing():
+            self.process.stdin.close()
+
+    async def close(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+
+class LiveSession:
+    """
+    Incremental transcription of one live audio stream.
+
+    Audio accumulates in a rolling buffer. Each pass re-decodes only the
+    buffer, never the whole meeting, and words are committed once two
+    consecutive passes agree on them (local agreement); the rest is sent as
+    tentative text that may still change. After words are committed the
+    buffer is trimmed to the end of the last fully committed segment, so
+    it stays within Whisper's 30s window however long the meeting runs.
+    """
+
+    def __init__(self, model_name: str, decoder: LiveDecoder, encoding: str = "pcm_s16le",
+                 sample_rate: int = SAMPLE_RATE):
+        import numpy as np
+
+        self.id = uuid.uuid4().hex
+        self.model_name = model_name
+        self.decoder = decoder
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0.0  # Meeting time, in seconds, of the start of the buffer
+        self.committed: List[str] = []  # Every committed word of the meeting
+        self.buffer_committed: List[str] = []  # Committed words still inside the buffer
+        self.previous: List[str] = []  # Uncommitted words of the previous pass
+        self.samples_since_decode = 0
+        self.audio_ready = asyncio.Event()
+        self._remainder = b""
+        self._ffmpeg: Optional[FfmpegStream] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def needs_ffmpeg(self) -> bool:
+        return self.encoding not in PCM_DTYPES or self.sample_rate != SAMPLE_RATE
+
+    async def start(self):
+        if not self.needs_ffmpeg:
+            return
+        if self.encoding in PCM_DTYPES:
+            fmt = "s16le" if self.encoding == "pcm_s16le" else "f32le"
+            input_args = ["-f", fmt, "-ar", str(self.sample_rate), "-ac", "1"]
+        else:
+            # Container and codec (WebM/Ogg Opus) are detected from the stream
+            input_args = []
+        self._ffmpeg = FfmpegStream(input_args)
+        await self._ffmpeg.start()
+        self._reader = asyncio.create_task(self._read_decoded())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+        if self._ffmpeg is not None:
+            await self._ffmpeg.close()
+
+    def _append_samples(self, samples: "np.ndarray"):
+        import numpy as np
+
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.samples_since_decode += len(samples)
+        if self.samples_since_decode >= settings.LIVE_MIN_CHUNK_SECONDS * SAMPLE_RATE:
+            self.audio_ready.set()
+
+    async def _read_decoded(self):
+        import numpy as np
+
+        remainder = b""
+        while True:
+            data = await self._ffmpeg.read()
+            if not data:
+                break
+            data = remainder + data
+            usable = len(data) - len(data) % 4
+            remainder = data[usable:]
+            self._append_samples(np.frombuffer(data[:usable], dtype="<f4").astype(np.float32))
+
+    async def feed(self, data: bytes):
+        """Add a frame of audio as received from the client."""
+        import numpy as np
+
+        if self._ffmpeg is not None:
+            await self._ffmpeg.write(data)
+            return
+        dtype = np.dtype(PCM_DTYPES[self.encoding])
+        data = self._remainder + data
+        usable = len(data) - len(data) % dtype.itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=dtype)
+        if dtype.kind == "i":
+            samples = samples.astype(np.float32) / 32768.0
+        self._append_samples(samples.astype(np.float32, copy=False))
+
+    async def end_input(self):
+        """Flush any audio still inside ffmpeg before the final pass."""
+        if self._ffmpeg is not None:
+            await self._ffmpeg.end()
+            if self._reader is not None:
+                await asyncio.wait({self._reader}, timeout=5)
+
+    def _trim(self, segments: List[Segment], keep_last: bool = True):
+        """Drop buffered audio up to the end of the last segment whose words are all committed."""
+        committed = len(self.buffer_committed)
+        words_seen = 0
+        cut_seconds, cut_words = 0.0, 0
+        candidates = segments[:-1] if keep_last else segments
+        for segment in candidates:
+            words_seen += len(segment.text.split())
+            if words_seen > committed:
+                break
+            cut_seconds, cut_words = segment.end, words_seen
+        if cut_seconds <= 0:
+            return
+        cut = min(int(cut_seconds * SAMPLE_RATE), len(self.buffer))
+        self.buffer = self.buffer[cut:]
+        self.buffer_offset += cut / SAMPLE_RATE
+        self.buffer_committed = self.buffer_committed[cut_words:]
+
+    async def step(self, final: bool = False) -> dict:
+        """
+        Decode the buffer once and return an update with the newly committed
+        words and the current tentative tail. With ``final``, everything
+        left in the buffer is committed.
+        """
+        import numpy as np
+
+        self.audio_ready.clear()
+        self.samples_since_decode = 0
+        window = self.buffer[-int(30 * SAMPLE_RATE):]
+        segments = await self.decoder.decode(window) if len(window) else []
+
+        words = [word for segment in segments for word in segment.text.split()]
+        # The buffer still holds audio of words committed earlier; skip past them
+        skip = _common_prefix(self.buffer_committed, words)
+        if skip < len(self.buffer_committed):
+            skip = min(len(self.buffer_committed), len(words))
+        new_words = words[skip:]
+
+        if final:
+            agreed = len(new_words)
+        else:
+            agreed = _common_prefix(self.previous, new_words)
+        commit = new_words[:agreed]
+        self.committed.extend(commit)
+        self.buffer_committed.extend(commit)
+        self.previous = new_words[agreed:]
+        tentative = new_words[agreed:]
+
+        if final:
+            self.buffer_offset += len(self.buffer) / SAMPLE_RATE
+            self.buffer = np.zeros(0, dtype=np.float32)
+            self.buffer_committed = []
+        else:
+            self._trim(segments)
+            if len(self.buffer) > settings.LIVE_MAX_BUFFER_SECONDS * SAMPLE_RATE:
+                # No agreement for too long; commit the older segments as they are
+                forced = [word for segment in segments[:-1] for word in segment.text.split()][skip + agreed:]
+                self.committed.extend(forced)
+                self.buffer_committed.extend(forced)
+                self.previous = self.previous[len(forced):]
+                tentative = tentative[len(forced):]
+                commit = commit + forced
+                self._trim(segments)
+                if len(self.buffer) > settings.LIVE_MAX_BUFFER_SECONDS * SAMPLE_RATE:
+                    # Nothing could be trimmed (e.g. one long segment); keep the newest audio
+                    overflow = len(self.buffer) - int(settings.LIVE_MAX_BUFFER_SECONDS * SAMPLE_RATE)
+                    self.buffer = self.buffer[overflow:]
+                    self.buffer_offset += overflow / SAMPLE_RATE
+                    self.buffer_committed = []
+
+        return {
+            "type": "final" if final else "update",
+            "committed": " ".join(commit),
+            "tentative": " ".join(tentative),
+            "buffer_start": round(self.buffer_offset, 2),
+            "audio_seconds": round(self.buffer_offset + len(self.buffer) / SAMPLE_RATE, 2),
+        }
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.committed)
+
+
+_decoders: Dict[str, LiveDecoder] = {}
+_decoders_lock = threading.Lock()
+_sessions: Dict[str, LiveSession] = {}
+
+
+def get_live_decoder(model_name: str) -> LiveDecoder:
+    """Get the shared batched decoder for a Whisper model size."""
+    with _decoders_lock:
+        if model_name not in _decoders:
+            _decoders[model_name] = LiveDecoder(
+                model_name,
+                batch_size=settings.LIVE_BATCH_SIZE,
+                batch_wait_ms=settings.LIVE_BATCH_WAIT_MS,
+            )
+        return _decoders[model_name]
+
+
+def open_session(model_name: str, encoding: str, sample_rate: int) -> Optional[LiveSession]:
+    """Register a new live session, or return None if the node is at its session limit."""
+    if len(_sessions) >= settings.LIVE_MAX_SESSIONS:
+        return None
+    session = LiveSession(model_name, get_live_decoder(model_name), encoding, sample_rate)
+    _sessions[session.id] = session
+    return session
+
+
+async def close_session(session: LiveSession):
+    _sessions.pop(session.id, None)
+    await session.close()
+
+
+async def shutdown_live_decoders():
+    """Stop every batched decoder that has been started."""
+    with _decoders_lock:
+        decoders = list(_decoders.values())
+        _decoders.clear()
+    for decoder in decoders:
+        await decoder.close()
+
+
+registry.register_callback("live_sessions", "Open live transcription sessions.", "gauge", lambda: len(_sessions))
@@ -0,0 +1,261 @@
+import asyncio
+import base64
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only
+
+from ..db.base import AsyncSessionLocal, SessionLocal
+from ..db.models import ActionItem, Meeting, TranscriptSegmentBlock
+from .metrics import stage_timer
+from .search import search_index
+from .segments import SegmentArray
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def _action_item_row(item) -> dict:
+    if isinstance(item, dict):
+        due_date = item.get("due_date")
+        return {
+            "description": item["description"],
+            "speaker": item.get("speaker"),
+            "due_date": date.fromisoformat(due_date) if due_date else None,
+        }
+    return {"description": item, "speaker": None, "due_date": None}
+
+
+def _segment_block_rows(meeting_id: int, segments: list) -> Tuple[List[dict], List[str]]:
+    """Rows for the segment blocks of a meeting, and the text of each block for the search index."""
+    rows, texts = [], []
+    for index, block in enumerate(SegmentArray.from_segments(segments).blocks()):
+        texts.append(block.joined_text())
+        rows.append({
+            "meeting_id": meeting_id,
+            "block_index": index,
+            "start": float(block.start[0]),
+            "end": float(block.end.max()),
+            "segment_count": len(block),
+            "data": block.to_bytes(),
+        })
+    return rows, texts
+
+
+async def save_meeting(db: AsyncSession, title: Optional[str], transcript: str, summary: str,
+                       action_items: list, owner_id: Optional[int] = None,
+                       segments: Optional[list] = None) -> int:
+    """
+    Store a processed meeting, its action items and its timestamped
+    segments in one transaction.
+
+    Action items are written with a single multi-row INSERT rather than one
+    ORM object each. Each is either a description string or a dict with
+    ``description``, ``speaker`` and ``due_date`` (ISO format). Segments are
+    packed into blocks of consecutive segments so a time range can be read
+    without the rest.
+    Every statement goes over one pooled connection and is committed once,
+    so a meeting costs the same few round trips however many items it has.
+
+    Returns:
+        int: The new meeting's id
+    """
+    # Set in Python rather than by the server default so every row has the same
+    # sub-second precision and cursor comparisons are exact
+    with stage_timer("db_write"):
+        meeting = Meeting(
+            title=title,
+            transcript=transcript,
+            summary=summary,
+            owner_id=owner_id,
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(meeting)
+        await db.flush()
+        if action_items:
+            await db.execute(insert(ActionItem), [
+                {"meeting_id": meeting.id, "status": "pending", **_action_item_row(item)}
+                for item in action_items
+            ])
+        block_texts = []
+        if segments:
+            # Packing is CPU work; keep it off the event loop for long meetings
+            rows, block_texts = await asyncio.to_thread(_segment_block_rows, meeting.id, segments)
+            await db.execute(insert(TranscriptSegmentBlock), rows)
+        await db.commit()
+    logger.info(f"Saved meeting {meeting.id} with {len(action_items)} action item(s)")
+
+    try:
+        await asyncio.to_thread(search_index.add, meeting.id, title, summary, transcript, block_texts)
+    except Exception as e:
+        # The meeting is stored; a rebuild will pick it up
+        logger.error(f"Failed to index meeting {meeting.id}: {str(e)}")
+    return meeting.id
+
+
+async def persist_result(title: Optional[str], result: dict, owner_id: Optional[int] = None) -> int:
+    """Save a pipeline result using a session of its own; for use outside request scope."""
+    async with AsyncSessionLocal() as db:
+        return await save_meeting(
+            db,
+            title=title,
+            transcript=result["transcript"],
+            summary=result["summary"],
+            # Speaker-attributed items when the meeting was diarized
+            action_items=result.get("attributed_action_items") or result["action_items"],
+            owner_id=owner_id,
+            segments=result.get("segments"),
+        )
+
+
+def encode_cursor(meeting: Meeting) -> str:
+    raw = f"{meeting.created_at.isoformat()}|{meeting.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, meeting_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(meeting_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def list_meetings(db: Session, limit: int = 20, cursor: Optional[str] = None,
+                  owner_id: Optional[int] = None) -> Tuple[List[Meeting], Optional[str]]:
+    """
+    Page through meetings newest first using keyset pagination.
+
+    Each page continues from the (created_at, id) of the previous page's last
+    row, so the cost of a page does not grow with how deep into the history
+    it is. Transcripts are not loaded.
+
+    Returns:
+        Tuple[List[Meeting], Optional[str]]: The page and the cursor for the next one
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = (
+        select(Meeting)
+        .options(load_only(Meeting.id, Meeting.title, Meeting.summary, Meeting.created_at, Meeting.owner_id))
+        .order_by(Meeting.created_at.desc(), Meeting.id.desc())
+        .limit(limit + 1)
+    )
+    if owner_id is not None:
+        query = query.where(Meeting.owner_id == owner_id)
+    if cursor:
+        created_at, meeting_id = decode_cursor(cursor)
+        query = query.where(tuple_(Meeting.created_at, Meeting.id) < (created_at, meeting_id))
+
+    meetings = list(db.scalars(query))
+    next_cursor = None
+    if len(meetings) > limit:
+        meetings = meetings[:limit]
+        next_cursor = encode_cursor(meetings[-1])
+    return meetings, next_cursor
+
+
+def get_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
+    """Load a meeting together with its action items in a single query."""
+    query = (
+        select(Meeting)
+        .options(joinedload(Meeting.action_items))
+        .where(Meeting.id == meeting_id)
+    )
+    return db.scalars(query).unique().one_or_none()
+
+
+def meeting_exists(db: Session, meeting_id: int) -> bool:
+    return db.scalar(select(Meeting.id).where(Meeting.id == meeting_id)) is not None
+
+
+def get_segments(db: Session, meeting_id: int, start: Optional[float] = None,
+                 end: Optional[float] = None) -> SegmentArray:
+    """
+    Load a meeting's segments overlapping ``start``..``end`` seconds (either
+    bound may be open), reading only the blocks that cover the range.
+    """
+    query = (
+        select(TranscriptSegmentBlock.data)
+        .where(TranscriptSegmentBlock.meeting_id == meeting_id)
+        .order_by(TranscriptSegmentBlock.block_index)
+    )
+    if start is not None:
+        query = query.where(TranscriptSegmentBlock.end > start)
+    if end is not None:
+        query = query.where(TranscriptSegmentBlock.start < end)
+    blocks = [SegmentArray.from_bytes(data) for data in db.scalars(query)]
+    return SegmentArray.concat(blocks).between(start, end)
+
+
+def get_segment_blocks(db: Session, keys: Sequence[Tuple[int, int]]) -> Dict[int, SegmentArray]:
+    """
+    Load the given (meeting id, block index) segment blocks in one query.
+
+    Returns:
+        Dict[int, SegmentArray]: Each meeting's loaded blocks, concatenated in order
+    """
+    if not keys:
+        return {}
+    query = (
+        select(TranscriptSegmentBlock.meeting_id, TranscriptSegmentBlock.data)
+        .where(tuple_(TranscriptSegmentBlock.meeting_id, TranscriptSegmentBlock.block_index).in_(keys))
+        .order_by(TranscriptSegmentBlock.meeting_id, TranscriptSegmentBlock.block_index)
+    )
+    blocks: Dict[int, List[SegmentArray]] = {}
+    for meeting_id, data in db.execute(query):
+        blocks.setdefault(meeting_id, []).append(SegmentArray.from_bytes(data))
+    return {meeting_id: SegmentArray.concat(arrays) for meeting_id, arrays in blocks.items()}
+
+
+def iter_segment_blocks(meeting_id: int, batch_size: int = 16) -> Iterator[SegmentArray]:
+    """
+    Yield a meeting's segment blocks in order, fetching ``batch_size`` rows
+    at a time, using a session of its own; for streaming responses.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            select(TranscriptSegmentBlock.data)
+            .where(TranscriptSegmentBlock.meeting_id == meeting_id)
+            .order_by(TranscriptSegmentBlock.block_index)
+            .execution_options(yield_per=batch_size)
+        )
+        for data in db.scalars(query):
+            yield SegmentArray.from_bytes(data)
+    finally:
+        db.close()
+
+
+def meeting_summary_dict(meeting: Meeting) -> dict:
+    return {
+        "id": meeting.id,
+        "title": meeting.title,
+        "summary": meeting.summary,
+        "created_at": meeting.created_at.isoformat() if meeting.created_at else None,
+        "owner_id": meeting.owner_id,
+    }
+
+
+def meeting_detail_dict(meeting: Meeting) -> dict:
+    return {
+        **meeting_summary_dict(meeting),
+        "transcript": meeting.transcript,
+        "action_items": [
+            {
+                "id": item.id,
+                "description": item.description,
+                "speaker": item.speaker,
+                "due_date": item.due_date.isoformat() if item.due_date else None,
+                "status": item.status,
+            }
+            for item in sorted(meeting.action_items, key=lambda item: item.id)
+        ],
+    }
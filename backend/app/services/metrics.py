@@ -0,0 +1,371 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; spans a fast cache lookup to a long recording on a small CPU
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing total, e.g. requests served or errors seen."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. jobs currently running."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed buckets.
+
+    Observing is a binary search and three additions under a lock, so it is
+    cheap enough for every request and every pipeline stage.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = self._header()
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, (counts, total, count) in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+
+
+CallbackValue = Union[float, Dict[LabelValues, float]]
+
+
+class _Callback(_Metric):
+    """Metric whose value is read from its owner when scraped."""
+
+    def __init__(self, name: str, documentation: str, type: str,
+                 func: Callable[[], CallbackValue], labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.func = func
+
+    def render(self) -> List[str]:
+        try:
+            values = self.func()
+        except Exception as e:
+            logger.error(f"Failed to collect metric {self.name}: {str(e)}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+
+    Worker processes record into their own copy of the registry; they hand
+    their counters and histograms back with drain() along with each result and
+    the API process folds them in with merge(), so /metrics covers the whole
+    pipeline without a shared metrics store.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_callback(self, name: str, documentation: str, type: str,
+                          func: Callable[[], CallbackValue], labelnames: Sequence[str] = ()):
+        """
+        Expose a value owned by another component, read only when scraped.
+        ``func`` returns a number, or a dict of label value tuples to numbers.
+        """
+        self._register(_Callback(name, documentation, type, func, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> dict:
+        """Take and reset this process's counters and histograms."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        samples = {}
+        for metric in metrics:
+            if isinstance(metric, (Counter, Histogram)):
+                values = metric.drain()
+                if values:
+                    samples[metric.name] = values
+        return samples
+
+    def merge(self, samples: Optional[dict]):
+        """Add counters and histograms drained from another process."""
+        for name, values in (samples or {}).items():
+            metric = self._metrics.get(name)
+            if isinstance(metric, (Counter, Histogram)):
+                metric.merge(values)
+
+
+# Create a singleton instance
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route"),
+)
+STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_seconds", "Time spent in each pipeline stage.", ("stage",),
+)
+STAGE_ERRORS = registry.counter(
+    "pipeline_errors_total", "Pipeline stages that raised an error.", ("stage",),
+)
+UPLOAD_BYTES = registry.counter(
+    "upload_bytes_total", "Bytes of uploaded audio written to disk.",
+)
+DECODE_CACHE_HITS = registry.counter(
+    "audio_decode_cache_hits_total", "Uploads whose decoded PCM was already cached.",
+)
+INFERENCE_SECONDS = registry.histogram(
+    "whisper_inference_seconds", "Wall time of Whisper inference per call.", ("model",),
+)
+AUDIO_SECONDS = registry.counter(
+    "whisper_audio_seconds_total", "Seconds of audio transcribed.", ("model",),
+)
+REAL_TIME_FACTOR = registry.histogram(
+    "whisper_real_time_factor", "Seconds of audio transcribed per second of wall time.", ("model",),
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128),
+)
+SUMMARIZER_CALL_SECONDS = registry.histogram(
+    "summarizer_call_seconds", "Time per summarization model call (one HTTP request, or one local batch).",
+    ("backend", "status"),
+)
+JOB_WAIT_SECONDS = registry.histogram(
+    "job_queue_wait_seconds", "Time jobs spent queued before a worker picked them up.",
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Record how long the block takes under ``stage``, and count it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+@contextmanager
+def inference_timer(model_name: str, audio_seconds: float) -> Iterator[dict]:
+    """
+    Time a Whisper call and record its real-time factor. The yielded dict
+    gets ``seconds`` and ``real_time_factor`` once the block has finished.
+    """
+    timing = {}
+    start = time.perf_counter()
+    with stage_timer("inference"):
+        yield timing
+    elapsed = time.perf_counter() - start
+    INFERENCE_SECONDS.observe(elapsed, model=model_name)
+    AUDIO_SECONDS.inc(audio_seconds, model=model_name)
+    timing["seconds"] = elapsed
+    timing["real_time_factor"] = audio_seconds / elapsed if elapsed > 0 else None
+    if elapsed > 0:
+        REAL_TIME_FACTOR.observe(audio_seconds / elapsed, model=model_name)
+
+
+class MetricsMiddleware:
+    """
+    Count requests and time them by route template.
+
+    Paths are labelled with the matched route (``/api/v1/jobs/{job_id}``)
+    rather than the raw URL, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method=method, route=path, status=str(status))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=path)
@@ -0,0 +1,262 @@
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from ..config import settings
+from .metrics import registry
+from .quantization import load_quantized_model, model_bytes
+
+logger = logging.getLogger(__name__)
+
+# One second of quiet noise at 16 kHz, enough to exercise the full decode path
+WARMUP_SECONDS = 1
+
+# Load states reported by ModelRegistry.load_state()
+PENDING, LOADING, LOADED, FAILED = "pending", "loading", "loaded", "failed"
+
+_torch_configured = False
+
+
+def configure_torch(num_threads: Optional[int] = None):
+    """
+    Apply the process-wide PyTorch CPU settings, with ``num_threads``
+    intra-op threads (default: settings.TORCH_NUM_THREADS). Called just
+    before the first model is loaded, so processes that never run inference
+    never import torch; only the first call has any effect.
+    """
+    global _torch_configured
+    if _torch_configured:
+        return
+    import torch
+
+    torch.set_num_threads(max(1, num_threads or settings.TORCH_NUM_THREADS))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before any inter-op work has started
+        pass
+    torch.set_grad_enabled(False)
+    _torch_configured = True
+
+
+class ModelNotAllowedError(ValueError):
+    """Raised when a request asks for a Whisper model that is not enabled."""
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Every route and service gets its model from here, so each model size is
+    loaded at most once per process. Models are kept in least-recently-used
+    order and the oldest ones are unloaded when loading another would exceed
+    the memory budget. With ``quantize`` every model is loaded with int8
+    Linear layers (see services/quantization.py).
+
+    The registry lock only guards its dictionaries. A model is loaded under a
+    lock of its own, so a load never holds up lookups of loaded models or
+    inference locks, and concurrent requests for one model wait for a single
+    load.
+    """
+
+    def __init__(self, default_model: str, allowed_models: Iterable[str],
+                 memory_budget_mb: int, download_root: Optional[str] = None,
+                 quantize: bool = False):
+        self.default_model = default_model
+        self.allowed_models = set(allowed_models) | {default_model}
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.download_root = download_root
+        self.quantize = quantize
+        self._models: "OrderedDict[str, whisper.Whisper]" = OrderedDict()
+        self._stats: Dict[str, dict] = {}
+        # Written by the loading thread, read without a lock so readiness checks never wait on a load
+        self._states: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._inference_locks: Dict[str, threading.Lock] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def precision(self) -> str:
+        """Weight precision of the loaded models; part of the transcript cache keys."""
+        return "int8" if self.quantize else "fp32"
+
+    def _loaded_bytes(self) -> int:
+        return sum(self._stats[name]["bytes"] for name in self._models)
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """
+        Return the model name to use for a request.
+
+        Raises:
+            ModelNotAllowedError: If the model is not in the allowed list
+        """
+        name = name or self.default_model
+        if name not in self.allowed_models:
+            raise ModelNotAllowedError(
+                f"Model '{name}' is not available. Allowed models: {', '.join(sorted(self.allowed_models))}"
+            )
+        return name
+
+    def get(self, name: Optional[str] = None):
+        """Get a loaded model, loading it (and unloading older ones) if needed."""
+        name = self.resolve(name)
+        model = self._lookup(name)
+        if model is not None:
+            return model
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            # Another thread may have loaded it while this one waited
+            model = self._lookup(name)
+            if model is not None:
+                return model
+            return self._load(name)
+
+    def _lookup(self, name: str):
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                self._models.move_to_end(name)
+                self._stats[name]["last_used"] = time.time()
+            return model
+
+    def inference_lock(self, name: Optional[str] = None) -> threading.Lock:
+        """
+        Lock to hold while running inference on a shared model from a thread.
+        Whisper's decoder installs key/value cache hooks on the model for the
+        duration of a call, so two calls on one model must not overlap.
+        """
+        name = self.resolve(name)
+        with self._lock:
+            return self._inference_locks.setdefault(name, threading.Lock())
+
+    def _load(self, name: str):
+        logger.info(f"Loading Whisper model '{name}'...")
+        self._states[name] = {"state": LOADING, "error": None}
+        start = time.perf_counter()
+        try:
+            configure_torch()
+            if self.quantize:
+                model = load_quantized_model(name, download_root=self.download_root)
+            else:
+                import whisper
+
+                model = whisper.load_model(name, device="cpu", download_root=self.download_root)
+                model.eval()
+        except Exception as e:
+            self._states[name] = {"state": FAILED, "error": str(e)}
+            raise
+        load_seconds = time.perf_counter() - start
+
+        size = model_bytes(model)
+        with self._lock:
+            evicted = self._evict(size)
+            self._models[name] = model
+            self._stats[name] = {
+                "bytes": size,
+                "load_seconds": round(load_seconds, 3),
+                "warmup_seconds": None,
+                "loaded_at": time.time(),
+                "last_used": time.time(),
+            }
+            self._states[name] = {"state": LOADED, "error": None}
+        if evicted:
+            gc.collect()
+        logger.info(f"Loaded Whisper model '{name}' ({self.precision}, {size / 2**20:.0f}MB) in {load_seconds:.2f}s")
+        return model
+
+    def _evict(self, incoming_bytes: int) -> int:
+        """
+        Drop least recently used models until the incoming one fits the
+        budget. Called with the lock held; the caller collects garbage once
+        it is released.
+
+        Returns:
+            int: Number of models dropped
+        """
+        evicted = 0
+        while self._models and self._loaded_bytes() + incoming_bytes > self.memory_budget:
+            name, _ = self._models.popitem(last=False)
+            self._stats.pop(name, None)
+            self._states.pop(name, None)
+            evicted += 1
+            logger.info(f"Unloaded Whisper model '{name}' to stay within the memory budget")
+        return evicted
+
+    def warmup(self, name: Optional[str] = None) -> float:
+        """Run one inference on synthetic audio so the first request isn't slow."""
+        import numpy as np
+        import torch
+        import whisper
+
+        name = self.resolve(name)
+        model = self.get(name)
+        audio = (np.random.default_rng(0).standard_normal(whisper.audio.SAMPLE_RATE * WARMUP_SECONDS)
+                 * 1e-3).astype(np.float32)
+        start = time.perf_counter()
+        with self.inference_lock(name), torch.no_grad():
+            model.transcribe(audio, fp16=False, language="en")
+        warmup_seconds = time.perf_counter() - start
+        with self._lock:
+            if name in self._stats:
+                self._stats[name]["warmup_seconds"] = round(warmup_seconds, 3)
+        logger.info(f"Warmed up Whisper model '{name}' in {warmup_seconds:.2f}s")
+        return warmup_seconds
+
+    def preload_models(self) -> list:
+        return list(settings.WHISPER_PRELOAD_MODELS or [self.default_model])
+
+    def startup(self, names: Optional[Iterable[str]] = None, raise_errors: bool = True):
+        """
+        Load and warm up the configured models. With ``raise_errors`` off, a
+        model that fails to load is logged and reported by load_state()
+        while the rest still load.
+        """
+        for name in names or self.preload_models():
+            try:
+                self.get(name)
+                self.warmup(name)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"Failed to load Whisper model '{name}': {str(e)}")
+
+    def load_state(self) -> dict:
+        """
+        Load state of the preloaded models and any others loaded since:
+        ``ready`` once every preloaded model is loaded. Never waits on a load
+        in progress.
+        """
+        states = {name: {"state": PENDING, "error": None} for name in self.preload_models()}
+        states.update({name: dict(state) for name, state in list(self._states.items())})
+        ready = all(states[name]["state"] == LOADED for name in self.preload_models())
+        return {"ready": ready, "models": states}
+
+    def stats(self) -> dict:
+        """Loaded models with their size, load and warmup times."""
+        with self._lock:
+            return {
+                "default_model": self.default_model,
+                "allowed_models": sorted(self.allowed_models),
+                "precision": self.precision,
+                "torch_num_threads": settings.TORCH_NUM_THREADS,
+                "memory_budget_bytes": self.memory_budget,
+                "loaded_bytes": self._loaded_bytes(),
+                "models": {name: dict(self._stats[name]) for name in self._models},
+            }
+
+
+# Create a singleton instance
+model_registry = ModelRegistry(
+    default_model=settings.WHISPER_MODEL,
+    allowed_models=settings.WHISPER_ALLOWED_MODELS,
+    memory_budget_mb=settings.WHISPER_MEMORY_BUDGET_MB,
+    download_root=settings.WHISPER_DOWNLOAD_ROOT,
+    quantize=settings.WHISPER_QUANTIZE,
+)
+
+registry.register_callback("whisper_models_loaded_bytes", "Memory held by loaded Whisper models.", "gauge",
+                           lambda: model_registry.stats()["loaded_bytes"])
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from ..config import settings
+from .segments import whisper_segments
+from .vad import SAMPLE_RATE, split_on_silence, stitch_transcripts
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper model held by each pool worker process
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Load the Whisper model once per pool worker, pinned to a single core."""
+    global _worker_model
+    from .model_registry import configure_torch, model_registry
+
+    # The workers are the parallelism; more threads each would only contend
+    configure_torch(num_threads=1)
+    _worker_model = model_registry.get(model_name)
+
+
+def _transcribe_chunk(audio: "np.ndarray", options: dict) -> dict:
+    """Transcribe one chunk of decoded audio inside a pool worker."""
+    result = _worker_model.transcribe(audio, **options)
+    return {"text": result["text"].strip(), "segments": whisper_segments(result)}
+
+
+class ParallelTranscriber:
+    """
+    Transcribe long recordings by splitting them at silences and running the
+    chunks through a pool of worker processes, one Whisper model per worker.
+    """
+
+    def __init__(self, model_name: str, workers: int, chunk_seconds: float,
+                 overlap_seconds: float):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting {self.workers} chunk worker(s) for Whisper '{self.model_name}'")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name,),
+                )
+            return self._executor
+
+    def _split(self, audio: "np.ndarray", chunk_seconds: Optional[float]):
+        """Chunk bounds at silences and the chunks, each with the overlap before it."""
+        chunk_seconds = chunk_seconds or self.chunk_seconds
+        overlap = int(self.overlap_seconds * SAMPLE_RATE)
+        bounds = split_on_silence(audio, chunk_seconds=chunk_seconds)
+        chunks = [audio[max(0, start - overlap):end] for start, end in bounds]
+        if chunks:
+            logger.info(f"Transcribing {len(chunks)} chunk(s) across {self.workers} worker(s)")
+        return bounds, chunks
+
+    def _merge(self, bounds, outputs) -> dict:
+        """Stitch the chunk outputs, with segment times from the start of the audio."""
+        overlap = int(self.overlap_seconds * SAMPLE_RATE)
+        segments = []
+        for index, ((start, _), output) in enumerate(zip(bounds, outputs)):
+            offset = max(0, start - overlap) / SAMPLE_RATE
+            for segment in output["segments"]:
+                segment = {**segment, "start": round(segment["start"] + offset, 2),
+                           "end": round(segment["end"] + offset, 2)}
+                # Speech in the overlap was already covered by the previous chunk
+                if index > 0 and (segment["start"] + segment["end"]) / 2 < start / SAMPLE_RATE:
+                    continue
+                segments.append(segment)
+        return {"text": stitch_transcripts([output["text"] for output in outputs]), "segments": segments}
+
+    def transcribe(self, audio: "np.ndarray", chunk_seconds: Optional[float] = None,
+                   **options) -> dict:
+        """
+        Transcribe decoded 16 kHz mono audio in parallel chunks. Blocks until
+        every chunk is done; from async code use ``transcribe_async``.
+
+        Args:
+            audio (np.ndarray): Decoded float32 audio
+            chunk_seconds (Optional[float]): Maximum chunk length, defaults to the configured value
+            **options: Decoding options passed through to ``model.transcribe``
+
+        Returns:
+            dict: ``text``, stitched in order, and ``segments`` with times from
+            the start of the audio
+        """
+        bounds, chunks = self._split(audio, chunk_seconds)
+        if not chunks:
+            return {"text": "", "segments": []}
+        executor = self._get_executor()
+        outputs = list(executor.map(_transcribe_chunk, chunks, [options] * len(chunks)))
+        return self._merge(bounds, outputs)
+
+    async def transcribe_async(self, audio: "np.ndarray", chunk_seconds: Optional[float] = None,
+                               **options) -> dict:
+        """
+        Like ``transcribe``, but awaits the chunk futures so the event loop
+        keeps serving other requests while the workers decode.
+        """
+        bounds, chunks = await asyncio.to_thread(self._split, audio, chunk_seconds)
+        if not chunks:
+            return {"text": "", "segments": []}
+        executor = await asyncio.to_thread(self._get_executor)
+        futures = [asyncio.wrap_future(executor.submit(_transcribe_chunk, chunk, options)) for chunk in chunks]
+        try:
+            outputs = await asyncio.gather(*futures)
+        except BaseException:
+            # Don't leave the rest of the chunks queued for a request that is gone
+            for future in futures:
+                future.cancel()
+            raise
+        return self._merge(bounds, outputs)
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_transcribers = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_parallel_transcriber(model_name: str) -> ParallelTranscriber:
+    """Get the shared parallel transcriber for a Whisper model size."""
+    with _transcribers_lock:
+        if model_name not in _transcribers:
+            _transcribers[model_name] = ParallelTranscriber(
+                model_name=model_name,
+                workers=settings.CHUNK_WORKERS,
+                chunk_seconds=settings.CHUNK_SECONDS,
+                overlap_seconds=settings.CHUNK_OVERLAP_SECONDS,
+            )
+        return _transcribers[model_name]
+
+
+def shutdown_parallel_transcribers():
+    """Stop every chunk worker pool that has been started."""
+    with _transcribers_lock:
+        for parallel in _transcribers.values():
+            parallel.shutdown()
@@ -0,0 +1,100 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownProfileError(ValueError):
+    """Raised when a request asks for a decoding profile that is not configured."""
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """A named trade-off between transcription speed and accuracy."""
+    name: str
+    model: str
+    beam_size: Optional[int]
+    best_of: Optional[int]
+    temperature: Tuple[float, ...]
+    condition_on_previous_text: bool
+    compression_ratio_threshold: float
+    logprob_threshold: float
+    no_speech_threshold: float
+
+    def transcribe_options(self, base_options: dict) -> dict:
+        """Keyword arguments for ``model.transcribe``: ``base_options`` plus this profile's settings."""
+        return {
+            **base_options,
+            "beam_size": self.beam_size,
+            "best_of": self.best_of,
+            # A single temperature disables Whisper's fallback loop
+            "temperature": self.temperature[0] if len(self.temperature) == 1 else self.temperature,
+            "condition_on_previous_text": self.condition_on_previous_text,
+            "compression_ratio_threshold": self.compression_ratio_threshold,
+            "logprob_threshold": self.logprob_threshold,
+            "no_speech_threshold": self.no_speech_threshold,
+        }
+
+
+def profile_names() -> List[str]:
+    """Configured profiles, most accurate first."""
+    return list(settings.DECODING_PROFILES)
+
+
+def get_profile(name: Optional[str] = None) -> DecodingProfile:
+    """
+    Look up a decoding profile, defaulting to settings.DEFAULT_DECODING_PROFILE.
+
+    Raises:
+        UnknownProfileError: If no profile has that name
+    """
+    name = name or settings.DEFAULT_DECODING_PROFILE
+    config = settings.DECODING_PROFILES.get(name)
+    if config is None:
+        raise UnknownProfileError(
+            f"Decoding profile '{name}' is not available. Profiles: {', '.join(profile_names())}"
+        )
+    return DecodingProfile(
+        name=name,
+        model=config["model"],
+        beam_size=config.get("beam_size"),
+        best_of=config.get("best_of"),
+        temperature=tuple(config.get("temperature", (0.0,))),
+        condition_on_previous_text=config.get("condition_on_previous_text", True),
+        compression_ratio_threshold=config.get("compression_ratio_threshold", 2.4),
+        logprob_threshold=config.get("logprob_threshold", -1.0),
+        no_speech_threshold=config.get("no_speech_threshold", 0.6),
+    )
+
+
+def step_down(name: Optional[str] = None, steps: int = 1) -> DecodingProfile:
+    """The profile ``steps`` places faster than ``name``, never past the fastest."""
+    profile = get_profile(name)
+    names = profile_names()
+    return get_profile(names[min(names.index(profile.name) + steps, len(names) - 1)])
+
+
+def select_profile(name: Optional[str] = None, queue_depth: int = 0,
+                   audio_seconds: float = 0.0) -> DecodingProfile:
+    """
+    Pick the profile to decode with: the requested one, stepped down to a
+    faster profile once for a deep job queue and once for audio over the
+    length budget, never past the fastest.
+    """
+    profile = get_profile(name)
+    steps = 0
+    if queue_depth >= settings.PROFILE_DEGRADE_QUEUE_DEPTH:
+        steps += 1
+    if audio_seconds > settings.PROFILE_DEGRADE_AUDIO_SECONDS:
+        steps += 1
+    if not steps:
+        return profile
+
+    degraded = step_down(profile.name, steps)
+    if degraded.name != profile.name:
+        logger.info(f"Degrading decoding profile '{profile.name}' to '{degraded.name}' "
+                    f"(queue depth {queue_depth}, {audio_seconds:.0f}s of audio)")
+    return degraded
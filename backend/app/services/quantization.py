@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def model_bytes(model) -> int:
+    """Memory held by a model's weights, counting int8 packed Linear weights too."""
+    total = sum(p.numel() * p.element_size() for p in model.parameters())
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            weight, bias = packed._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
+
+
+def quantize_whisper(model):
+    """
+    Quantize the Linear layers of a Whisper model to int8 weights, with
+    activations quantized on the fly. The convolutions, embeddings and
+    layer norms stay fp32.
+
+    Whisper uses its own Linear subclass, which PyTorch's dynamic
+    quantization does not convert, so those layers are first swapped for
+    plain ``torch.nn.Linear`` layers sharing the same weights.
+    """
+    import torch
+
+    for module in list(model.modules()):
+        for child_name, child in list(module.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, child_name, plain)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_path(name: str, directory: Optional[str] = None) -> str:
+    """
+    Where the quantized model is kept. The PyTorch and Whisper versions are
+    part of the name, since the saved module is only loadable by the
+    versions that wrote it.
+    """
+    import torch
+    import whisper
+
+    directory = directory or settings.WHISPER_QUANTIZED_DIR
+    return os.path.join(directory, f"{name}-int8-torch{torch.__version__}-whisper{whisper.__version__}.pt")
+
+
+def load_quantized_model(name: str, download_root: Optional[str] = None, directory: Optional[str] = None):
+    """
+    Load the int8 Whisper model, quantizing and saving it on first use.
+
+    The whole quantized module is saved, so later loads skip both the fp32
+    checkpoint and the quantization pass. A cached file that can't be read
+    is replaced.
+    """
+    import torch
+    import whisper
+
+    path = quantized_path(name, directory)
+    if os.path.exists(path):
+        try:
+            model = torch.load(path, map_location="cpu", weights_only=False)
+            model.eval()
+            return model
+        except Exception as e:
+            logger.warning(f"Could not load quantized Whisper model from {path}, rebuilding it: {str(e)}")
+
+    start = time.perf_counter()
+    model = whisper.load_model(name, device="cpu", download_root=download_root)
+    model.eval()
+    model = quantize_whisper(model)
+    logger.info(f"Quantized Whisper model '{name}' to int8 in {time.perf_counter() - start:.2f}s")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Written under a temporary name so a crash never leaves a partial file behind
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        torch.save(model, temp_path)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not save quantized Whisper model to {path}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+    return model
@@ -0,0 +1,303 @@
+import html
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from ..config import settings
+from .segments import SegmentArray
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Column weights for bm25 ranking: title, summary, transcript
+RANK_WEIGHTS = (5.0, 2.0, 1.0)
+
+MAX_RESULTS = 50
+
+# Matches reported per result
+MAX_MATCHES = 20
+
+# Segment blocks are indexed under rowid (meeting id << BLOCK_ROWID_BITS) + block
+# index, so one meeting's blocks are a rowid range
+BLOCK_ROWID_BITS = 20
+
+# Snippet markers, replaced with <mark> tags once the snippet is HTML-escaped
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+class SearchIndex:
+    """
+    Full-text index over stored meetings, backed by SQLite FTS5.
+
+    The index lives in its own SQLite file, so it works the same whatever
+    database holds the meetings. Meetings are added as they are saved and the
+    whole index can be rebuilt from the meetings table. The text of each
+    stored segment block is indexed too, so a search reads only the blocks
+    where the query words appear.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+                    title, summary, transcript,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS segment_blocks_fts USING fts5(
+                    text,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _block_rowids(meeting_id: int):
+        first = meeting_id << BLOCK_ROWID_BITS
+        return first, first + (1 << BLOCK_ROWID_BITS)
+
+    def add(self, meeting_id: int, title: Optional[str], summary: Optional[str],
+            transcript: Optional[str], block_texts: Sequence[str] = ()):
+        """
+        Index one meeting, replacing any previous entry for it.
+        ``block_texts`` is the joined text of each of its stored segment
+        blocks, in block order.
+        """
+        first, _ = self._block_rowids(meeting_id)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meetings_fts (rowid, title, summary, transcript) VALUES (?, ?, ?, ?)",
+                    (meeting_id, title or "", summary or "", transcript or ""),
+                )
+                conn.execute("DELETE FROM segment_blocks_fts WHERE rowid >= ? AND rowid < ?",
+                             self._block_rowids(meeting_id))
+                conn.executemany(
+                    "INSERT INTO segment_blocks_fts (rowid, text) VALUES (?, ?)",
+                    [(first + index, text) for index, text in enumerate(block_texts)],
+                )
+
+    def remove(self, meeting_id: int):
+        """Drop a meeting from the index."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM meetings_fts WHERE rowid = ?", (meeting_id,))
+                conn.execute("DELETE FROM segment_blocks_fts WHERE rowid >= ? AND rowid < ?",
+                             self._block_rowids(meeting_id))
+
+    def rebuild(self, db: "Session", batch_size: int = 1000) -> int:
+        """
+        Re-index every meeting and segment block in the database in one
+        transaction, reading the tables in keyset-paginated batches.
+
+        Returns:
+            int: Number of meetings indexed
+        """
+        from sqlalchemy import select
+        from ..db.models import Meeting, TranscriptSegmentBlock
+
+        start = time.perf_counter()
+        count = 0
+        last_id = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM meetings_fts")
+                conn.execute("DELETE FROM segment_blocks_fts")
+                while True:
+                    rows = db.execute(
+                        select(Meeting.id, Meeting.title, Meeting.summary, Meeting.transcript)
+                        .where(Meeting.id > last_id)
+                        .order_by(Meeting.id)
+                        .limit(batch_size)
+                    ).all()
+                    if not rows:
+                        break
+                    conn.executemany(
+                        "INSERT INTO meetings_fts (rowid, title, summary, transcript) VALUES (?, ?, ?, ?)",
+                        [(r.id, r.title or "", r.summary or "", r.transcript or "") for r in rows],
+                    )
+                    count += len(rows)
+                    last_id = rows[-1].id
+                last_id = 0
+                while True:
+                    blocks = db.execute(
+                        select(TranscriptSegmentBlock.id, TranscriptSegmentBlock.meeting_id,
+                               TranscriptSegmentBlock.block_index, TranscriptSegmentBlock.data)
+                        .where(TranscriptSegmentBlock.id > last_id)
+                        .order_by(TranscriptSegmentBlock.id)
+                        .limit(batch_size)
+                    ).all()
+                    if not blocks:
+                        break
+                    conn.executemany(
+                        "INSERT INTO segment_blocks_fts (rowid, text) VALUES (?, ?)",
+                        [(self._block_rowids(b.meeting_id)[0] + b.block_index,
+                          SegmentArray.from_bytes(b.data).joined_text()) for b in blocks],
+                    )
+                    last_id = blocks[-1].id
+            # Merge the index segments written by the bulk load
+            conn.execute("INSERT INTO meetings_fts (meetings_fts) VALUES ('optimize')")
+            conn.execute("INSERT INTO segment_blocks_fts (segment_blocks_fts) VALUES ('optimize')")
+        logger.info(f"Rebuilt search index with {count} meeting(s) in {time.perf_counter() - start:.2f}s")
+        return count
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+        words = _WORD.findall(query)
+        if not words:
+            return None
+        terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+        return " ".join(terms)
+
+    @staticmethod
+    def _any_word_expression(words: List[str]) -> str:
+        """FTS5 query for text with any of the words, the last one as a prefix."""
+        return " OR ".join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+
+    @staticmethod
+    def _highlight(snippet: str) -> str:
+        """HTML-escape a snippet, then turn its match markers into <mark> tags."""
+        return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+    @staticmethod
+    def _word_pattern(words: List[str]) -> re.Pattern:
+        return re.compile(r"\b(" + "|".join(re.escape(w) for w in words) + r")\w*", re.IGNORECASE)
+
+    @classmethod
+    def _transcript_matches(cls, transcript: str, words: List[str], limit: int = MAX_MATCHES) -> List[dict]:
+        """Character offsets in the transcript where the query words appear."""
+        if not transcript or not words:
+            return []
+        return [
+            {"offset": m.start(), "length": m.end() - m.start()}
+            for m, _ in zip(cls._word_pattern(words).finditer(transcript), range(limit))
+        ]
+
+    @classmethod
+    def _segment_matches(cls, segments: SegmentArray, words: List[str], limit: int = MAX_MATCHES) -> List[dict]:
+        """
+        Start and end times of the segments where the query words appear. The
+        segment texts are joined one per line and searched in one pass, and
+        each match is mapped back to its segment by offset.
+        """
+        import numpy as np
+
+        if not len(segments) or not words:
+            return []
+        texts = [segments.segment_text(i) for i in range(len(segments))]
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        matches = []
+        for m, _ in zip(cls._word_pattern(words).finditer("\n".join(texts)), range(limit)):
+            index = int(np.searchsorted(starts, m.start(), side="right")) - 1
+            matches.append({
+                "start": round(float(segments.start[index]), 2),
+                "end": round(float(segments.end[index]), 2),
+                "text": m.group(0),
+            })
+        return matches
+
+    def search(self, query: str, limit: int = 10, db: Optional["Session"] = None) -> List[dict]:
+        """
+        Rank meetings by bm25 relevance to the query.
+
+        Each result has HTML-escaped snippets of the summary and transcript,
+        with the matches in <mark> tags, and its ``matches``: with ``db``, the
+        start and end times of the transcript segments where the query words
+        appear, read from only the segment blocks that contain them, in one
+        query for all results. Meetings stored without segments, or a search
+        without ``db``, get the character offsets of the matches in the
+        transcript instead.
+        """
+        match = self._match_expression(query)
+        if match is None:
+            return []
+        limit = max(1, min(limit, MAX_RESULTS))
+        words = _WORD.findall(query)
+        block_hits = {}
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"""
+                    SELECT rowid, title,
+                           snippet(meetings_fts, 1, '{_MARK_START}', '{_MARK_END}', '…', 24),
+                           snippet(meetings_fts, 2, '{_MARK_START}', '{_MARK_END}', '…', 24),
+                           bm25(meetings_fts, {', '.join(str(w) for w in RANK_WEIGHTS)}) AS rank
+                    FROM meetings_fts
+                    WHERE meetings_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                    """,
+                    (match, limit),
+                ).fetchall()
+                if db is not None:
+                    any_word = self._any_word_expression(words)
+                    for meeting_id, *_ in rows:
+                        first, end = self._block_rowids(meeting_id)
+                        block_hits[meeting_id] = [
+                            rowid - first for (rowid,) in conn.execute(
+                                "SELECT rowid FROM segment_blocks_fts "
+                                "WHERE segment_blocks_fts MATCH ? AND rowid >= ? AND rowid < ? "
+                                "ORDER BY rowid LIMIT ?",
+                                (any_word, first, end, MAX_MATCHES),
+                            )
+                        ]
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query: {str(e)}")
+            # Only meetings without matching segment blocks need their transcript
+            unmatched = [meeting_id for meeting_id, *_ in rows if not block_hits.get(meeting_id)]
+            transcripts = dict(conn.execute(
+                f"SELECT rowid, transcript FROM meetings_fts WHERE rowid IN ({', '.join('?' * len(unmatched))})",
+                unmatched,
+            ).fetchall()) if unmatched else {}
+
+        segments = {}
+        if any(block_hits.values()):
+            from .meeting_store import get_segment_blocks
+
+            segments = get_segment_blocks(db, [
+                (meeting_id, index) for meeting_id, indexes in block_hits.items() for index in indexes
+            ])
+
+        results = []
+        for meeting_id, title, summary_snippet, transcript_snippet, rank in rows:
+            if meeting_id in segments:
+                matches = self._segment_matches(segments[meeting_id], words)
+            else:
+                matches = self._transcript_matches(transcripts.get(meeting_id, ""), words)
+            results.append({
+                "meeting_id": meeting_id,
+                "title": title,
+                "score": round(-rank, 4),
+                "summary_snippet": self._highlight(summary_snippet),
+                "transcript_snippet": self._highlight(transcript_snippet),
+                "matches": matches,
+            })
+        return results
+
+
+# Create a singleton instance
+search_index = SearchIndex(settings.SEARCH_INDEX_PATH)
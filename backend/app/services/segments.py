@@ -0,0 +1,250 @@
+import re
+import struct
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Segments per stored block; a range query reads only the blocks it overlaps
+SEGMENT_BLOCK_SIZE = 64
+
+_MAGIC = b"SEG1"
+_HEADER = struct.Struct("<4sIII")  # magic, segment count, text bytes, speaker name bytes
+
+_TIMESTAMP = re.compile(r"^(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)$")
+
+
+def whisper_segments(result: dict, offset: float = 0.0) -> List[dict]:
+    """Keep the fields of Whisper's segments worth storing, shifted by ``offset`` seconds."""
+    return [
+        {
+            "start": round(offset + s["start"], 2),
+            "end": round(offset + s["end"], 2),
+            "text": s["text"].strip(),
+            "avg_logprob": round(s.get("avg_logprob", 0.0), 4),
+            "no_speech_prob": round(s.get("no_speech_prob", 0.0), 4),
+        }
+        for s in result["segments"]
+        if s["text"].strip()
+    ]
+
+
+class SegmentArray:
+    """
+    Timestamped transcript segments held column by column.
+
+    Times and scores are float32 arrays and the text of every segment is one
+    UTF-8 buffer with offsets, so a meeting's segments pack into a few
+    contiguous byte strings instead of thousands of small objects, and a time
+    range is two binary searches.
+    """
+
+    def __init__(self, start: "np.ndarray", end: "np.ndarray", avg_logprob: "np.ndarray",
+                 no_speech_prob: "np.ndarray", text_offsets: "np.ndarray", text: bytes,
+                 speaker: Optional["np.ndarray"] = None, speaker_names: Sequence[str] = ()):
+        import numpy as np
+
+        self.start = start
+        self.end = end
+        self.avg_logprob = avg_logprob
+        self.no_speech_prob = no_speech_prob
+        self.text_offsets = text_offsets
+        self.text = text
+        # Index into speaker_names, -1 where no speaker was assigned
+        self.speaker = speaker if speaker is not None else np.full(len(start), -1, dtype=np.int16)
+        self.speaker_names = list(speaker_names)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[dict]) -> "SegmentArray":
+        import numpy as np
+
+        segments = sorted(segments, key=lambda s: s["start"])
+        encoded = [s["text"].encode("utf-8") for s in segments]
+        offsets = np.zeros(len(segments) + 1, dtype=np.int32)
+        np.cumsum([len(text) for text in encoded], out=offsets[1:])
+        names: List[str] = []
+        speaker = np.full(len(segments), -1, dtype=np.int16)
+        for i, s in enumerate(segments):
+            name = s.get("speaker")
+            if name:
+                if name not in names:
+                    names.append(name)
+                speaker[i] = names.index(name)
+        return cls(
+            start=np.array([s["start"] for s in segments], dtype=np.float32),
+            end=np.array([s["end"] for s in segments], dtype=np.float32),
+            avg_logprob=np.array([s.get("avg_logprob", 0.0) for s in segments], dtype=np.float32),
+            no_speech_prob=np.array([s.get("no_speech_prob", 0.0) for s in segments], dtype=np.float32),
+            text_offsets=offsets,
+            text=b"".join(encoded),
+            speaker=speaker,
+            speaker_names=names,
+        )
+
+    @classmethod
+    def empty(cls) -> "SegmentArray":
+        return cls.from_segments([])
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def to_bytes(self) -> bytes:
+        names = "\n".join(self.speaker_names).encode("utf-8")
+        return b"".join([
+            _HEADER.pack(_MAGIC, len(self), len(self.text), len(names)),
+            self.start.astype("<f4").tobytes(),
+            self.end.astype("<f4").tobytes(),
+            self.avg_logprob.astype("<f4").tobytes(),
+            self.no_speech_prob.astype("<f4").tobytes(),
+            self.text_offsets.astype("<i4").tobytes(),
+            self.speaker.astype("<i2").tobytes(),
+            self.text,
+            names,
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SegmentArray":
+        import numpy as np
+
+        magic, count, text_size, names_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a packed segment block")
+        position = _HEADER.size
+
+        def take(dtype: str, length: int) -> "np.ndarray":
+            nonlocal position
+            array = np.frombuffer(data, dtype=dtype, count=length, offset=position)
+            position += array.nbytes
+            return array
+
+        start, end = take("<f4", count), take("<f4", count)
+        avg_logprob, no_speech_prob = take("<f4", count), take("<f4", count)
+        text_offsets = take("<i4", count + 1)
+        speaker = take("<i2", count)
+        text = data[position:position + text_size]
+        names = data[position + text_size:position + text_size + names_size].decode("utf-8")
+        return cls(start, end, avg_logprob, no_speech_prob, text_offsets, text, speaker,
+                   names.split("\n") if names else [])
+
+    @classmethod
+    def concat(cls, arrays: Sequence["SegmentArray"]) -> "SegmentArray":
+        import numpy as np
+
+        if not arrays:
+            return cls.empty()
+        if len(arrays) == 1:
+            return arrays[0]
+        names: List[str] = []
+        speakers, offsets = [], []
+        base = 0
+        for array in arrays:
+            # Speaker names are per block; remap to one shared list
+            mapping = np.full(len(array.speaker_names) + 1, -1, dtype=np.int16)
+            for i, name in enumerate(array.speaker_names):
+                if name not in names:
+                    names.append(name)
+                mapping[i] = names.index(name)
+            speakers.append(mapping[array.speaker])  # -1 indexes the trailing -1
+            offsets.append(array.text_offsets[:-1] + base)
+            base += len(array.text)
+        offsets.append(np.array([base], dtype=np.int32))
+        return cls(
+            start=np.concatenate([a.start for a in arrays]),
+            end=np.concatenate([a.end for a in arrays]),
+            avg_logprob=np.concatenate([a.avg_logprob for a in arrays]),
+            no_speech_prob=np.concatenate([a.no_speech_prob for a in arrays]),
+            text_offsets=np.concatenate(offsets).astype(np.int32),
+            text=b"".join(a.text for a in arrays),
+            speaker=np.concatenate(speakers),
+            speaker_names=names,
+        )
+
+    def take(self, lo: int, hi: int) -> "SegmentArray":
+        """Segments ``lo`` to ``hi`` (exclusive) as a new array sharing this one's buffers."""
+        offsets = self.text_offsets[lo:hi + 1]
+        return SegmentArray(
+            self.start[lo:hi], self.end[lo:hi], self.avg_logprob[lo:hi], self.no_speech_prob[lo:hi],
+            offsets - offsets[0], self.text[offsets[0]:offsets[-1]],
+            self.speaker[lo:hi], self.speaker_names,
+        )
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> "SegmentArray":
+        """Segments overlapping ``start``..``end`` seconds; either bound may be open."""
+        import numpy as np
+
+        lo = 0 if start is None else int(np.searchsorted(np.maximum.accumulate(self.end), start, side="right"))
+        hi = len(self) if end is None else int(np.searchsorted(self.start, end, side="left"))
+        return self.take(lo, max(lo, hi))
+
+    def blocks(self, size: int = SEGMENT_BLOCK_SIZE) -> Iterator["SegmentArray"]:
+        for lo in range(0, len(self), size):
+            yield self.take(lo, min(lo + size, len(self)))
+
+    def segment_text(self, index: int) -> str:
+        return self.text[self.text_offsets[index]:self.text_offsets[index + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            segment = {
+                "start": round(float(self.start[i]), 2),
+                "end": round(float(self.end[i]), 2),
+                "text": self.segment_text(i),
+                "avg_logprob": round(float(self.avg_logprob[i]), 4),
+                "no_speech_prob": round(float(self.no_speech_prob[i]), 4),
+            }
+            if self.speaker[i] >= 0:
+                segment["speaker"] = self.speaker_names[self.speaker[i]]
+            yield segment
+
+    def joined_text(self) -> str:
+        return " ".join(self.segment_text(i) for i in range(len(self)))
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse seconds (``600``) or a clock time (``10:00``, ``1:02:03.5``) into seconds."""
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        match = _TIMESTAMP.match(value)
+        if not match:
+            raise ValueError(f"Invalid timestamp '{value}'")
+        hours, minutes, secs = match.groups()
+        seconds = int(hours or 0) * 3600 + int(minutes) * 60 + float(secs)
+    if seconds < 0:
+        raise ValueError(f"Invalid timestamp '{value}'")
+    return seconds
+
+
+def format_timestamp(seconds: float, separator: str) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def _cue_text(segment: dict) -> str:
+    text = segment["text"].replace("\n", " ")
+    if segment.get("speaker"):
+        return f"{segment['speaker']}: {text}"
+    return text
+
+
+def iter_srt(blocks: Iterable[SegmentArray]) -> Iterator[str]:
+    """SubRip cues for each segment, produced block by block."""
+    number = 0
+    for block in blocks:
+        for segment in block:
+            number += 1
+            yield (f"{number}\n{format_timestamp(segment['start'], ',')} --> "
+                   f"{format_timestamp(segment['end'], ',')}\n{_cue_text(segment)}\n\n")
+
+
+def iter_vtt(blocks: Iterable[SegmentArray]) -> Iterator[str]:
+    """WebVTT header and cues for each segment, produced block by block."""
+    yield "WEBVTT\n\n"
+    for block in blocks:
+        for segment in block:
+            yield (f"{format_timestamp(segment['start'], '.')} --> "
+                   f"{format_timestamp(segment['end'], '.')}\n{_cue_text(segment)}\n\n")
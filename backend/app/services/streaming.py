@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Tuple
+
+from ..config import settings
+from .cache import result_cache, TRANSCRIPTS
+from .model_registry import model_registry
+from .summarizer import summarizer
+from .transcriber import DECODE_OPTIONS, cache_models
+from .audio import load_pcm, duration_seconds
+from .metrics import inference_timer
+from .profiles import get_profile, select_profile
+from .segments import whisper_segments
+from .vad import SAMPLE_RATE, split_on_silence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Windows are submitted one at a time, so a stream that is abandoned stops
+# using inference threads after its current window
+_executor = ThreadPoolExecutor(max_workers=settings.STREAM_WORKERS, thread_name_prefix="stream")
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _transcribe_window(model_name: str, audio: "np.ndarray", options: dict) -> Tuple[dict, dict]:
+    model = model_registry.get(model_name)
+    with model_registry.inference_lock(model_name), \
+            inference_timer(model_name, duration_seconds(audio)) as timing:
+        result = model.transcribe(audio, **options)
+    return result, timing
+
+
+async def stream_pipeline(file_path: str, audio_hash: str, model_name: Optional[str] = None,
+                          title: Optional[str] = None, profile: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Transcribe and summarize an audio file, yielding Server-Sent Events as
+    results become available.
+
+    The audio is cut at silences into windows no longer than Whisper's 30s
+    context and decoded window by window, so each window's segments are sent
+    as soon as they are ready. ``profile`` names the decoding profile
+    (default: settings.DEFAULT_DECODING_PROFILE; audio over the length budget
+    uses the next faster one) and ``model_name`` overrides its model.
+    Events, in order: ``progress`` (stage changes), ``segment`` (start, end
+    and text, in seconds from the start of the audio), ``transcript`` (with
+    the ``model``, ``profile`` and measured ``real_time_factor``),
+    ``summary``, then ``done`` with the stored meeting's id; ``error`` ends
+    the stream early.
+
+    If the consumer stops iterating (e.g. the client disconnects), no further
+    windows are decoded.
+    """
+    loop = asyncio.get_running_loop()
+    requested = get_profile(profile)
+    cache_key = (audio_hash, cache_models(model_name, requested), model_registry.precision,
+                 requested.transcribe_options(DECODE_OPTIONS), "windowed", "segments")
+
+    try:
+        output = await result_cache.get_async(TRANSCRIPTS, cache_key)
+        if output is None:
+            yield format_sse("progress", {"stage": "decoding"})
+            audio = await loop.run_in_executor(_executor, load_pcm, file_path, audio_hash)
+            bounds = split_on_silence(audio, chunk_seconds=min(settings.CHUNK_SECONDS, 30.0))
+            selected = select_profile(requested.name, audio_seconds=duration_seconds(audio))
+            window_model = model_name or selected.model
+            options = selected.transcribe_options(DECODE_OPTIONS)
+
+            yield format_sse("progress", {
+                "stage": "transcribing", "windows": len(bounds), "profile": selected.name,
+            })
+            segments = []
+            inference_seconds = 0.0
+            for index, (start, end) in enumerate(bounds):
+                result, timing = await loop.run_in_executor(
+                    _executor, _transcribe_window, window_model, audio[start:end], options
+                )
+                inference_seconds += timing["seconds"]
+                for segment in whisper_segments(result, offset=start / SAMPLE_RATE):
+                    segments.append(segment)
+                    yield format_sse("segment", {
+                        "window": index,
+                        "start": segment["start"],
+                        "end": segment["end"],
+                        "text": segment["text"],
+                    })
+            output = {
+                "text": " ".join(segment["text"] for segment in segments),
+                "segments": segments,
+                "model": window_model,
+                "profile": selected.name,
+                "real_time_factor": (round(duration_seconds(audio) / inference_seconds, 2)
+                                     if inference_seconds > 0 else None),
+            }
+            await result_cache.set_async(TRANSCRIPTS, cache_key, output)
+
+        transcript = output["text"]
+        yield format_sse("transcript", {
+            "transcript": transcript,
+            "model": output["model"],
+            "profile": output["profile"],
+            "real_time_factor": output["real_time_factor"],
+        })
+
+        yield format_sse("progress", {"stage": "summarizing"})
+        summary, action_items = await summarizer.summarize(transcript, output["segments"])
+        yield format_sse("summary", {"summary": summary, "action_items": action_items})
+
+        from .meeting_store import persist_result
+
+        meeting_id = await persist_result(title, {
+            "transcript": transcript,
+            "summary": summary,
+            "action_items": action_items,
+            "segments": output["segments"],
+        })
+        yield format_sse("done", {"meeting_id": meeting_id})
+
+    except asyncio.CancelledError:
+        logger.info("Streaming pipeline cancelled by client")
+        raise
+    except Exception as e:
+        logger.error(f"Streaming pipeline failed: {str(e)}")
+        yield format_sse("error", {"detail": str(e)})
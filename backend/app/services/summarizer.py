@@ -1,70 +1,158 @@
 import os
-import httpx
-from typing import Tuple
+import asyncio
+import logging
+from typing import Optional, Sequence, Tuple
 from ..config import settings
+from .cache import result_cache, hash_text, SUMMARIES, SUMMARY_CHUNKS
+from .metrics import stage_timer
+from .text_chunker import chunk_text, estimate_tokens, truncate_tokens
+from .summarizer_backends import SummarizerBackend, create_backend
+from .action_items import extract_action_items, structure_item
 
 # Set tokenizer parallelism environment variable
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-class Summarizer:
-    def __init__(self):
-        self.api_url = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-        self.headers = {"Authorization": f"Bearer {settings.HUGGINGFACE_API_KEY}"}
+# Bump whenever the prompts or the action item parsing change, so cached
+# summaries produced by the old version are no longer used
+PROMPT_VERSION = 3
 
-    async def summarize(self, transcript: str) -> Tuple[str, list]:
-        """
-        Generate a summary and action items from a transcript using Hugging Face Inference API.
-        """
-        try:
-            # Prepare the prompt for summary
-            summary_prompt = f"""Summarize the following meeting transcript in a concise way, highlighting the key points discussed:
+SUMMARY_PROMPT = """Summarize the following meeting transcript in a concise way, highlighting the key points discussed:
 
-{transcript}
+{text}
 
 Summary:"""
 
-            # Generate summary using Hugging Face API
-            async with httpx.AsyncClient() as client:
-                summary_response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"inputs": summary_prompt}
-                )
-                summary_response.raise_for_status()
-                summary = summary_response.json()[0]["summary_text"]
+ACTION_ITEMS_PROMPT = """Extract action items from the following meeting transcript. List only the specific tasks that need to be done:
 
-            # Prepare the prompt for action items
-            action_items_prompt = f"""Extract action items from the following meeting transcript. List only the specific tasks that need to be done:
-
-{transcript}
+{text}
 
 Action Items:"""
 
-            # Generate action items using Hugging Face API
-            async with httpx.AsyncClient() as client:
-                action_items_response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={"inputs": action_items_prompt}
-                )
-                action_items_response.raise_for_status()
-                action_items_text = action_items_response.json()[0]["summary_text"]
-
-            # Process action items into a list
-            action_items = []
+REDUCE_PROMPT = """Combine the following partial summaries of one meeting into a single concise summary, highlighting the key points discussed:
+
+{text}
+
+Summary:"""
+
+logger = logging.getLogger(__name__)
+
+class SummarizationError(Exception):
+    """The backend could not produce a summary."""
+
+class Summarizer:
+    def __init__(self, backend: Optional[SummarizerBackend] = None):
+        # Remote Inference API or in-process model, chosen by settings.SUMMARIZER_BACKEND
+        self.backend = backend or create_backend()
+        self.model_id = self.backend.model_id
+
+    async def start(self):
+        """Open the backend's long-lived resources (HTTP client or local model)."""
+        await self.backend.start()
+
+    async def close(self):
+        """Release the backend's resources."""
+        await self.backend.close()
+
+    async def _generate_cached(self, prompt: str) -> str:
+        """Generate for one prompt, reusing the cached output for an identical prompt."""
+        cache_key = (hash_text(prompt), self.backend.cache_id, PROMPT_VERSION)
+        cached = await result_cache.get_async(SUMMARY_CHUNKS, cache_key)
+        if cached is not None:
+            return cached
+        output = await self.backend.generate(prompt)
+        await result_cache.set_async(SUMMARY_CHUNKS, cache_key, output)
+        return output
+
+    async def _summarize_text(self, text: str, depth: int = 0) -> str:
+        """
+        Summarize text of any length with map-reduce.
+
+        The text is split into chunks that fit the model context, the chunks
+        are summarized concurrently, and the joined partial summaries are
+        reduced the same way until they fit in a single call.
+        """
+        template = SUMMARY_PROMPT if depth == 0 else REDUCE_PROMPT
+        chunks = chunk_text(text, settings.SUMMARY_CHUNK_TOKENS)
+        if len(chunks) <= 1:
+            return await self._generate_cached(template.format(text=text))
+
+        partials = await asyncio.gather(
+            *(self._generate_cached(template.format(text=chunk)) for chunk in chunks)
+        )
+        combined = " ".join(p.strip() for p in partials)
+
+        if depth + 1 >= settings.SUMMARY_MAX_REDUCE_DEPTH or estimate_tokens(combined) >= estimate_tokens(text):
+            # Reduction has stopped shrinking the text; cut every partial to an
+            # equal share of one call so the whole meeting still reaches the summary
+            share = max(1, settings.SUMMARY_CHUNK_TOKENS // len(partials))
+            logger.warning(f"Partial summaries did not converge, reducing {len(partials)} of them "
+                           f"cut to {share} tokens each")
+            bounded = " ".join(truncate_tokens(p.strip(), share) for p in partials)
+            return await self._generate_cached(REDUCE_PROMPT.format(text=bounded))
+        return await self._summarize_text(combined, depth + 1)
+
+    async def _extract_action_items(self, transcript: str) -> list:
+        """Prompt the model for the action items of each transcript chunk concurrently and merge them."""
+        chunks = chunk_text(transcript, settings.SUMMARY_CHUNK_TOKENS) or [transcript]
+        outputs = await asyncio.gather(
+            *(self._generate_cached(ACTION_ITEMS_PROMPT.format(text=chunk)) for chunk in chunks)
+        )
+
+        # Process action items into a list
+        action_items = []
+        for action_items_text in outputs:
             for item in action_items_text.split('\n'):
                 item = item.strip()
                 if item and not item.lower().startswith('action items:'):
                     # Remove any numbering or bullet points
                     item = item.lstrip('- *1234567890. ')
-                    if item:
+                    if item and item not in action_items:
                         action_items.append(item)
+        return [structure_item(item) for item in action_items]
+
+    async def summarize(self, transcript: str, segments: Optional[Sequence[dict]] = None) -> Tuple[str, list]:
+        """
+        Generate a summary and action items from a transcript using the configured backend.
+        Transcripts longer than the model context are summarized chunk by chunk.
 
-            return summary, action_items
+        Action items come from the local extractor, or with
+        settings.ACTION_ITEM_EXTRACTOR 'model' from a second prompt to the
+        backend. Each is a dict with ``description``, ``speaker``, ``owner``
+        and ``due_date``; pass the transcript's ``segments`` to fill in
+        ``speaker`` from their speaker labels.
+
+        Raises:
+            SummarizationError: if the backend fails, so that no error text is
+                stored as a meeting's summary
+        """
+        local = settings.ACTION_ITEM_EXTRACTOR == "local"
+        cache_key = (hash_text(transcript), self.backend.cache_id, settings.ACTION_ITEM_EXTRACTOR, PROMPT_VERSION)
+        try:
+            cached = await result_cache.get_async(SUMMARIES, cache_key)
+            if cached is not None:
+                summary, action_items = cached["summary"], cached["action_items"]
+            else:
+                with stage_timer("summarize"):
+                    if local:
+                        summary, action_items = await self._summarize_text(transcript), None
+                    else:
+                        # The summary and the action items are independent, so run them concurrently
+                        summary, action_items = await asyncio.gather(
+                            self._summarize_text(transcript),
+                            self._extract_action_items(transcript),
+                        )
+                await result_cache.set_async(SUMMARIES, cache_key,
+                                             {"summary": summary, "action_items": action_items})
 
         except Exception as e:
-            print(f"Error in summarizer: {str(e)}")
-            return "Error generating summary", []
+            logger.error(f"Error in summarizer: {str(e)}")
+            raise SummarizationError(f"Failed to generate summary: {str(e)}") from e
+
+        if local:
+            # Milliseconds even for hours of transcript, and depends on the segments, so not cached
+            with stage_timer("action_items"):
+                action_items = extract_action_items(transcript, segments)
+        return summary, action_items
 
 # Create a singleton instance
 summarizer = Summarizer() 
\ No newline at end of file
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from ..config import settings
+from .metrics import SUMMARIZER_CALL_SECONDS
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited, or the model is still loading
+RETRY_STATUS_CODES = {429, 503}
+
+
+class SummarizerBackend(ABC):
+    """
+    Runs a seq2seq summarization model on a single prompt.
+
+    ``cache_id`` identifies the backend, model and any setting that changes the
+    output; it is part of the summary cache key.
+    """
+    name = "base"
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+
+    @property
+    def cache_id(self) -> str:
+        return f"{self.name}:{self.model_id}"
+
+    async def start(self):
+        """Acquire long-lived resources (clients, models)."""
+
+    async def close(self):
+        """Release the resources acquired in start()."""
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """Generate the model output for one prompt."""
+
+
+class RemoteBackend(SummarizerBackend):
+    """Hugging Face Inference API over a pooled HTTP client."""
+    name = "remote"
+
+    def __init__(self, model_id: str):
+        super().__init__(model_id)
+        self.api_url = f"{settings.HF_API_BASE_URL.rstrip('/')}/{model_id}"
+        self.headers = {"Authorization": f"Bearer {settings.HUGGINGFACE_API_KEY}"}
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        """Create the pooled HTTP client shared by all summarization requests."""
+        # Imported here rather than at module level; it is slow to import and only needed by this backend
+        import httpx
+
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(settings.HF_TIMEOUT_SECONDS, connect=settings.HF_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.HF_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HF_MAX_CONNECTIONS,
+            ),
+        )
+        # Caps in-flight inference calls so bursts don't trip rate limits
+        self._semaphore = asyncio.Semaphore(settings.HF_MAX_CONCURRENCY)
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    def _retry_delay(self, response: "httpx.Response", attempt: int) -> float:
+        """Seconds to wait before retrying a 429 or 503 response."""
+        delay = settings.HF_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+        retry_after = response.headers.get("retry-after")
+        if retry_after and retry_after.replace(".", "", 1).isdigit():
+            delay = max(delay, float(retry_after))
+        elif response.status_code == 503:
+            # "Model is currently loading" responses carry an estimated load time
+            try:
+                delay = max(delay, float(response.json().get("estimated_time", 0)))
+            except (ValueError, AttributeError):
+                pass
+        return min(delay, settings.HF_MAX_RETRY_DELAY_SECONDS)
+
+    async def generate(self, prompt: str) -> str:
+        """
+        Run one summarization call against the Inference API, retrying with
+        backoff while the model is loading or the API is rate limiting.
+        """
+        import httpx
+
+        if self._client is None:
+            await self.start()
+
+        for attempt in range(settings.HF_MAX_RETRIES + 1):
+            async with self._semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await self._client.post(self.api_url, json={"inputs": prompt})
+                except httpx.HTTPError:
+                    SUMMARIZER_CALL_SECONDS.observe(time.perf_counter() - start, backend=self.name, status="error")
+                    raise
+                SUMMARIZER_CALL_SECONDS.observe(
+                    time.perf_counter() - start, backend=self.name, status=str(response.status_code)
+                )
+            if response.status_code in RETRY_STATUS_CODES and attempt < settings.HF_MAX_RETRIES:
+                delay = self._retry_delay(response, attempt)
+                logger.warning(
+                    f"Hugging Face API returned {response.status_code}, retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{settings.HF_MAX_RETRIES})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.json()[0]["summary_text"]
+
+
+class LocalBackend(SummarizerBackend):
+    """
+    In-process seq2seq model with dynamic batching.
+
+    Concurrent generate() calls are collected for up to ``batch_wait_ms`` or
+    until ``batch_size`` prompts are waiting, then run as one padded forward
+    pass on a dedicated inference thread.
+    """
+    name = "local"
+
+    def __init__(self, model_id: str, quantize: bool, batch_size: int, batch_wait_ms: int,
+                 max_input_tokens: int, max_new_tokens: int, num_beams: int):
+        super().__init__(model_id)
+        self.quantize = quantize
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self._tokenizer = None
+        self._model = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        # One forward pass at a time; batching provides the parallelism
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+
+    @property
+    def cache_id(self) -> str:
+        suffix = ":int8" if self.quantize else ""
+        return f"{self.name}:{self.model_id}{suffix}"
+
+    def _load(self):
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        logger.info(f"Loading local summarization model '{self.model_id}'...")
+        start = time.perf_counter()
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id)
+        model.eval()
+        if self.quantize:
+            # int8 weights for the Linear layers, activations quantized on the fly
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._model = model
+        logger.info(
+            f"Loaded local summarization model '{self.model_id}'"
+            f"{' (int8)' if self.quantize else ''} in {time.perf_counter() - start:.2f}s"
+        )
+
+    async def start(self):
+        """Load the model and start the batching loop."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._worker is not None:
+                return
+            if self._model is None:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        """Stop the batching loop and fail any prompts still waiting."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Summarizer is shutting down"))
+
+    async def generate(self, prompt: str) -> str:
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Callers that gave up don't need a result
+        return [(prompt, future) for prompt, future in batch if not future.done()]
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                outputs = await loop.run_in_executor(
+                    self._executor, self._run_batch, [prompt for prompt, _ in batch]
+                )
+            except Exception as e:
+                SUMMARIZER_CALL_SECONDS.observe(time.perf_counter() - start, backend=self.name, status="error")
+                logger.error(f"Local summarization batch failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            SUMMARIZER_CALL_SECONDS.observe(time.perf_counter() - start, backend=self.name, status="ok")
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    def _run_batch(self, prompts: List[str]) -> List[str]:
+        import torch
+
+        inputs = self._tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_tokens,
+        )
+        with torch.inference_mode():
+            output_ids = self._model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                num_beams=self.num_beams,
+            )
+        return self._tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+def create_backend(name: Optional[str] = None) -> SummarizerBackend:
+    """Build the summarizer backend selected in Settings."""
+    name = name or settings.SUMMARIZER_BACKEND
+    if name == "remote":
+        return RemoteBackend(settings.SUMMARIZER_MODEL)
+    if name == "local":
+        return LocalBackend(
+            settings.SUMMARIZER_MODEL,
+            quantize=settings.LOCAL_SUMMARIZER_QUANTIZE,
+            batch_size=settings.LOCAL_SUMMARIZER_BATCH_SIZE,
+            batch_wait_ms=settings.LOCAL_SUMMARIZER_BATCH_WAIT_MS,
+            max_input_tokens=settings.LOCAL_SUMMARIZER_MAX_INPUT_TOKENS,
+            max_new_tokens=settings.LOCAL_SUMMARIZER_MAX_NEW_TOKENS,
+            num_beams=settings.LOCAL_SUMMARIZER_NUM_BEAMS,
+        )
+    raise ValueError(f"Unknown summarizer backend '{name}'. Use 'remote' or 'local'")
@@ -0,0 +1,94 @@
+import hashlib
+import math
+import re
+from typing import List
+
+# Sentence ends: ., ! or ? followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# BPE tokenizers such as BART's produce roughly this many tokens per word or
+# punctuation mark on English text
+TOKENS_PER_WORD = 1.3
+
+# On average one sentence in this many closes a chunk once it is past half
+# the budget; see chunk_text
+ANCHOR_MODULUS = 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of model tokens in a piece of text."""
+    return math.ceil(len(_TOKEN.findall(text)) * TOKENS_PER_WORD)
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    words = sentence.split()
+    step = max(1, int(max_tokens / TOKENS_PER_WORD))
+    return [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+
+
+def _is_anchor(sentence: str) -> bool:
+    digest = hashlib.sha1(sentence.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % ANCHOR_MODULUS == 0
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Keep the leading sentences of ``text`` that fit in ``max_tokens``
+    estimated tokens, cutting the first sentence that doesn't fit by words.
+    """
+    kept: List[str] = []
+    count = 0
+    for sentence in split_sentences(text):
+        n = estimate_tokens(sentence)
+        if count + n > max_tokens:
+            remaining = max_tokens - count
+            piece = _split_long_sentence(sentence, remaining)[0] if remaining > 0 else ""
+            # The word estimate is a little generous; trim until the piece fits
+            while piece and estimate_tokens(piece) > remaining:
+                piece = piece.rsplit(" ", 1)[0] if " " in piece else ""
+            if piece:
+                kept.append(piece)
+            break
+        kept.append(sentence)
+        count += n
+    return " ".join(kept)
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Pack sentences into chunks of at most ``max_tokens`` estimated tokens.
+
+    Once a chunk is past half the budget it is closed after an "anchor"
+    sentence, chosen by hashing the sentence text. Because the cut points
+    depend on content rather than on position, editing one part of a
+    transcript leaves the chunks elsewhere unchanged, so their cached
+    summaries can be reused.
+    """
+    min_tokens = max_tokens // 2
+    chunks: List[str] = []
+    current: List[str] = []
+    count = 0
+
+    for sentence in split_sentences(text):
+        n = estimate_tokens(sentence)
+        pieces = _split_long_sentence(sentence, max_tokens) if n > max_tokens else [sentence]
+        for piece in pieces:
+            n = estimate_tokens(piece)
+            if current and count + n > max_tokens:
+                chunks.append(" ".join(current))
+                current, count = [], 0
+            current.append(piece)
+            count += n
+            if count >= min_tokens and _is_anchor(piece):
+                chunks.append(" ".join(current))
+                current, count = [], 0
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
@@ -1,73 +1,304 @@
-import whisper
-import tempfile
-import os
-from pathlib import Path
 import logging
-from typing import Optional
-import ffmpeg
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from ..config import settings
+from .parallel_transcriber import get_parallel_transcriber
+from .cache import result_cache, hash_file, TRANSCRIPTS
+from .model_registry import model_registry
+from .audio import load_pcm, duration_seconds
+from .metrics import inference_timer, stage_timer
+from .diarization import diarize_segments
+from .segments import whisper_segments
+from .profiles import DecodingProfile, get_profile, select_profile, step_down
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
-class AudioTranscriber:
-    def __init__(self):
-        """Initialize the Whisper model."""
-        try:
-            # Load the base model - can be changed to 'tiny', 'base', 'small', 'medium', or 'large'
-            self.model = whisper.load_model("base")
-            logger.info("Successfully initialized Whisper model")
-        except Exception as e:
-            logger.error(f"Failed to initialize Whisper model: {str(e)}")
-            raise
+DECODE_OPTIONS = dict(
+    fp16=False,  # Use CPU
+    language="en",  # Can be made dynamic based on user input
+)
 
-    def _validate_audio_file(self, file_path: str) -> bool:
-        """Validate if the file is a valid audio file."""
-        try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                return False
+# Clips up to Whisper's native window can be decoded together in one batch
+BATCH_WINDOW_SECONDS = 30.0
 
-            # Try to probe the file with ffmpeg
-            probe = ffmpeg.probe(file_path)
-            if 'streams' not in probe:
-                return False
+# Whisper's own thresholds for treating a window as silence
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
 
-            # Check if it has an audio stream
-            has_audio = any(stream['codec_type'] == 'audio' for stream in probe['streams'])
-            return has_audio
+def cache_models(model_name: Optional[str], requested: DecodingProfile) -> Tuple[str, str]:
+    """
+    Resolve the Whisper models a request decodes with, for its transcript
+    cache key: one for audio of any length and one for audio long enough to
+    step down to a faster profile. An explicit ``model_name`` is used for
+    both; otherwise each comes from the profile. A default request and one
+    naming the same models share cache entries.
 
-        except ffmpeg.Error:
-            return False
-        except Exception as e:
-            logger.error(f"Error validating audio file: {str(e)}")
-            return False
+    Raises:
+        ModelNotAllowedError: If ``model_name`` is not in the allowed list
+    """
+    if model_name is not None:
+        model_name = model_registry.resolve(model_name)
+        return model_name, model_name
+    return requested.model, step_down(requested.name).model
+
+
+def _outcome(output: dict) -> dict:
+    return {
+        "transcript": output["text"],
+        "segments": output["segments"],
+        "model": output.get("model"),
+        "profile": output.get("profile"),
+        "real_time_factor": output.get("real_time_factor"),
+    }
 
-    def transcribe_audio(self, file_path: str) -> Optional[str]:
+class AudioTranscriber:
+    """Transcribe audio files with the shared Whisper models from the model registry."""
+
+    def transcribe_audio(self, file_path: str, chunked: Optional[bool] = None,
+                         audio_hash: Optional[str] = None,
+                         model_name: Optional[str] = None,
+                         profile: Optional[str] = None) -> Optional[str]:
         """
         Transcribe an audio file using Whisper.
         
         Args:
             file_path (str): Path to the audio file
+            chunked (Optional[bool]): Split at silences and transcribe chunks in
+                parallel; defaults to settings.TRANSCRIBE_CHUNKED
+            audio_hash (Optional[str]): SHA-256 of the file if already known;
+                used as the transcript cache key
+            model_name (Optional[str]): Whisper model to use; defaults to the profile's model
+            profile (Optional[str]): Decoding profile; defaults to settings.DEFAULT_DECODING_PROFILE
             
         Returns:
             Optional[str]: Transcribed text or None if transcription fails
         """
+        return self.transcribe_segments(file_path, chunked, audio_hash, model_name, profile)["text"]
+
+    def transcribe_segments(self, file_path: str, chunked: Optional[bool] = None,
+                            audio_hash: Optional[str] = None,
+                            model_name: Optional[str] = None,
+                            profile: Optional[str] = None) -> dict:
+        """
+        Transcribe an audio file, keeping Whisper's timestamped segments.
+        Arguments are as for transcribe_audio. Audio longer than
+        settings.PROFILE_DEGRADE_AUDIO_SECONDS is decoded with the next
+        faster profile.
+
+        Returns:
+            dict: ``text``; ``segments``, each with start, end, text,
+            avg_logprob and no_speech_prob; the ``profile`` actually used and
+            the ``real_time_factor`` measured when it was transcribed
+        """
         try:
-            # Validate the audio file
-            if not self._validate_audio_file(file_path):
-                raise ValueError("Invalid audio file format")
+            requested = get_profile(profile)
+            models = cache_models(model_name, requested)
+            use_chunks = settings.TRANSCRIBE_CHUNKED if chunked is None else chunked
+            audio_hash = audio_hash or hash_file(file_path)
 
-            # Transcribe the audio
-            result = self.model.transcribe(
-                file_path,
-                fp16=False,  # Use CPU
-                language="en"  # Can be made dynamic based on user input
-            )
+            # Return a cached transcript of identical audio if there is one
+            cache_key = (audio_hash, models, model_registry.precision,
+                         requested.transcribe_options(DECODE_OPTIONS), use_chunks, "segments")
+            cached = result_cache.get(TRANSCRIPTS, cache_key)
+            if cached is not None:
+                logger.info("Transcript cache hit")
+                return cached
 
-            return result["text"]
+            # Decode once; this also validates the file
+            audio = load_pcm(file_path, audio_hash)
+            selected = select_profile(requested.name, audio_seconds=duration_seconds(audio))
+            output = self._transcribe_pcm(audio, model_name or selected.model, use_chunks, selected)
+
+            result_cache.set(TRANSCRIPTS, cache_key, output)
+            return output
 
         except Exception as e:
             logger.error(f"Error during transcription: {str(e)}")
             raise
 
+    def transcribe_with_speakers(self, file_path: str, audio_hash: Optional[str] = None,
+                                 model_name: Optional[str] = None,
+                                 profile: Optional[str] = None) -> dict:
+        """
+        Transcribe an audio file and label each Whisper segment with a speaker.
+
+        Always transcribes in one pass, since diarization needs Whisper's
+        segment timestamps over the whole recording.
+
+        Returns:
+            dict: As from transcribe_segments, with a speaker on each segment
+        """
+        requested = get_profile(profile)
+        models = cache_models(model_name, requested)
+        audio_hash = audio_hash or hash_file(file_path)
+        cache_key = (audio_hash, models, model_registry.precision,
+                     requested.transcribe_options(DECODE_OPTIONS), "diarized",
+                     settings.DIARIZATION_THRESHOLD, settings.DIARIZATION_MAX_SPEAKERS)
+        cached = result_cache.get(TRANSCRIPTS, cache_key)
+        if cached is not None:
+            logger.info("Diarized transcript cache hit")
+            return cached
+
+        audio = load_pcm(file_path, audio_hash)
+        selected = select_profile(requested.name, audio_seconds=duration_seconds(audio))
+        output = self._transcribe_pcm(audio, model_name or selected.model, False, selected)
+        with stage_timer("diarize"):
+            output["segments"] = diarize_segments(audio, output["segments"])
+
+        result_cache.set(TRANSCRIPTS, cache_key, output)
+        return output
+
+    def _transcribe_pcm(self, audio: "np.ndarray", model_name: str, use_chunks: bool,
+                        profile: DecodingProfile) -> dict:
+        options = profile.transcribe_options(DECODE_OPTIONS)
+        if use_chunks:
+            with inference_timer(model_name, duration_seconds(audio)) as timing:
+                output = get_parallel_transcriber(model_name).transcribe(audio, **options)
+        else:
+            # Transcribe the audio
+            model = model_registry.get(model_name)
+            with model_registry.inference_lock(model_name), \
+                    inference_timer(model_name, duration_seconds(audio)) as timing:
+                result = model.transcribe(audio, **options)
+            output = {"text": result["text"], "segments": whisper_segments(result)}
+        return {
+            **output,
+            "model": model_name,
+            "profile": profile.name,
+            "real_time_factor": round(timing["real_time_factor"], 2) if timing["real_time_factor"] else None,
+        }
+
+    def _decode_clips(self, model_name: str, clips: List["np.ndarray"], profile: DecodingProfile) -> List[dict]:
+        """
+        Decode clips of up to 30s as one batch: a single encoder pass and a
+        shared decode with the profile's beam size at its first temperature.
+        """
+        import numpy as np
+        import torch
+        import whisper
+
+        model = model_registry.get(model_name)
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(clip))), n_mels=model.dims.n_mels
+            )
+            for clip in clips
+        ])
+        options = whisper.DecodingOptions(
+            language=DECODE_OPTIONS["language"],
+            fp16=DECODE_OPTIONS["fp16"],
+            without_timestamps=True,
+            temperature=profile.temperature[0],
+            beam_size=profile.beam_size,
+        )
+        audio_seconds = sum(duration_seconds(clip) for clip in clips)
+        with model_registry.inference_lock(model_name), inference_timer(model_name, audio_seconds) as timing, \
+                torch.no_grad():
+            results = model.decode(mel, options)
+        real_time_factor = round(timing["real_time_factor"], 2) if timing["real_time_factor"] else None
+        outputs = []
+        for clip, r in zip(clips, results):
+            text = r.text.strip()
+            if r.no_speech_prob > NO_SPEECH_THRESHOLD and r.avg_logprob < LOGPROB_THRESHOLD:
+                text = ""
+            # Decoded without timestamps, so each clip is one segment
+            segments = [{
+                "start": 0.0,
+                "end": round(duration_seconds(clip), 2),
+                "text": text,
+                "avg_logprob": round(r.avg_logprob, 4),
+                "no_speech_prob": round(r.no_speech_prob, 4),
+            }] if text else []
+            outputs.append({
+                "text": text,
+                "segments": segments,
+                "model": model_name,
+                "profile": profile.name,
+                "real_time_factor": real_time_factor,
+            })
+        return outputs
+
+    def transcribe_batch(self, items: List[Tuple[str, Optional[str]]],
+                         model_name: Optional[str] = None,
+                         profile: Optional[str] = None) -> List[dict]:
+        """
+        Transcribe several audio files, decoding the short ones together.
+
+        Files up to 30s fit a single Whisper window and are decoded as one
+        batch; longer files are transcribed one at a time, as by
+        transcribe_segments. If the batched decode fails, its clips are
+        transcribed one at a time instead. A file that fails gets an error
+        entry and doesn't affect the others.
+
+        Args:
+            items: (file path, SHA-256 or None) for each file
+            model_name (Optional[str]): Whisper model to use; defaults to the profile's model
+            profile (Optional[str]): Decoding profile; defaults to settings.DEFAULT_DECODING_PROFILE
+
+        Returns:
+            List[dict]: ``{"transcript", "segments", "model", "profile",
+            "real_time_factor"}`` or ``{"error": ...}`` for each item, in order
+        """
+        requested = get_profile(profile)
+        models = cache_models(model_name, requested)
+        use_chunks = settings.TRANSCRIBE_CHUNKED
+        outcomes: List[Optional[dict]] = [None] * len(items)
+        clips = []  # (index, audio, batch cache key, cache key)
+
+        def transcribe_one(index: int, audio: "np.ndarray", cache_key: tuple):
+            selected = select_profile(requested.name, audio_seconds=duration_seconds(audio))
+            output = self._transcribe_pcm(audio, model_name or selected.model, use_chunks, selected)
+            result_cache.set(TRANSCRIPTS, cache_key, output)
+            outcomes[index] = _outcome(output)
+
+        for index, (file_path, audio_hash) in enumerate(items):
+            try:
+                audio_hash = audio_hash or hash_file(file_path)
+                cache_key = (audio_hash, models, model_registry.precision,
+                             requested.transcribe_options(DECODE_OPTIONS), use_chunks, "segments")
+                cached = result_cache.get(TRANSCRIPTS, cache_key)
+                if cached is not None:
+                    outcomes[index] = _outcome(cached)
+                    continue
+
+                audio = load_pcm(file_path, audio_hash)
+                if duration_seconds(audio) <= BATCH_WINDOW_SECONDS:
+                    # Decoded differently from transcribe(), so cached separately
+                    batch_key = (audio_hash, models, model_registry.precision,
+                                 requested.transcribe_options(DECODE_OPTIONS), "batched", "segments")
+                    cached = result_cache.get(TRANSCRIPTS, batch_key)
+                    if cached is not None:
+                        outcomes[index] = _outcome(cached)
+                    else:
+                        clips.append((index, audio, batch_key, cache_key))
+                    continue
+
+                transcribe_one(index, audio, cache_key)
+            except Exception as e:
+                logger.error(f"Error transcribing batch item {file_path}: {str(e)}")
+                outcomes[index] = {"error": str(e)}
+
+        if clips:
+            try:
+                outputs = self._decode_clips(models[0], [audio for _, audio, _, _ in clips], requested)
+                for (index, _, batch_key, _), output in zip(clips, outputs):
+                    result_cache.set(TRANSCRIPTS, batch_key, output)
+                    outcomes[index] = _outcome(output)
+            except Exception as e:
+                # One bad clip shouldn't fail the rest of the group
+                logger.error(f"Error decoding batch of {len(clips)} clip(s), "
+                             f"transcribing them one by one: {str(e)}")
+                for index, audio, _, cache_key in clips:
+                    try:
+                        transcribe_one(index, audio, cache_key)
+                    except Exception as e:
+                        logger.error(f"Error transcribing batch item {items[index][0]}: {str(e)}")
+                        outcomes[index] = {"error": str(e)}
+
+        return outcomes
+
 # Create a singleton instance
 transcriber = AudioTranscriber() 
\ No newline at end of file
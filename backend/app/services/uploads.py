@@ -0,0 +1,313 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterable, List, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException
+
+from ..config import settings
+from .ingest import CHUNK_SIZE, IngestedFile, validate_extension, _size_limit_detail
+from .metrics import registry, stage_timer, UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST = "upload.json"
+# The manifest is renamed to this while an upload is being completed, which
+# claims the upload: only one completion can win the rename
+_CLAIMED = "upload.completing"
+_DATA = "data"
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class ResumableUpload:
+    """
+    A file uploaded in numbered parts over several requests.
+
+    Part ``n`` (counted from 0) covers bytes ``n * part_size`` up to the next
+    part, the last one being shorter. Each part is written straight into its
+    place in one preallocated file, so completing the upload needs no
+    assembly step.
+    """
+    id: str
+    filename: str
+    extension: str
+    size: int
+    part_size: int
+    created_at: float
+
+    @property
+    def part_count(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+    def part_range(self, number: int) -> Tuple[int, int]:
+        """Byte range [start, end) of part ``number``."""
+        start = number * self.part_size
+        return start, min(start + self.part_size, self.size)
+
+
+class UploadStore:
+    """
+    Resumable uploads kept on disk under ``root``, one directory per upload
+    holding its manifest, its data file and a marker per received part.
+
+    All state is on disk, so an upload can be resumed after a dropped
+    connection or a restart of the API. Parts may arrive in any order and in
+    parallel. Uploads with no activity for ``ttl`` seconds are deleted.
+    """
+
+    def __init__(self, root: str, max_size: int, default_part_size: int, max_part_size: int, ttl: int):
+        self.root = root
+        self.max_size = max_size
+        self.default_part_size = default_part_size
+        self.max_part_size = max_part_size
+        self.ttl = ttl
+
+    def _directory(self, upload_id: str) -> str:
+        return os.path.join(self.root, upload_id)
+
+    def _data_path(self, upload: ResumableUpload) -> str:
+        return os.path.join(self._directory(upload.id), _DATA)
+
+    def _manifest_path(self, upload_id: str) -> str:
+        return os.path.join(self._directory(upload_id), _MANIFEST)
+
+    def _marker_path(self, upload: ResumableUpload, number: int) -> str:
+        return os.path.join(self._directory(upload.id), f"{number}.done")
+
+    def create(self, filename: Optional[str], size: int, part_size: Optional[int] = None) -> ResumableUpload:
+        """
+        Start an upload of a ``size``-byte file. Blocking; run it in a thread.
+
+        Raises:
+            HTTPException: 400 for a disallowed extension or bad part size,
+                413 if the file is larger than the upload limit
+        """
+        extension = validate_extension(filename, settings.ALLOWED_EXTENSIONS)
+        if size <= 0:
+            raise HTTPException(status_code=400, detail="File size must be positive")
+        if size > self.max_size:
+            raise HTTPException(status_code=413, detail=_size_limit_detail(self.max_size))
+        part_size = part_size or self.default_part_size
+        if not 0 < part_size <= self.max_part_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part size must be between 1 and {self.max_part_size} bytes"
+            )
+        self.prune()
+
+        upload = ResumableUpload(id=uuid.uuid4().hex, filename=filename, extension=extension,
+                                 size=size, part_size=part_size, created_at=time.time())
+        directory = self._directory(upload.id)
+        os.makedirs(directory)
+        # Sized up front (sparse where the filesystem allows) so parts can land in any order
+        with open(self._data_path(upload), "wb") as data:
+            data.truncate(size)
+        with open(self._manifest_path(upload.id), "w") as manifest:
+            json.dump(asdict(upload), manifest)
+        logger.info(f"Started upload {upload.id} of {filename} ({size} bytes in {upload.part_count} parts)")
+        return upload
+
+    def get(self, upload_id: str) -> ResumableUpload:
+        """
+        Look up an unfinished upload.
+
+        Raises:
+            HTTPException: 404 if there is no such upload
+        """
+        manifest = self._manifest_path(upload_id)
+        if not _UPLOAD_ID.match(upload_id) or not os.path.exists(manifest):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        with open(manifest) as f:
+            return ResumableUpload(**json.load(f))
+
+    def received_parts(self, upload: ResumableUpload) -> List[int]:
+        """Numbers of the parts received in full, in order."""
+        received = []
+        for name in os.listdir(self._directory(upload.id)):
+            number, _, suffix = name.partition(".")
+            if suffix == "done" and number.isdigit():
+                received.append(int(number))
+        return sorted(received)
+
+    def status(self, upload: ResumableUpload) -> dict:
+        """Progress of an upload, with the byte ranges received so far merged."""
+        received = self.received_parts(upload)
+        ranges: List[List[int]] = []
+        for number in received:
+            start, end = upload.part_range(number)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        received_set = set(received)
+        return {
+            "upload_id": upload.id,
+            "filename": upload.filename,
+            "size": upload.size,
+            "part_size": upload.part_size,
+            "part_count": upload.part_count,
+            "received_parts": received,
+            "missing_parts": [n for n in range(upload.part_count) if n not in received_set],
+            "received_bytes": sum(end - start for start, end in ranges),
+            "received_ranges": ranges,
+        }
+
+    async def write_part(self, upload: ResumableUpload, number: int, chunks: AsyncIterable[bytes]) -> int:
+        """
+        Stream part ``number`` into its place in the data file. The part only
+        counts as received once all of its bytes have been written, so a part
+        cut off mid-way is simply sent again.
+
+        While it is written the part holds a ``.writing`` marker, created
+        before checking that the upload hasn't been claimed by ``complete``,
+        which checks for markers after claiming it; so either the part is
+        refused or the completion waits for it, never neither.
+
+        Raises:
+            HTTPException: 400 for an unknown part number or a body of the wrong length,
+                409 if the upload is being completed
+        """
+        if not 0 <= number < upload.part_count:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part number must be between 0 and {upload.part_count - 1}"
+            )
+        start, end = upload.part_range(number)
+        expected = end - start
+        marker = self._marker_path(upload, number)
+        if await aiofiles.os.path.exists(marker):
+            # Sent again: don't count it until the new copy is complete
+            await aiofiles.os.remove(marker)
+
+        writing = os.path.join(self._directory(upload.id), f"{number}.{uuid.uuid4().hex}.writing")
+        try:
+            async with aiofiles.open(writing, "w"):
+                pass
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        try:
+            if not await aiofiles.os.path.exists(self._manifest_path(upload.id)):
+                raise HTTPException(status_code=409, detail="Upload is already being completed")
+            written = 0
+            with stage_timer("upload"):
+                async with aiofiles.open(self._data_path(upload), "r+b") as data:
+                    await data.seek(start)
+                    async for chunk in chunks:
+                        written += len(chunk)
+                        if written > expected:
+                            break
+                        await data.write(chunk)
+            if written != expected:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Part {number} must be exactly {expected} bytes"
+                )
+            UPLOAD_BYTES.inc(written)
+            async with aiofiles.open(marker, "w"):
+                pass
+        finally:
+            try:
+                await aiofiles.os.remove(writing)
+            except FileNotFoundError:
+                # Aborted meanwhile
+                pass
+        return written
+
+    def complete(self, upload: ResumableUpload) -> IngestedFile:
+        """
+        Finish an upload once every part has arrived and hand over its file,
+        which the caller then owns. The file is hashed in one streaming pass
+        for the transcript cache. Blocking; run it in a thread.
+
+        The upload is claimed first by renaming its manifest, so of two
+        concurrent completions only one goes ahead.
+
+        Raises:
+            HTTPException: 404 if the upload is gone, 409 if it is already being
+                completed, parts are still being written or parts are missing
+        """
+        directory = self._directory(upload.id)
+        manifest, claimed = self._manifest_path(upload.id), os.path.join(directory, _CLAIMED)
+        try:
+            os.rename(manifest, claimed)
+        except FileNotFoundError:
+            if not os.path.isdir(directory):
+                raise HTTPException(status_code=404, detail="Upload not found")
+            raise HTTPException(status_code=409, detail="Upload is already being completed")
+
+        try:
+            writing = sorted({int(name.partition(".")[0]) for name in os.listdir(directory)
+                              if name.endswith(".writing")})
+            if writing:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Part(s) {', '.join(map(str, writing))} are still being uploaded; "
+                           f"complete the upload once they have finished"
+                )
+            missing = self.status(upload)["missing_parts"]
+            if missing:
+                shown = ", ".join(str(n) for n in missing[:20]) + (", ..." if len(missing) > 20 else "")
+                raise HTTPException(status_code=409, detail=f"Upload is missing {len(missing)} part(s): {shown}")
+        except HTTPException:
+            # Give the claim back so the client can send the parts and try again
+            os.rename(claimed, manifest)
+            raise
+
+        # Moved out of the upload's directory before that is deleted; same filesystem, so no copy
+        path = os.path.join(self.root, f"{upload.id}{upload.extension}")
+        os.replace(self._data_path(upload), path)
+        shutil.rmtree(self._directory(upload.id), ignore_errors=True)
+
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                hasher.update(chunk)
+        logger.info(f"Completed upload {upload.id} of {upload.filename} ({upload.size} bytes)")
+        return IngestedFile(path=path, filename=upload.filename, extension=upload.extension,
+                            size=upload.size, sha256=hasher.hexdigest())
+
+    def abort(self, upload: ResumableUpload):
+        """Delete an unfinished upload and everything received for it."""
+        shutil.rmtree(self._directory(upload.id), ignore_errors=True)
+        logger.info(f"Aborted upload {upload.id}")
+
+    def active(self) -> int:
+        """Number of unfinished uploads on disk."""
+        if not os.path.isdir(self.root):
+            return 0
+        return sum(1 for name in os.listdir(self.root) if _UPLOAD_ID.match(name))
+
+    def prune(self):
+        """Delete unfinished uploads with no activity for the TTL."""
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            return
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            # A received part touches the directory, so its mtime is the last activity
+            if _UPLOAD_ID.match(name) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Deleted expired upload {name}")
+
+
+# Create a singleton instance
+upload_store = UploadStore(
+    root=settings.RESUMABLE_UPLOAD_DIR,
+    max_size=settings.RESUMABLE_MAX_FILE_SIZE,
+    default_part_size=settings.RESUMABLE_PART_SIZE,
+    max_part_size=settings.RESUMABLE_MAX_PART_SIZE,
+    ttl=settings.RESUMABLE_UPLOAD_TTL_SECONDS,
+)
+
+registry.register_callback("resumable_uploads_active", "Resumable uploads started but not completed.", "gauge",
+                           upload_store.active)
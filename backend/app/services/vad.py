@@ -0,0 +1,118 @@
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+def frame_energies(audio: "np.ndarray", frame_ms: int = 30) -> "np.ndarray":
+    """
+    Compute the RMS energy (in dB) of consecutive non-overlapping frames.
+
+    Args:
+        audio (np.ndarray): Mono float32 audio at 16 kHz
+        frame_ms (int): Frame length in milliseconds
+
+    Returns:
+        np.ndarray: One energy value per frame
+    """
+    import numpy as np
+
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def speech_mask(energies: "np.ndarray", margin_db: float = 10.0) -> "np.ndarray":
+    """
+    Mark frames as speech when they are clearly above the estimated noise floor.
+    """
+    import numpy as np
+
+    if energies.size == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(energies, 10)
+    return energies > noise_floor + margin_db
+
+
+def split_on_silence(
+    audio: "np.ndarray",
+    chunk_seconds: float = 30.0,
+    search_seconds: float = 5.0,
+    min_silence_ms: int = 300,
+    frame_ms: int = 30,
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into chunks of at most ``chunk_seconds``, cutting at the quietest
+    pause found in the last ``search_seconds`` before each limit.
+
+    Chunks that contain no speech at all are dropped.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample offsets of each chunk
+    """
+    import numpy as np
+
+    total = len(audio)
+    frame_len = SAMPLE_RATE * frame_ms // 1000
+    energies = frame_energies(audio, frame_ms)
+    speech = speech_mask(energies)
+
+    # Smooth the energy so a cut lands in a pause rather than a single quiet frame
+    window = max(1, min_silence_ms // frame_ms)
+    smoothed = np.convolve(energies, np.ones(window) / window, mode="same") if energies.size else energies
+
+    chunk_len = int(chunk_seconds * SAMPLE_RATE)
+    search_len = int(min(search_seconds, chunk_seconds / 2) * SAMPLE_RATE)
+
+    boundaries = []
+    start = 0
+    while start < total:
+        end = start + chunk_len
+        if end >= total:
+            end = total
+        else:
+            lo = (end - search_len) // frame_len
+            hi = end // frame_len
+            if hi > lo:
+                end = (lo + int(np.argmin(smoothed[lo:hi]))) * frame_len + frame_len // 2
+        boundaries.append((start, end))
+        start = end
+
+    # Drop chunks that are silence from start to end
+    kept = []
+    for start, end in boundaries:
+        if speech[start // frame_len:max(start // frame_len + 1, end // frame_len)].any():
+            kept.append((start, end))
+    return kept
+
+
+def _normalize_word(word: str) -> str:
+    return "".join(ch for ch in word.lower() if ch.isalnum())
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 8) -> str:
+    """
+    Join chunk transcripts in order, removing words repeated across a chunk
+    boundary because the chunks overlap.
+    """
+    words: List[str] = []
+    for text in texts:
+        new_words = text.split()
+        if not new_words:
+            continue
+        tail = [_normalize_word(w) for w in words[-max_overlap_words:]]
+        head = [_normalize_word(w) for w in new_words[:max_overlap_words]]
+        overlap = 0
+        for size in range(min(len(tail), len(head)), 0, -1):
+            if tail[-size:] == head[:size]:
+                overlap = size
+                break
+        words.extend(new_words[overlap:])
+    return " ".join(words)
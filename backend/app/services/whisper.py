@@ -1,80 +1,102 @@
-import whisper
-import tempfile
 import os
 import gc
-from fastapi import UploadFile
+import asyncio
+from fastapi import UploadFile, HTTPException
 import logging
-import torch
-import numpy as np
+from typing import TYPE_CHECKING, Optional
+from ..config import settings
+from .parallel_transcriber import get_parallel_transcriber
+from .ingest import save_upload
+from .cache import result_cache, TRANSCRIPTS
+from .model_registry import model_registry, ModelNotAllowedError
+from .audio import load_pcm, duration_seconds, AudioDecodeError
+from .metrics import inference_timer
+from .profiles import get_profile, select_profile, UnknownProfileError
+from .segments import whisper_segments
+from .transcriber import DECODE_OPTIONS, cache_models
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# Global model instance
-_whisper_model = None
+def get_whisper_model(model_name: Optional[str] = None):
+    """Get the shared Whisper model from the model registry."""
+    return model_registry.get(model_name)
 
-def get_whisper_model():
-    """Get or initialize the Whisper model."""
-    global _whisper_model
-    if _whisper_model is None:
-        try:
-            logger.info("Loading Whisper model...")
-            # Force CPU and disable CUDA
-            torch.cuda.is_available = lambda: False
-            os.environ["CUDA_VISIBLE_DEVICES"] = ""
-            
-            # Set memory optimization flags
-            torch.set_num_threads(1)
-            torch.set_num_interop_threads(1)
-            
-            # Load tiny model with CPU optimizations
-            _whisper_model = whisper.load_model(
-                "tiny",
-                device="cpu",
-                download_root=os.path.join(os.path.dirname(__file__), "models")
-            )
-            
-            # Optimize model for inference
-            _whisper_model.eval()
-            torch.set_grad_enabled(False)
-            
-            logger.info("Whisper model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load Whisper model: {str(e)}")
-            raise
-    return _whisper_model
+def _transcribe_whole(model_name: str, audio: "np.ndarray", options: dict):
+    """
+    Transcribe the whole recording with the shared model. Blocking, and it
+    waits for the model's inference lock; run it in a thread.
+    """
+    import torch
+
+    # Get the model
+    model = get_whisper_model(model_name)
+
+    # Transcribe the audio with memory optimizations
+    with model_registry.inference_lock(model_name), torch.no_grad(), torch.cuda.amp.autocast(enabled=False), \
+            inference_timer(model_name, duration_seconds(audio)) as timing:
+        result = model.transcribe(audio, **options)
+    return {"text": result["text"], "segments": whisper_segments(result)}, timing
 
-async def transcribe_audio(file: UploadFile) -> str:
+async def transcribe_audio(file: UploadFile, chunked: Optional[bool] = None,
+                           model_name: Optional[str] = None, profile: Optional[str] = None) -> dict:
     """
     Transcribe audio file using Whisper model with memory optimizations.
+    ``profile`` names the decoding profile (default: settings.UPLOAD_DECODING_PROFILE;
+    audio over the length budget uses the next faster one) and ``model_name``
+    overrides its model. With ``chunked`` (default: settings.TRANSCRIBE_CHUNKED)
+    the audio is split at silences and the chunks are transcribed in parallel
+    worker processes.
+
+    Returns:
+        dict: ``text``, ``segments``, and the ``model``, ``profile`` and
+        measured ``real_time_factor`` of the transcription
     """
+    import numpy as np
+    import torch
+
     temp_file_path = None
     try:
-        # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        # Get the model
-        model = get_whisper_model()
-        
-        # Transcribe the audio with memory optimizations
-        with torch.no_grad(), torch.cuda.amp.autocast(enabled=False):
-            result = model.transcribe(
-                temp_file_path,
-                fp16=False,  # Use CPU
-                language="en",
-                beam_size=1,  # Reduce beam size for lower memory usage
-                best_of=1,    # Reduce best_of for lower memory usage
-                temperature=0.0,  # Disable sampling
-                condition_on_previous_text=False,  # Disable conditioning
-                compression_ratio_threshold=2.4,  # Increase compression threshold
-                logprob_threshold=-1.0,  # Disable logprob threshold
-                no_speech_threshold=0.6,  # Increase no speech threshold
-            )
+        # Stream the uploaded file to disk
+        ingested = await save_upload(file)
+        temp_file_path = ingested.path
         
-        return result["text"]
+        requested = get_profile(profile or settings.UPLOAD_DECODING_PROFILE)
+        use_chunks = settings.TRANSCRIBE_CHUNKED if chunked is None else chunked
+
+        # Return a cached transcript of identical audio if there is one
+        cache_key = (ingested.sha256, cache_models(model_name, requested), model_registry.precision,
+                     requested.transcribe_options(DECODE_OPTIONS), use_chunks, "upload")
+        cached = await result_cache.get_async(TRANSCRIPTS, cache_key)
+        if cached is not None:
+            return cached
+
+        # Decode once; the samples go straight to the model
+        audio = await asyncio.to_thread(load_pcm, temp_file_path, ingested.sha256)
+        selected = select_profile(requested.name, audio_seconds=duration_seconds(audio))
+        model_name = model_name or selected.model
+        options = selected.transcribe_options(DECODE_OPTIONS)
+
+        if use_chunks:
+            with inference_timer(model_name, duration_seconds(audio)) as timing:
+                output = await get_parallel_transcriber(model_name).transcribe_async(audio, **options)
+        else:
+            # Off the event loop: the inference lock may be held by a stream, the live decoder or a job
+            output, timing = await asyncio.to_thread(_transcribe_whole, model_name, audio, options)
+
+        output.update({
+            "model": model_name,
+            "profile": selected.name,
+            "real_time_factor": round(timing["real_time_factor"], 2) if timing["real_time_factor"] else None,
+        })
+        await result_cache.set_async(TRANSCRIPTS, cache_key, output)
+        return output
             
+    except (HTTPException, ModelNotAllowedError, UnknownProfileError, AudioDecodeError):
+        # Validation errors are reported as-is
+        raise
     except Exception as e:
         logger.error(f"Error in transcription: {str(e)}")
         raise Exception(f"Failed to transcribe audio: {str(e)}")
@@ -0,0 +1,92 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+Cases are matched by suite, case and concurrency. A case regresses when its
+p50 or p95 latency grows, or its throughput or median real-time factor
+drops, by more than the threshold. Exits with status 1 if anything regressed,
+so it can gate CI.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional, Tuple
+
+# (label, path into a record, True if higher is better)
+CHECKS = [
+    ("p50", ("latency_seconds", "p50"), False),
+    ("p95", ("latency_seconds", "p95"), False),
+    ("rps", ("requests_per_second",), True),
+    ("rtf", ("real_time_factor", "p50"), True),
+]
+
+
+def _get(record: dict, path: Tuple[str, ...]) -> Optional[float]:
+    value = record
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _key(record: dict) -> tuple:
+    return record["suite"], record["case"], record["concurrency"]
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """Return (report lines, regression descriptions)."""
+    old = {_key(r): r for r in baseline["results"]}
+    lines, regressions = [], []
+    for record in candidate["results"]:
+        key = _key(record)
+        previous = old.get(key)
+        if previous is None:
+            lines.append(f"{'/'.join(map(str, key))}: new case")
+            continue
+        parts = []
+        for label, path, higher_is_better in CHECKS:
+            before, after = _get(previous, path), _get(record, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            parts.append(f"{label} {before:.4g}->{after:.4g} ({change:+.1%})")
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(f"{'/'.join(map(str, key))} {label} {change:+.1%}")
+        lines.append(f"{'/'.join(map(str, key))}: {', '.join(parts) or 'no comparable metrics'}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change that counts as a regression (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline['meta'].get('commit')}")
+    print(f"candidate {candidate['meta'].get('commit')}")
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    for line in lines:
+        print(line)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Synthetic speech-like audio for benchmarks.
+
+Real recordings can't be checked in, and pure tones or white noise don't
+exercise Whisper or the silence detection the way speech does. These
+fixtures are voiced "syllables" (a gliding fundamental with formant-like
+harmonics and a syllable-rate envelope) grouped into words and sentences
+separated by pauses, plus a little background noise. They are generated
+from a fixed seed, so every run and every machine gets identical audio.
+"""
+import os
+import wave
+from typing import Dict, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Fixture lengths in seconds, by name
+DEFAULT_LENGTHS = {"short": 10, "medium": 60, "long": 300}
+
+# Rough formant centres of a few vowels (F1, F2), in Hz
+_VOWELS = [(730, 1090), (270, 2290), (530, 1840), (570, 840), (300, 870)]
+
+
+def _syllable(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    # Fundamental glides like intonation, around a typical speaking pitch
+    f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(1, 3) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    f1, f2 = _VOWELS[rng.integers(len(_VOWELS))]
+
+    harmonics = np.arange(1, 25)[:, None]
+    freqs = harmonics * f0[None, :]
+    # Emphasise harmonics near the two formants
+    weights = (np.exp(-((freqs - f1) / 150) ** 2) + 0.6 * np.exp(-((freqs - f2) / 200) ** 2)) / harmonics
+    voiced = (weights * np.sin(harmonics * phase[None, :])).sum(axis=0)
+
+    envelope = np.sin(np.pi * np.linspace(0, 1, n)) ** 2
+    return (voiced * envelope).astype(np.float32)
+
+
+def generate_speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Float32 mono audio at 16 kHz, ``seconds`` long."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    while pos < total:
+        # A sentence: a few words of a few syllables, then a longer pause
+        for _ in range(rng.integers(4, 12)):
+            for _ in range(rng.integers(1, 4)):
+                syllable = _syllable(rng, rng.uniform(0.12, 0.3))
+                end = min(pos + len(syllable), total)
+                audio[pos:end] = syllable[:end - pos]
+                pos = end
+            pos += int(rng.uniform(0.05, 0.15) * SAMPLE_RATE)
+            if pos >= total:
+                break
+        pos += int(rng.uniform(0.4, 1.2) * SAMPLE_RATE)
+
+    audio += rng.standard_normal(total).astype(np.float32) * 0.003
+    peak = np.abs(audio).max() or 1.0
+    return audio / peak * 0.5
+
+
+def write_wav(path: str, audio: np.ndarray):
+    """Write float audio as 16-bit PCM WAV."""
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def ensure_fixtures(directory: str, lengths: Optional[Dict[str, float]] = None, seed: int = 0) -> Dict[str, str]:
+    """
+    Generate any missing fixtures in ``directory`` and return their paths by
+    name. Files are named by length and seed, so existing ones are reused.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, seconds in (lengths or DEFAULT_LENGTHS).items():
+        path = os.path.join(directory, f"speech_{int(seconds)}s_seed{seed}.wav")
+        if not os.path.exists(path):
+            write_wav(path, generate_speech_like(seconds, seed))
+        paths[name] = path
+    return paths
+
+
+def synthetic_transcript(words: int, seed: int = 0) -> str:
+    """Meeting-like text of roughly ``words`` words for the summarizer benchmark."""
+    rng = np.random.default_rng(seed)
+    speakers = ["Alice", "Bob", "Priya", "Marco"]
+    subjects = ["the release", "the budget", "the migration", "customer feedback", "the roadmap", "hiring"]
+    verbs = ["review", "update", "send", "draft", "schedule", "finalize"]
+    sentences = []
+    count = 0
+    while count < words:
+        speaker = speakers[rng.integers(len(speakers))]
+        subject = subjects[rng.integers(len(subjects))]
+        if rng.random() < 0.2:
+            sentence = f"{speaker} will {verbs[rng.integers(len(verbs))]} {subject} by Friday."
+        else:
+            sentence = (f"{speaker} said that {subject} is on track but we need to "
+                        f"{verbs[rng.integers(len(verbs))]} the plan for {subjects[rng.integers(len(subjects))]}.")
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
@@ -0,0 +1,97 @@
+"""Timing, concurrency and resource accounting shared by the benchmark suites."""
+import asyncio
+import resource
+import sys
+import time
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+
+
+def peak_rss_mb() -> dict:
+    """
+    Peak resident memory so far of this process and of its reaped child
+    processes (e.g. chunk workers). This is a high-water mark for the whole
+    run, so suites should be run one per process when comparing memory.
+    """
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def percentiles(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    data = np.asarray(values, dtype=np.float64)
+    return {
+        "min": round(float(data.min()), 4),
+        "p50": round(float(np.percentile(data, 50)), 4),
+        "p95": round(float(np.percentile(data, 95)), 4),
+        "p99": round(float(np.percentile(data, 99)), 4),
+        "max": round(float(data.max()), 4),
+        "mean": round(float(data.mean()), 4),
+    }
+
+
+async def run_concurrent(call: Callable[[], Awaitable], requests: int, concurrency: int,
+                         warmup: int = 1) -> dict:
+    """
+    Issue ``requests`` calls with at most ``concurrency`` in flight and time
+    each one. ``warmup`` calls run first, one at a time, and are not counted.
+
+    Returns latencies in seconds, error count, wall time and requests/sec.
+    """
+    for _ in range(warmup):
+        await call()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - start
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "wall_seconds": wall,
+        "requests_per_second": len(latencies) / wall if wall > 0 else None,
+    }
+
+
+def summarize_run(suite: str, case: str, concurrency: int, run: dict,
+                  audio_seconds: Optional[float] = None, extra: Optional[dict] = None) -> dict:
+    """Turn a run_concurrent() result into one comparable JSON record."""
+    record = {
+        "suite": suite,
+        "case": case,
+        "concurrency": concurrency,
+        "requests": len(run["latencies"]) + len(run["errors"]),
+        "errors": len(run["errors"]),
+        "latency_seconds": percentiles(run["latencies"]),
+        "requests_per_second": round(run["requests_per_second"], 3) if run["requests_per_second"] else None,
+        "wall_seconds": round(run["wall_seconds"], 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if audio_seconds:
+        # Audio seconds per wall second of each request; higher is faster
+        record["audio_seconds"] = audio_seconds
+        record["real_time_factor"] = percentiles([audio_seconds / t for t in run["latencies"] if t > 0])
+    if run["errors"]:
+        record["first_error"] = run["errors"][0]
+    if extra:
+        record.update(extra)
+    return record
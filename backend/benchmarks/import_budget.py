@@ -0,0 +1,94 @@
+"""
+Check that importing the API stays fast and free of ML frameworks.
+
+Imports the module in fresh interpreters, takes the fastest of several runs
+and fails if it is over the time budget or if any heavy module was pulled
+in: torch, Whisper and transformers must only load with the first model,
+numpy and httpx where the audio or the remote summarizer first needs them,
+and SQLAlchemy with the database engines at startup. The slowest imports
+are listed to show where the time goes; most of what remains is FastAPI
+itself.
+Exits with status 1 on failure, so it can gate CI.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.import_budget --budget 1.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+HEAVY_MODULES = ("torch", "whisper", "transformers", "scipy", "numpy", "httpx", "sqlalchemy")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    # Keep the probe away from the real databases and caches
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    return env
+
+
+def measure(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter and report the time taken and heavy modules loaded."""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, env=_env(),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int) -> List[Tuple[float, str]]:
+    """Largest cumulative import times from ``python -X importtime``, in seconds."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(),
+    ).stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.append((int(cumulative) / 1e6, name.rstrip()))
+    return sorted(times, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum import time in seconds")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try; the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(max(1, args.runs))]
+    best = min(run["seconds"] for run in runs)
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    baseline = min(measure("fastapi")["seconds"] for _ in range(max(1, args.runs)))
+
+    print(f"import {args.module}: {best:.3f}s (budget {args.budget:.3f}s; fastapi alone {baseline:.3f}s)")
+    for seconds, name in slowest_imports(args.module, args.top):
+        print(f"  {seconds:8.3f}s  {name}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: imported {', '.join(heavy)}; load these only where they are first used")
+        failed = True
+    if best > args.budget:
+        print(f"FAIL: over the import budget by {best - args.budget:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
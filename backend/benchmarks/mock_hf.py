@@ -0,0 +1,71 @@
+"""
+Local stand-in for the Hugging Face Inference API.
+
+Answers summarization requests with a canned summary after a fixed delay, so
+the summarizer's chunking, concurrency limits and connection pooling can be
+measured without network access or an API token. Point
+``HF_API_BASE_URL`` at ``server.url``.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the real API does
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        words = str(payload.get("inputs", "")).split()
+        body = json.dumps([{"summary_text": " ".join(words[:40]) or "Nothing to summarize."}]).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockInferenceServer:
+    """Threaded HTTP server on localhost; use as a context manager."""
+
+    def __init__(self, latency_ms: float = 50.0, port: int = 0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.latency = latency_ms / 1000
+        self._server.requests = 0
+        self._server.lock = threading.Lock()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/models"
+
+    @property
+    def requests(self) -> int:
+        """Requests served so far."""
+        return self._server.requests
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,241 @@
+"""
+Compare int8-quantized Whisper with fp32 on local recordings.
+
+For each model the fp32 and the int8 version (quantized and cached on
+first use, as the app does with WHISPER_QUANTIZE) transcribe every
+recording, at each intra-op thread count. The report has the real-time
+factor, the weight memory of each version (the resident memory growth
+while loading is only indicative, as freed memory is reused), and the
+word error rate of the int8 transcript against the fp32 one. Where a
+reference transcript sits next to a recording (``meeting.wav`` and
+``meeting.txt``), both versions are also scored against it.
+
+Pass real recordings with ``--audio``; without it the synthetic fixtures
+are used, which are fine for speed and memory but have no words, so their
+error rates mean little. Whisper weights must already be downloaded.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.quantization --models base,small --audio ~/recordings --threads 1,4
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .fixtures import DEFAULT_LENGTHS, SAMPLE_RATE, ensure_fixtures
+from .harness import peak_rss_mb
+from .run import BENCHMARKS_DIR, _csv, _git_revision
+
+logger = logging.getLogger("benchmarks")
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+
+
+def _words(text: str) -> List[str]:
+    return _PUNCTUATION.sub(" ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> Optional[float]:
+    """Word-level edit distance divided by the reference length, ignoring case and punctuation."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return None if hyp else 0.0
+    vocabulary: Dict[str, int] = {}
+    ref_ids = [vocabulary.setdefault(word, len(vocabulary)) for word in ref]
+    hyp_ids = np.array([vocabulary.setdefault(word, len(vocabulary)) for word in hyp], dtype=np.int64)
+
+    # One row of the edit distance table at a time. Insertions chain along
+    # the row, which a running minimum of (cost - column) resolves in one pass.
+    columns = np.arange(len(hyp) + 1)
+    previous = columns.copy()
+    for i, word in enumerate(ref_ids, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        current[1:] = np.minimum(previous[:-1] + (hyp_ids != word), previous[1:] + 1)
+        previous = np.minimum.accumulate(current - columns) + columns
+    return round(float(previous[-1]) / len(ref), 4)
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident memory of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+
+def _recordings(paths: List[str]) -> Dict[str, str]:
+    """Audio files by name, from files and directories."""
+    recordings = {}
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            files = [os.path.join(path, name) for name in names if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS]
+        else:
+            files = [path]
+        for file in files:
+            recordings[os.path.splitext(os.path.basename(file))[0]] = file
+    return recordings
+
+
+def _reference(path: str) -> Optional[str]:
+    reference = os.path.splitext(path)[0] + ".txt"
+    if not os.path.exists(reference):
+        return None
+    with open(reference) as f:
+        return f.read()
+
+
+def _load(name: str, precision: str, download_root: Optional[str], quantized_dir: str):
+    from app.services.quantization import load_quantized_model
+
+    if precision == "int8":
+        return load_quantized_model(name, download_root=download_root, directory=quantized_dir)
+    import whisper
+
+    model = whisper.load_model(name, device="cpu", download_root=download_root)
+    model.eval()
+    return model
+
+
+def compare_model(name: str, recordings: Dict[str, str], threads: List[int], args) -> List[dict]:
+    import torch
+    from app.services.audio import duration_seconds, load_pcm
+    from app.services.quantization import model_bytes
+
+    audio = {case: load_pcm(path) for case, path in recordings.items()}
+    records = []
+    transcripts: Dict[tuple, str] = {}
+    for precision in ("fp32", "int8"):
+        gc.collect()
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        model = _load(name, precision, args.download_root, args.quantized_dir)
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_mb()
+        weights_mb = round(model_bytes(model) / 2**20, 1)
+        logger.info(f"{name} {precision}: {weights_mb}MB of weights, loaded in {load_seconds:.2f}s")
+
+        for num_threads in threads:
+            torch.set_num_threads(num_threads)
+            for case, samples in audio.items():
+                seconds = duration_seconds(samples)
+                options = dict(fp16=False, language="en", beam_size=args.beam_size,
+                               temperature=0.0, condition_on_previous_text=False)
+                with torch.no_grad():
+                    model.transcribe(samples[:SAMPLE_RATE * 5], **options)  # Warm up kernels and caches
+                    timings = []
+                    for _ in range(max(1, args.runs)):
+                        start = time.perf_counter()
+                        result = model.transcribe(samples, **options)
+                        timings.append(time.perf_counter() - start)
+                elapsed = min(timings)
+                transcripts[(precision, num_threads, case)] = result["text"]
+                record = {
+                    "model": name,
+                    "precision": precision,
+                    "threads": num_threads,
+                    "case": case,
+                    "audio_seconds": round(seconds, 1),
+                    "seconds": round(elapsed, 3),
+                    "real_time_factor": round(seconds / elapsed, 2) if elapsed > 0 else None,
+                    "weights_mb": weights_mb,
+                    "rss_growth_mb": round(rss_after - rss_before, 1) if rss_before and rss_after else None,
+                    "load_seconds": round(load_seconds, 3),
+                }
+                reference = _reference(recordings[case])
+                if reference is not None:
+                    record["wer_reference"] = word_error_rate(reference, result["text"])
+                if precision == "int8":
+                    record["wer_vs_fp32"] = word_error_rate(transcripts[("fp32", num_threads, case)], result["text"])
+                records.append(record)
+                logger.info(f"{name} {precision} threads={num_threads} {case}: rtf={record['real_time_factor']}")
+        del model
+    return records
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=_csv, default=["tiny", "base", "small"], help="Whisper models to compare")
+    parser.add_argument("--audio", type=_csv, default=[],
+                        help="Recordings or directories of recordings (default: the synthetic fixtures)")
+    parser.add_argument("--lengths", type=_csv, default=["short", "medium"],
+                        help=f"Synthetic fixture sizes when no --audio is given ({', '.join(DEFAULT_LENGTHS)})")
+    parser.add_argument("--threads", type=lambda v: [int(t) for t in _csv(v)], default=[1],
+                        help="Comma-separated intra-op thread counts")
+    parser.add_argument("--runs", type=int, default=1, help="Timed transcriptions per case; the fastest counts")
+    parser.add_argument("--beam-size", type=int, default=None, help="Beam size (default: greedy)")
+    parser.add_argument("--download-root", default=os.environ.get("WHISPER_DOWNLOAD_ROOT"))
+    parser.add_argument("--quantized-dir", default=os.path.join(BENCHMARKS_DIR, "results", "whisper_int8"),
+                        help="Where quantized models are cached between runs")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic audio")
+    parser.add_argument("--fixtures-dir", default=os.path.join(BENCHMARKS_DIR, "fixtures"))
+    parser.add_argument("--out", default=None,
+                        help="Output JSON path (default: benchmarks/results/quantization-<timestamp>-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args(argv)
+    if args.audio:
+        recordings = _recordings(args.audio)
+    else:
+        lengths = {name: DEFAULT_LENGTHS[name] for name in args.lengths}
+        recordings = ensure_fixtures(args.fixtures_dir, lengths, seed=args.seed)
+    if not recordings:
+        print("No recordings found")
+        return 1
+
+    started = time.time()
+    records = []
+    for name in args.models:
+        records += compare_model(name, recordings, args.threads, args)
+    report = {
+        "meta": {
+            **_git_revision(),
+            "started_at": started,
+            "duration_seconds": round(time.time() - started, 1),
+            "cpu_count": os.cpu_count(),
+            "peak_rss_mb": peak_rss_mb(),
+            "args": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "results": records,
+    }
+
+    out = args.out
+    if out is None:
+        commit = (report["meta"]["commit"] or "nogit")[:10]
+        out = os.path.join(BENCHMARKS_DIR, "results", f"quantization-{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for record in records:
+        wer = record.get("wer_vs_fp32")
+        reference = record.get("wer_reference")
+        print(
+            f"{record['model']:<7} {record['precision']:<5} t={record['threads']:<2} {record['case']:<12} "
+            f"rtf={record['real_time_factor']} weights={record['weights_mb']}MB "
+            f"rss+={record['rss_growth_mb']}MB"
+            f"{f' wer_vs_fp32={wer}' if wer is not None else ''}"
+            f"{f' wer_ref={reference}' if reference is not None else ''}"
+        )
+    print(f"Wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Run the benchmark suites and write a JSON report.
+
+Everything runs offline: audio fixtures are synthesized, the summarizer talks
+to a local mock of the Inference API, and the result caches are disabled so
+every request does the full amount of work. Whisper weights must already be
+in the local cache (``WHISPER_DOWNLOAD_ROOT`` or ~/.cache/whisper).
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.run --suites transcriber,summarizer --concurrency 1,4
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from .fixtures import DEFAULT_LENGTHS, ensure_fixtures, synthetic_transcript
+from .harness import run_concurrent, summarize_run
+from .mock_hf import MockInferenceServer
+
+logger = logging.getLogger("benchmarks")
+
+SUITES = ("transcriber", "whisper", "summarizer")
+
+# Transcript sizes for the summarizer suite, in words
+TRANSCRIPT_WORDS = {"short": 500, "medium": 3000, "long": 12000}
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _configure_environment(workdir: str, hf_url: str, use_cache: bool):
+    """Point the app's settings at throwaway storage and the mock API before it is imported."""
+    os.environ.update({
+        "HF_API_BASE_URL": hf_url,
+        "HUGGINGFACE_API_KEY": "benchmark",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'meetings.db')}",
+        "SEARCH_INDEX_PATH": os.path.join(workdir, "search.db"),
+        "CACHE_PATH": os.path.join(workdir, "cache.db"),
+        "CACHE_ENABLED": str(use_cache).lower(),
+        "PCM_CACHE_DIR": os.path.join(workdir, "pcm_cache"),
+        "PCM_CACHE_ENABLED": str(use_cache).lower(),
+    })
+
+
+def _git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, cwd=BENCHMARKS_DIR,
+                                  timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain"))}
+
+
+def _audio_seconds(path: str) -> float:
+    import wave
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+async def bench_transcriber(args, fixtures: dict) -> List[dict]:
+    from app.services.transcriber import transcriber
+
+    records = []
+    for case, path in fixtures.items():
+        seconds = _audio_seconds(path)
+
+        async def call():
+            await asyncio.to_thread(transcriber.transcribe_audio, path, chunked=args.chunked,
+                                    model_name=args.model, profile=args.profile)
+
+        for concurrency in args.concurrency:
+            logger.info(f"transcriber: {case} ({seconds:.0f}s audio) at concurrency {concurrency}")
+            run = await run_concurrent(call, args.requests, concurrency, warmup=args.warmup)
+            records.append(summarize_run("transcriber", case, concurrency, run, audio_seconds=seconds,
+                                         extra={"model": args.model, "profile": args.profile, "chunked": args.chunked}))
+    return records
+
+
+async def bench_whisper(args, fixtures: dict) -> List[dict]:
+    from fastapi import UploadFile
+    from app.services.whisper import transcribe_audio
+
+    records = []
+    for case, path in fixtures.items():
+        seconds = _audio_seconds(path)
+
+        async def call():
+            # A fresh upload each time, as the route would receive it
+            with open(path, "rb") as f:
+                upload = UploadFile(file=f, filename=os.path.basename(path), size=os.path.getsize(path))
+                await transcribe_audio(upload, chunked=args.chunked, model_name=args.model, profile=args.profile)
+
+        for concurrency in args.concurrency:
+            logger.info(f"whisper: {case} ({seconds:.0f}s audio) at concurrency {concurrency}")
+            run = await run_concurrent(call, args.requests, concurrency, warmup=args.warmup)
+            records.append(summarize_run("whisper", case, concurrency, run, audio_seconds=seconds,
+                                         extra={"model": args.model, "profile": args.profile, "chunked": args.chunked}))
+    return records
+
+
+async def bench_summarizer(args, server: MockInferenceServer) -> List[dict]:
+    from app.config import settings
+    from app.services.summarizer import Summarizer
+    from app.services.summarizer_backends import RemoteBackend
+
+    summarizer = Summarizer(backend=RemoteBackend(settings.SUMMARIZER_MODEL))
+    await summarizer.start()
+    records = []
+    try:
+        for case in args.lengths:
+            words = TRANSCRIPT_WORDS[case]
+            counter = iter(range(10 ** 9))
+
+            async def call():
+                # Distinct text per request so the chunk cache can't short-circuit it
+                transcript = synthetic_transcript(words, seed=next(counter))
+                summary, _ = await summarizer.summarize(transcript)
+                if summary == "Error generating summary":
+                    raise RuntimeError("Summarizer returned an error")
+
+            for concurrency in args.concurrency:
+                logger.info(f"summarizer: {case} ({words} words) at concurrency {concurrency}")
+                before = server.requests
+                run = await run_concurrent(call, args.requests, concurrency, warmup=args.warmup)
+                calls = server.requests - before
+                records.append(summarize_run("summarizer", case, concurrency, run, extra={
+                    "transcript_words": words,
+                    "mock_latency_ms": args.mock_latency_ms,
+                    "api_calls_per_request": round(calls / max(1, args.requests + args.warmup), 2),
+                }))
+    finally:
+        await summarizer.close()
+    return records
+
+
+async def main_async(args) -> dict:
+    lengths = {name: DEFAULT_LENGTHS[name] for name in args.lengths}
+    fixtures = ensure_fixtures(args.fixtures_dir, lengths, seed=args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir, \
+            MockInferenceServer(latency_ms=args.mock_latency_ms) as server:
+        _configure_environment(workdir, server.url, args.use_cache)
+
+        from app.config import settings
+        records = []
+        started = time.time()
+        if "transcriber" in args.suites:
+            records += await bench_transcriber(args, fixtures)
+        if "whisper" in args.suites:
+            records += await bench_whisper(args, fixtures)
+        if "summarizer" in args.suites:
+            records += await bench_summarizer(args, server)
+
+        try:
+            from app.services.parallel_transcriber import shutdown_parallel_transcribers
+            shutdown_parallel_transcribers()
+        except ImportError:
+            pass
+
+        profile = args.profile or settings.DEFAULT_DECODING_PROFILE
+        return {
+            "meta": {
+                **_git_revision(),
+                "started_at": started,
+                "duration_seconds": round(time.time() - started, 1),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "settings": {
+                    "DECODING_PROFILE": profile,
+                    "WHISPER_MODEL": args.model or settings.DECODING_PROFILES.get(profile, {}).get("model"),
+                    "TRANSCRIBE_CHUNKED": args.chunked if args.chunked is not None else settings.TRANSCRIBE_CHUNKED,
+                    "CHUNK_WORKERS": settings.CHUNK_WORKERS,
+                    "HF_MAX_CONCURRENCY": settings.HF_MAX_CONCURRENCY,
+                    "SUMMARY_CHUNK_TOKENS": settings.SUMMARY_CHUNK_TOKENS,
+                    "CACHE_ENABLED": settings.CACHE_ENABLED,
+                },
+                "args": {k: v for k, v in vars(args).items() if k != "out"},
+            },
+            "results": records,
+        }
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark transcription and summarization.")
+    parser.add_argument("--suites", type=_csv, default=list(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument("--lengths", type=_csv, default=["short", "medium"],
+                        help=f"Fixture sizes ({', '.join(DEFAULT_LENGTHS)})")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in _csv(v)], default=[1, 4],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=8, help="Timed requests per case and concurrency level")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed requests before each case")
+    parser.add_argument("--model", default=None, help="Whisper model (default: the profile's model)")
+    parser.add_argument("--profile", default=None,
+                        help="Decoding profile (default: settings.DEFAULT_DECODING_PROFILE)")
+    parser.add_argument("--chunked", action=argparse.BooleanOptionalAction, default=None,
+                        help="Force chunked transcription on or off")
+    parser.add_argument("--mock-latency-ms", type=float, default=50.0,
+                        help="Delay of each mock Inference API response")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Leave the transcript, summary and PCM caches on")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic audio")
+    parser.add_argument("--fixtures-dir", default=os.path.join(BENCHMARKS_DIR, "fixtures"))
+    parser.add_argument("--out", default=None,
+                        help="Output JSON path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suite(s): {', '.join(sorted(unknown))}")
+    unknown = set(args.lengths) - set(DEFAULT_LENGTHS)
+    if unknown:
+        parser.error(f"Unknown length(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+
+    out = args.out
+    if out is None:
+        commit = (report["meta"]["commit"] or "nogit")[:10]
+        out = os.path.join(BENCHMARKS_DIR, "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for record in report["results"]:
+        latency = record["latency_seconds"] or {}
+        rtf = (record.get("real_time_factor") or {}).get("p50")
+        print(
+            f"{record['suite']:<12} {record['case']:<7} c={record['concurrency']:<3} "
+            f"p50={latency.get('p50')}s p95={latency.get('p95')}s "
+            f"rps={record['requests_per_second']} "
+            f"{f'rtf={rtf} ' if rtf else ''}errors={record['errors']}"
+        )
+    print(f"Wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
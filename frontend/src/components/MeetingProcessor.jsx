@@ -17,6 +17,15 @@ const formatFileSize = (bytes) => {
   return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
 };
 
+// Helper function to list action items, with their owner and due date when known
+const formatActionItems = (items) => items
+  .map((item) => {
+    if (typeof item === 'string') return `• ${item}`;
+    const details = [item.owner || item.speaker, item.due_date && `due ${item.due_date}`].filter(Boolean);
+    return `• ${item.description}${details.length ? ` (${details.join(', ')})` : ''}`;
+  })
+  .join('\n');
+
 function MeetingProcessor({ selectedMeeting, onClearSelection }) {
   const [file, setFile] = useState(null);
   const [processingStage, setProcessingStage] = useState(null);
@@ -188,7 +197,7 @@ function MeetingProcessor({ selectedMeeting, onClearSelection }) {
       doc.text('Action Items', margin, y);
       y += lineHeight;
       doc.setFontSize(12);
-      const actionItemsLines = doc.splitTextToSize(result.action_items, maxWidth);
+      const actionItemsLines = doc.splitTextToSize(formatActionItems(result.action_items), maxWidth);
       doc.text(actionItemsLines, margin, y);
 
       // Save the PDF
@@ -298,7 +307,7 @@ function MeetingProcessor({ selectedMeeting, onClearSelection }) {
             <h3 className="text-xl font-semibold text-gray-800 mb-4">Action Items</h3>
             <div className="prose prose-sm max-w-none">
               <p className="text-gray-600 whitespace-pre-wrap leading-relaxed">
-                {result.action_items}
+                {formatActionItems(result.action_items)}
               </p>
             </div>
           </div>